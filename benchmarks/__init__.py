@@ -0,0 +1,7 @@
+"""
+Micro-benchmarks y pruebas de carga de Café Aroma.
+
+Cada módulo se ejecuta desde la raíz del proyecto, por ejemplo:
+
+    python -m benchmarks.combo_catalog
+"""
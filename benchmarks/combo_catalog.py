@@ -0,0 +1,38 @@
+"""
+Costo por petición del catálogo de combos: construcción con las fábricas en cada
+request (comportamiento anterior) frente a la lectura del catálogo precalculado.
+
+    python -m benchmarks.combo_catalog
+"""
+from benchmarks.utils import setup_django, per_call_us, print_comparison, test_database
+
+setup_django()
+
+from core.factories import ComboFactoryCreator  # noqa: E402
+from products.catalog import ComboCatalog  # noqa: E402
+
+
+def build_per_request():
+    combos = []
+    for combo_type in ComboFactoryCreator.get_available_combo_types():
+        for coffee_type in ComboCatalog.COFFEE_TYPES:
+            factory = ComboFactoryCreator.create_factory(combo_type['value'])
+            combo = factory.create_combo(coffee_type, ComboCatalog.DEFAULT_WEIGHT_KG)
+            # La plantilla llamaba a estos métodos en cada render
+            combos.append((combo.coffee.label(), str(combo.mug), str(combo.filter), combo.get_total_price()))
+    return combos
+
+
+def main():
+    catalog = ComboCatalog()
+    catalog.entries()  # calentar
+
+    print_comparison('Catálogo de combos (por petición)', [
+        ('fábricas en cada petición', per_call_us(build_per_request, number=2000)),
+        ('catálogo precalculado', per_call_us(catalog.entries, number=200000)),
+    ])
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
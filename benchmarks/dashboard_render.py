@@ -0,0 +1,77 @@
+"""
+Tiempo de render de cada dashboard: sin fragmentos en caché vs. con la caché caliente.
+
+    python -m benchmarks.dashboard_render
+"""
+import random
+from datetime import timedelta
+
+from benchmarks.utils import per_call_us, print_comparison, setup_django, test_database
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from core.models import GrainType, ProcessStage  # noqa: E402
+from inventory.models import InventoryItem  # noqa: E402
+from orders.models import Order  # noqa: E402
+from production.models import ProductBatch, ProductionTask  # noqa: E402
+
+DASHBOARDS = {
+    'producción': '/production/',
+    'inventario': '/inventory/',
+    'pedidos': '/orders/',
+    'análisis': '/production/analytics/',
+}
+ROWS = 500
+
+
+def seed():
+    rng = random.Random(7)
+    today = timezone.now().date()
+    InventoryItem.objects.bulk_create([
+        InventoryItem(sku=f'BENCH-{i:04d}', name=f'Café {i}', type=rng.choice(GrainType.values),
+                      stock_kg=rng.uniform(0, 200), min_stock_kg=10)
+        for i in range(ROWS)
+    ])
+    tasks = ProductionTask.objects.bulk_create([
+        ProductionTask(stage=rng.choice(ProcessStage.values), assigned_unit='Línea 1', planned_kg=rng.uniform(5, 50))
+        for _ in range(ROWS)
+    ])
+    ProductBatch.objects.bulk_create([
+        ProductBatch(code=f'BENCH-B{i:05d}', coffee_type=rng.choice(GrainType.values), qty_kg=task.planned_kg,
+                     cupping_score=rng.uniform(80, 95), mfg_date=today - timedelta(days=i % 90),
+                     expiry_date=today + timedelta(days=365), production_task=task)
+        for i, task in enumerate(tasks)
+    ])
+    Order.objects.bulk_create([
+        Order(customer=f'Cliente {i}', delivery_speed=rng.choice(['RA', 'EC']),
+              status=rng.choice([status for status, _ in Order.STATUS_CHOICES]))
+        for i in range(ROWS)
+    ])
+
+
+def main():
+    settings.ALLOWED_HOSTS = ['testserver']
+    with test_database():
+        seed()
+        client = Client()
+
+        for name, url in DASHBOARDS.items():
+            def cold():
+                cache.clear()
+                client.get(url)
+
+            warm = per_call_us(lambda: client.get(url), number=20, repeat=3)
+            print_comparison(f"Dashboard de {name} ({ROWS} filas por tabla)", [
+                ('sin caché de fragmentos', per_call_us(cold, number=20, repeat=3)),
+                ('fragmentos en caché', warm),
+            ])
+            print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Fábricas (factory_boy + Faker) para sembrar bases de datos de benchmarks"""
+from datetime import timedelta
+
+import factory
+from django.utils import timezone
+from factory import fuzzy
+
+from core.models import DeliverySpeed, GrainType, ProcessStage
+from inventory.models import InventoryItem, RawGrain
+from orders.models import Order
+from production.models import ProductBatch, ProductionTask
+
+
+class InventoryItemFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = InventoryItem
+
+    sku = factory.Sequence(lambda n: f'LOAD-{n:05d}')
+    name = factory.LazyAttribute(lambda item: f'Café {item.sku}')
+    type = fuzzy.FuzzyChoice(GrainType.values)
+    stock_kg = fuzzy.FuzzyFloat(5_000, 20_000)
+    min_stock_kg = fuzzy.FuzzyFloat(10, 50)
+    supplier = factory.Faker('company', locale='es_ES')
+
+
+class RawGrainFactory(factory.django.DjangoModelFactory):
+    """Lote recibido con sus kg aún sin consumir (una capa FIFO completa)"""
+
+    class Meta:
+        model = RawGrain
+
+    inventory_item = factory.SubFactory(InventoryItemFactory)
+    supplier = factory.SelfAttribute('inventory_item.supplier')
+    type = factory.SelfAttribute('inventory_item.type')
+    origin = factory.Faker('city', locale='es_ES')
+    lot_code = factory.Sequence(lambda n: f'LOAD-LOT-{n:06d}')
+    quantity_kg = factory.SelfAttribute('inventory_item.stock_kg')
+    remaining_kg = factory.SelfAttribute('quantity_kg')
+    unit_cost = fuzzy.FuzzyDecimal(3.5, 6.5)
+
+
+class ProductionTaskFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ProductionTask
+
+    stage = fuzzy.FuzzyChoice(ProcessStage.values)
+    assigned_unit = fuzzy.FuzzyChoice(['Línea de Producción 1', 'Línea de Producción 2'])
+    planned_kg = fuzzy.FuzzyFloat(5, 50)
+
+
+class ProductBatchFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ProductBatch
+
+    production_task = factory.SubFactory(ProductionTaskFactory, stage=ProcessStage.COMPLETADO, progress=100)
+    code = factory.Sequence(lambda n: f'LOAD-B{n:06d}')
+    coffee_type = fuzzy.FuzzyChoice(GrainType.values)
+    qty_kg = factory.SelfAttribute('production_task.planned_kg')
+    cupping_score = fuzzy.FuzzyFloat(80, 95)
+    mfg_date = factory.LazyFunction(lambda: timezone.now().date())
+    expiry_date = factory.LazyAttribute(lambda batch: batch.mfg_date + timedelta(days=365))
+
+
+class OrderFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Order
+
+    customer = factory.Faker('name', locale='es_ES')
+    delivery_speed = fuzzy.FuzzyChoice(DeliverySpeed.values)
+    status = fuzzy.FuzzyChoice([status for status, _ in Order.STATUS_CHOICES])
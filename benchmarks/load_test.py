@@ -0,0 +1,258 @@
+"""
+Prueba de carga de los flujos de planta sobre una BD de prueba sembrada con factory_boy:
+inventario (agregar/consumir), producción (iniciar → avanzar → lote), pedidos
+(crear → enviar → estado) y descarga de reportes. Reporta p50/p95/p99 y peticiones
+por segundo por endpoint, y compara contra una línea base guardada en JSON.
+
+    python -m benchmarks.load_test                         # compara con la línea base si existe
+    python -m benchmarks.load_test --threads 4 --iterations 400
+    python -m benchmarks.load_test --save-baseline         # guarda benchmarks/baselines/load_test.json
+    python -m benchmarks.load_test --fail-on-regression    # código de salida 1 si hay regresiones
+"""
+import argparse
+import json
+import logging
+import math
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from benchmarks.utils import setup_django, test_database
+
+setup_django()
+
+import factory.random  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.db import close_old_connections, connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from benchmarks.factories import (OrderFactory, ProductBatchFactory, ProductionTaskFactory,  # noqa: E402
+                                  RawGrainFactory)
+from orders.models import Order  # noqa: E402
+from production.models import ProductionTask  # noqa: E402
+
+BASELINE_PATH = Path(__file__).parent / 'baselines' / 'load_test.json'
+SKUS = 40
+
+
+class LatencyRecorder:
+    """Latencias (s) y errores por endpoint, compartidos entre los hilos de carga"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def request(self, client: Client, endpoint: str, method: str, url: str, data=None):
+        start = time.perf_counter()
+        response = getattr(client, method)(url, data) if data is not None else getattr(client, method)(url)
+        if hasattr(response, 'streaming_content'):
+            b''.join(response.streaming_content)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies[endpoint].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[endpoint] += 1
+        return response
+
+
+def percentile(ordered, q: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+# Flujos: cada uno recibe su cliente, el registrador y un random propio del hilo
+
+_start_lock = threading.Lock()
+_customers = iter(range(sys.maxsize))
+
+
+def inventory_flow(client, recorder, rng):
+    sku = f'LOAD-{rng.randrange(SKUS):05d}'
+    recorder.request(client, 'inventory:add_stock', 'post', reverse('inventory:add_stock'),
+                     {'sku': sku, 'kg': round(rng.uniform(5, 50), 2)})
+    recorder.request(client, 'inventory:consume_stock', 'post', reverse('inventory:consume_stock'),
+                     {'sku': sku, 'kg': round(rng.uniform(1, 20), 2)})
+    recorder.request(client, 'inventory:dashboard', 'get', reverse('inventory:dashboard'))
+
+
+def production_flow(client, recorder, rng):
+    sku = f'LOAD-{rng.randrange(SKUS):05d}'
+    # La vista redirige sin devolver el id: se toma la última tarea dentro del candado
+    with _start_lock:
+        recorder.request(client, 'production:start_production', 'post', reverse('production:start_production'),
+                         {'sku': sku, 'kg': round(rng.uniform(5, 30), 2), 'kind': 'arabica'})
+        task_id = ProductionTask.objects.order_by('-id').values_list('id', flat=True).first()
+    for _ in range(3):
+        recorder.request(client, 'production:advance_stage', 'get', reverse('production:advance_stage', args=[task_id]))
+    recorder.request(client, 'production:dashboard', 'get', reverse('production:dashboard'))
+
+
+def orders_flow(client, recorder, rng):
+    customer = f'Cliente de carga {next(_customers)}'
+    recorder.request(client, 'orders:create_order', 'post', reverse('orders:create_order'),
+                     {'customer': customer, 'delivery_speed': rng.choice(['RA', 'EC'])})
+    order_id = Order.objects.filter(customer=customer).values_list('id', flat=True).get()
+    recorder.request(client, 'orders:create_shipment', 'get', reverse('orders:create_shipment', args=[order_id]))
+    recorder.request(client, 'orders:shipment_status', 'get', reverse('orders:shipment_status', args=[order_id]))
+    recorder.request(client, 'orders:dashboard', 'get', reverse('orders:dashboard'))
+
+
+def reports_flow(client, recorder, rng):
+    recorder.request(client, 'inventory:download_report', 'get', reverse('inventory:download_report'))
+    format_type = rng.choice(['csv', 'pdf'])
+    recorder.request(client, f'production:download_report[{format_type}]', 'get',
+                     reverse('production:download_report', args=[format_type]))
+
+
+# Mezcla de flujos (peso relativo) que imita un turno de planta
+MIX = [(inventory_flow, 4), (production_flow, 2), (orders_flow, 3), (reports_flow, 1)]
+
+
+def seed(rng_seed: int):
+    factory.random.reseed_random(rng_seed)
+    RawGrainFactory.create_batch(SKUS)
+    ProductBatchFactory.create_batch(200)
+    ProductionTaskFactory.create_batch(200)
+    OrderFactory.create_batch(300)
+
+
+def run(iterations: int, threads: int, rng_seed: int):
+    recorder = LatencyRecorder()
+    flows, weights = zip(*MIX)
+
+    def worker(index: int, count: int):
+        # Los 500 cuentan como error del endpoint en lugar de detener el hilo
+        client = Client(raise_request_exception=False)
+        rng = random.Random(rng_seed + index)
+        try:
+            for flow in rng.choices(flows, weights, k=count):
+                flow(client, recorder, rng)
+        finally:
+            close_old_connections()
+
+    per_thread = [iterations // threads + (1 if i < iterations % threads else 0) for i in range(threads)]
+    workers = [threading.Thread(target=worker, args=(i, count)) for i, count in enumerate(per_thread)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return recorder, time.perf_counter() - start
+
+
+def summarize(recorder: LatencyRecorder, wall_seconds: float) -> dict:
+    summary = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        ordered = sorted(values)
+        summary[endpoint] = {
+            'count': len(ordered),
+            'errors': recorder.errors[endpoint],
+            'p50_ms': round(percentile(ordered, 50) * 1000, 2),
+            'p95_ms': round(percentile(ordered, 95) * 1000, 2),
+            'p99_ms': round(percentile(ordered, 99) * 1000, 2),
+            'rps': round(len(ordered) / wall_seconds, 2),
+        }
+    return summary
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list:
+    """Regresiones: p95 por encima de la línea base o rps por debajo, más allá de la tolerancia"""
+    regressions = []
+    for endpoint, current in summary.items():
+        previous = baseline.get(endpoint)
+        if previous is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {previous['p95_ms']:.1f} → {current['p95_ms']:.1f} ms")
+        if current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f"{endpoint}: {previous['rps']:.1f} → {current['rps']:.1f} peticiones/s")
+        if current['errors'] > previous['errors']:
+            regressions.append(f"{endpoint}: errores {previous['errors']} → {current['errors']}")
+    return regressions
+
+
+def print_summary(title: str, summary: dict, total_rps: float):
+    print(title)
+    print('-' * len(title))
+    print(f"{'endpoint':<38} {'n':>5} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+    for endpoint, row in summary.items():
+        print(f"{endpoint:<38} {row['count']:>5} {row['errors']:>4} {row['p50_ms']:>9.2f} "
+              f"{row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['rps']:>8.2f}")
+    print(f"{'total':<38} {'':>5} {'':>4} {'':>9} {'':>9} {'':>9} {total_rps:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200, help='Flujos a ejecutar en total')
+    parser.add_argument('--threads', type=int, default=1, help='Clientes concurrentes')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Margen antes de marcar regresión')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    options = parser.parse_args(argv)
+
+    settings.ALLOWED_HOSTS = ['testserver']
+    # Los avisos de petición lenta del middleware taparían la tabla de resultados
+    logging.getLogger('core.middleware').setLevel(logging.ERROR)
+    with ExitStack() as stack:
+        database = settings.DATABASES['default']
+        if options.threads > 1 and database['ENGINE'] == 'django.db.backends.sqlite3':
+            # La BD en memoria compartida no admite escritores concurrentes ("table is locked"):
+            # con varios hilos se usa un archivo, y los escritores esperan su turno
+            tmp = stack.enter_context(tempfile.TemporaryDirectory())
+            database['TEST']['NAME'] = f'{tmp}/load_test.sqlite3'
+            database.setdefault('OPTIONS', {})['timeout'] = 30
+        stack.enter_context(test_database())
+        seed(options.seed)
+        # Calentamiento: plantillas compiladas y conexiones abiertas antes de medir
+        run(max(len(MIX), options.iterations // 20), 1, options.seed - 1)
+        recorder, wall = run(options.iterations, options.threads, options.seed)
+        vendor = connection.vendor
+
+    summary = summarize(recorder, wall)
+    total_rps = sum(len(values) for values in recorder.latencies.values()) / wall
+    print_summary(f"Carga: {options.iterations} flujos, {options.threads} hilo(s), {wall:.1f} s", summary, total_rps)
+
+    if options.save_baseline:
+        options.baseline.parent.mkdir(parents=True, exist_ok=True)
+        options.baseline.write_text(json.dumps({
+            'meta': {
+                'created_at': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'database': vendor,
+                'iterations': options.iterations,
+                'threads': options.threads,
+            },
+            'endpoints': summary,
+        }, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(f"\nLínea base guardada en {options.baseline}")
+        return 0
+
+    if not options.baseline.exists():
+        print(f"\nSin línea base ({options.baseline}); use --save-baseline para crearla")
+        return 0
+
+    baseline = json.loads(options.baseline.read_text(encoding='utf-8'))
+    meta = baseline['meta']
+    if (meta['threads'], meta['database'], meta.get('iterations')) != (options.threads, vendor, options.iterations):
+        print(f"\n⚠️ La línea base se tomó con {meta.get('iterations')} flujos y {meta['threads']} hilo(s) sobre "
+              f"{meta['database']}: la comparación no es directa")
+    regressions = compare(summary, baseline['endpoints'], options.tolerance)
+    print(f"\nComparado con la línea base del {meta['created_at']} (tolerancia {options.tolerance:.0%}):")
+    for line in regressions or ['sin regresiones']:
+        print(f"  {'⚠️ ' if regressions else '✅ '}{line}")
+    return 1 if regressions and options.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Rendimiento de construcción de cotizaciones con ProductFactory/ComboFactory.
+
+Compara las dataclasses anteriores (con __dict__ y una taza/filtro nuevo por combo)
+contra los productos congelados con __slots__ y tazas/filtros compartidos.
+
+    python -m benchmarks.product_factory
+"""
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from benchmarks.utils import setup_django, test_database
+
+setup_django()
+
+from core.factories import ComboFactoryCreator, CoffeeProduct  # noqa: E402
+
+SAMPLE = 100_000
+LEVELS = ('beginner', 'premium', 'professional')
+COFFEES = ('arabica', 'robusta', 'blend')
+
+
+# Réplica de las clases anteriores para la comparación
+@dataclass
+class LegacyCoffee:
+    weight_kg: float
+    origin: str = "Etiopía"
+
+
+@dataclass
+class LegacyMug:
+    design: str
+    material: str
+    capacity_ml: int
+    price: float
+
+
+@dataclass
+class LegacyFilter:
+    size: str
+    type: str
+    quantity: int
+    price: float
+
+
+@dataclass
+class LegacyCombo:
+    coffee: LegacyCoffee
+    mug: LegacyMug
+    filter: LegacyFilter
+    combo_name: str
+    discount: float = 0.10
+
+
+def build_legacy(n):
+    return [
+        LegacyCombo(LegacyCoffee(0.25 + i % 4), LegacyMug("Básica Cerámica", "Cerámica", 300, 8.0),
+                    LegacyFilter("Nº2", "Papel", 40, 5.0), "Combo Principiante")
+        for i in range(n)
+    ]
+
+
+def build_current(n):
+    factories = [ComboFactoryCreator.create_factory(level) for level in LEVELS]
+    return [factories[i % 3].create_combo(COFFEES[i % 3], 0.25 + i % 4) for i in range(n)]
+
+
+def throughput(builder, n):
+    gc.collect()
+    start = time.perf_counter()
+    builder(n)
+    return n / (time.perf_counter() - start)
+
+
+def memory_per_million_mib(builder, n):
+    gc.collect()
+    tracemalloc.start()
+    objects = builder(n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current * (1_000_000 / n) / 1024 ** 2
+
+
+def main():
+    assert not hasattr(ComboFactoryCreator.create_factory('beginner').create_combo('arabica', 1), '__dict__')
+    assert isinstance(ComboFactoryCreator.create_factory('beginner').create_combo('arabica', 1).coffee, CoffeeProduct)
+    build_current(1000)  # calentar la caché de precios
+
+    print(f"{'Variante':<36} {'cotizaciones/s':>16} {'MiB por millón':>16}")
+    for name, builder in (('dataclasses con __dict__ (anterior)', build_legacy),
+                          ('slots + flyweight (actual)', build_current)):
+        rate, mib = throughput(builder, SAMPLE), memory_per_million_mib(builder, SAMPLE)
+        print(f"{name:<36} {rate:>16,.0f} {mib:>16,.1f}")
+    print("(La variante anterior no incluye la búsqueda de precios ni el registro de fábricas.)")
+
+
+if __name__ == '__main__':
+    with test_database():
+        main()
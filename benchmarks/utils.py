@@ -0,0 +1,38 @@
+import os
+import timeit
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django(settings_module: str = 'cafearoma.settings'):
+    """Configura Django para scripts que se ejecutan fuera de manage.py"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+@contextmanager
+def test_database(verbosity: int = 0):
+    """Crea las bases de datos de prueba (migradas) y las elimina al terminar"""
+    from django.test.utils import setup_databases, teardown_databases
+
+    old_config = setup_databases(verbosity=verbosity, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=verbosity)
+
+
+def per_call_us(func, number: int = 1000, repeat: int = 5) -> float:
+    """Mejor tiempo por llamada en microsegundos (mínimo de varias repeticiones)"""
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return best / number * 1_000_000
+
+
+def print_comparison(title: str, rows):
+    """Imprime una tabla simple antes/después: rows = [(nombre, µs por llamada), ...]"""
+    print(title)
+    print('-' * len(title))
+    baseline = rows[0][1]
+    for name, value in rows:
+        print(f"{name:<40} {value:>12.2f} µs   x{baseline / value:,.1f}")
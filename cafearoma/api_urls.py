@@ -0,0 +1,17 @@
+"""API JSON versionada: /api/v1/"""
+from rest_framework.routers import DefaultRouter
+
+from inventory.api import InventoryItemViewSet, RawGrainViewSet
+from orders.api import DeliveryViewSet, OrderViewSet
+from production.api import ProductBatchViewSet, ProductionTaskViewSet
+
+router = DefaultRouter()
+router.register('inventory/items', InventoryItemViewSet, basename='inventory-item')
+router.register('inventory/raw-grains', RawGrainViewSet, basename='raw-grain')
+router.register('production/tasks', ProductionTaskViewSet, basename='production-task')
+router.register('production/batches', ProductBatchViewSet, basename='product-batch')
+router.register('orders', OrderViewSet, basename='order')
+router.register('deliveries', DeliveryViewSet, basename='delivery')
+
+app_name = 'api'
+urlpatterns = router.urls
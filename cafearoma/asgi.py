@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Con ASYNC_DASHBOARDS = True los dashboards principal y de pedidos usan sus vistas async
+(core.async_db), que lanzan las consultas independientes a la vez.
 """
 
 import os
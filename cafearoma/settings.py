@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "rest_framework",
 
     'core',
     'inventory',
@@ -47,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestMetricsMiddleware",
+    "core.db_router.ReadYourWritesMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -74,6 +77,16 @@ TEMPLATES = [
     },
 ]
 
+# Fuera de DEBUG las plantillas se compilan una sola vez por proceso (cargador con caché)
+if not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = "cafearoma.wsgi.application"
 
 
@@ -87,6 +100,33 @@ DATABASES = {
     }
 }
 
+# Réplica de lectura para reportes y análisis (core.db_router). En local se prueba con una
+# copia del archivo, abierta en solo lectura:
+#   cp db.sqlite3 replica.sqlite3 && CAFEAROMA_REPLICA_DB=replica.sqlite3 python manage.py runserver
+if os.environ.get("CAFEAROMA_REPLICA_DB"):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"file:{BASE_DIR / os.environ['CAFEAROMA_REPLICA_DB']}?mode=ro",
+        "OPTIONS": {"uri": True},
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["core.db_router.PrimaryReplicaRouter"]
+REPLICA_DATABASE_ALIAS = "replica"
+# Tras una escritura, el navegador lee del primario durante estos segundos (retraso de la réplica)
+REPLICA_PIN_SECONDS = 5
+
+
+# Caché: fragmentos de los dashboards y contadores de versión por modelo (core.versioning).
+# Es local al proceso; con varios workers usar una caché compartida (ver production_settings).
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "cafearoma",
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -129,3 +169,62 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Lista de precios: cada cuántos segundos un proceso comprueba si subió la versión
+PRICING_VERSION_CHECK_SECONDS = 30
+
+# Eventos de stock: ventana (segundos) en la que se agrupan antes de notificar a los
+# observadores. 0 = entrega síncrona dentro de la petición.
+STOCK_EVENTS_WINDOW_SECONDS = 2.0
+PURCHASING_ALERT_RECIPIENTS = ['compras@cafearoma.com']
+
+# Reposición automática: nivel objetivo = stock mínimo × factor (si el item no define uno)
+REPLENISHMENT_TARGET_FACTOR = 2.0
+
+# Métricas por vista (core.middleware): tiempo, consultas SQL y duplicadas, expuestas en /metrics.
+# Las peticiones por encima del presupuesto se registran con sus consultas más lentas.
+REQUEST_METRICS_ENABLED = True
+REQUEST_METRICS_BUDGET_MS = 500
+REQUEST_METRICS_SLOW_QUERIES = 5
+# /metrics solo responde a usuarios staff o a estas IP (REMOTE_ADDR: detrás de un proxy, la suya)
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Trazas de las operaciones de dominio (core.tracing): el muestreo se decide por traza.
+# Exportadores disponibles: LoggingExporter, JsonFileExporter (TRACING_JSON_PATH), InMemoryExporter.
+TRACING_SAMPLE_RATE = 1.0 if DEBUG else 0.01
+TRACING_EXPORTERS = ['core.tracing.LoggingExporter']
+TRACING_JSON_PATH = BASE_DIR / 'traces.jsonl'
+
+# API JSON (/api/v1/): paginación por cursor sobre el id en todos los listados
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'core.api.IdCursorPagination',
+    'PAGE_SIZE': 100,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': ['rest_framework.parsers.JSONParser'],
+}
+
+# GET condicional (core.conditional): el ETag combina las versiones de los modelos con esta
+# marca de versión del despliegue, para que un cambio de plantillas invalide las copias de los navegadores
+ETAG_RELEASE = ''
+
+# Claves de idempotencia (core.idempotency): cuánto se guarda cada respuesta y cuánto espera
+# una petición repetida a que termine la original. Limpieza: manage.py purge_idempotency_keys
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+IDEMPOTENCY_WAIT_SECONDS = 5
+
+# Inventario por ubicación (inventory.locations): donde queda el stock de los movimientos
+# que no indican ubicación y el stock inicial de los SKU nuevos
+DEFAULT_LOCATION_CODE = 'TOSTADURIA'
+
+# Dashboards async (core.async_db): con ASGI, las consultas independientes del dashboard
+# principal y del de pedidos se lanzan a la vez, cada una en su conexión. Con WSGI dejar en False.
+ASYNC_DASHBOARDS = False
+ASYNC_DASHBOARD_PARALLEL = True
+
+# Control estadístico de procesos (production.spc): subgrupos de lotes consecutivos para las
+# cartas X̄/R y parámetros de la EWMA. Las alertas empiezan tras SPC_MIN_SUBGROUPS subgrupos.
+SPC_SUBGROUP_SIZE = 5
+SPC_MIN_SUBGROUPS = 3
+SPC_EWMA_LAMBDA = 0.2
+SPC_EWMA_L = 3.0
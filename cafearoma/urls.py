@@ -26,4 +26,5 @@ urlpatterns = [
     path('production/', include('production.urls')),
     path('products/', include('products.urls')),
     path('orders/', include('orders.urls')),
+    path('api/v1/', include('cafearoma.api_urls')),
 ]
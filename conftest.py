@@ -1,8 +1,19 @@
 import os
 import django
+import pytest
 from django.conf import settings
 
 # Configurar Django antes de que pytest importe los tests
 def pytest_configure():
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cafearoma.settings')
-    django.setup()
\ No newline at end of file
+    django.setup()
+    # Eventos de stock síncronos: sin hilo despachador durante las pruebas
+    settings.STOCK_EVENTS_WINDOW_SECONDS = 0
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Fragmentos y contadores de versión viven en la caché, no en la BD que se revierte
+    from django.core.cache import cache
+    cache.clear()
+    yield
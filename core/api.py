@@ -0,0 +1,137 @@
+import math
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from .conditional import compute_etag
+
+# Piezas comunes de la API JSON (/api/v1/)
+
+
+class IdCursorPagination(CursorPagination):
+    """Paginación por cursor sobre el id: páginas estables aunque se inserten filas, sin OFFSET"""
+    ordering = '-id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+def positive_kg(value: float) -> float:
+    """Validador de cantidades en kg: FloatField acepta "NaN" e "Infinity", que no son cantidades"""
+    if not math.isfinite(value) or value <= 0:
+        raise ValidationError('Los kg deben ser un número mayor que cero')
+    return value
+
+
+class ProjectedSerializer(serializers.ModelSerializer):
+    """Serializer que admite `fields=` para devolver solo un subconjunto de sus campos"""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class ProjectedListMixin:
+    """
+    Proyección de campos en las lecturas: `?fields=sku,stock_kg` recorta la respuesta y la
+    consulta se limita con .only() a las columnas que el serializer realmente usa.
+    Las relaciones inversas se declaran en `prefetch_fields` ({campo: Prefetch}).
+    """
+    prefetch_fields = {}
+
+    def requested_fields(self):
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = self._parse_fields() if self.action in ('list', 'retrieve') else None
+        return self._requested_fields
+
+    def _parse_fields(self):
+        available = self.get_serializer_class()().fields
+        raw = self.request.query_params.get('fields')
+        if not raw:
+            return list(available)
+        requested = [name.strip() for name in raw.split(',') if name.strip()]
+        unknown = sorted(set(requested) - set(available))
+        if unknown:
+            raise ValidationError({'fields': f"Campos desconocidos: {', '.join(unknown)}"})
+        return requested
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.requested_fields()
+        if fields is None:
+            return queryset
+
+        model = queryset.model
+        columns = {'id'}
+        serializer_fields = self.get_serializer_class()().fields
+        for name in fields:
+            if name in self.prefetch_fields:
+                queryset = queryset.prefetch_related(self.prefetch_fields[name])
+                continue
+            source = serializer_fields[name].source.split('.')[0]
+            try:
+                field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete:
+                columns.add(field.name)
+        return queryset.only(*columns)
+
+
+class VersionedReadMixin:
+    """
+    GET condicional en list/retrieve: el ETag sale de las versiones de `versioned_models`
+    (por defecto, el modelo del queryset) y de la URL completa, sin tocar la base de datos.
+    """
+    versioned_models = ()
+
+    def _etag(self, request) -> str:
+        refs = self.versioned_models or (self.queryset.model,)
+        return quote_etag(compute_etag(type(self).__qualname__, refs, [request.get_full_path()]))
+
+    def _conditional(self, request, render, *args, **kwargs):
+        etag = self._etag(request)
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response = render(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, super().retrieve, *args, **kwargs)
+
+
+def bulk_payload(data, serializer_class):
+    """Valida un cuerpo en lote (lista de objetos) con el serializer dado"""
+    if not isinstance(data, list) or not data:
+        raise ValidationError({'detail': 'Se esperaba una lista no vacía de elementos'})
+    serializer = serializer_class(data=data, many=True)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+class BulkItemError(APIException):
+    """Falla de un elemento del lote; lanzada dentro de transaction.atomic() revierte el lote completo"""
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = 'bulk_item_error'
+
+    def __init__(self, index: int, message: str):
+        # Se asigna tal cual para que `index` llegue como número y no como texto
+        self.detail = {'index': index, 'detail': message}
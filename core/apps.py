@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from inventory.repositories import DjangoInventoryRepo
+        from .inventory_manager import InventoryManager
+        from .observers import ResponsableDeCompras
+        from .versioning import connect_signals
+
+        InventoryManager(DjangoInventoryRepo()).attach(ResponsableDeCompras())
+        connect_signals()
@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Callable, Dict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+# Consultas independientes de los dashboards async (ASGI), lanzadas a la vez.
+# Los métodos async del ORM (acount, aaggregate...) delegan en un único hilo
+# (sync_to_async thread_sensitive) y con asyncio.gather se ejecutan igual una tras otra.
+# Aquí cada consulta corre en un hilo propio del pool, con su propia conexión, y la
+# latencia queda acotada por la más lenta en lugar de por la suma.
+
+
+def _parallel_allowed() -> bool:
+    """Solo si cada hilo puede ver los mismos datos con otra conexión"""
+    if not getattr(settings, 'ASYNC_DASHBOARD_PARALLEL', True):
+        return False
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.in_atomic_block:
+        # Una transacción abierta (p. ej. en las pruebas) solo la ve su propia conexión
+        return False
+    return not (connection.vendor == 'sqlite' and connection.is_in_memory_db())
+
+
+def _on_own_connection(query: Callable[[], Any]) -> Callable[[], Any]:
+    def run():
+        try:
+            return query()
+        finally:
+            # Como al terminar una petición: se respeta CONN_MAX_AGE de la conexión del hilo
+            close_old_connections()
+    return run
+
+
+async def gather_queries(**queries: Callable[[], Any]) -> Dict[str, Any]:
+    """
+    Ejecuta consultas síncronas independientes (`total=Model.objects.count`, ...) y devuelve
+    {nombre: resultado}. Si la BD no admite conexiones paralelas, las ejecuta en serie como
+    el ORM async.
+    """
+    if await sync_to_async(_parallel_allowed)():
+        calls = [sync_to_async(_on_own_connection(query), thread_sensitive=False)() for query in queries.values()]
+    else:
+        calls = [sync_to_async(query)() for query in queries.values()]
+    return dict(zip(queries, await asyncio.gather(*calls)))
@@ -0,0 +1,79 @@
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Callable, Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.views.decorators.http import condition
+
+from . import versioning
+from .db_router import track_replica_reads
+
+# GET condicional a partir de los contadores de versión de core.versioning: el ETag se
+# calcula con una lectura a la caché, sin ejecutar las consultas de la vista. Si nada
+# cambió, el navegador recibe un 304 sin render ni agregados.
+
+VaryFunc = Callable[..., Iterable]
+
+
+def compute_etag(name: str, refs: Iterable, extra: Iterable = ()) -> str:
+    versions = versioning.get_versions(*refs)
+    parts = [getattr(settings, 'ETAG_RELEASE', ''), name, *(str(versions[ref]) for ref in refs),
+             *(str(value) for value in extra)]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+
+
+def has_pending_messages(request) -> bool:
+    """Mensajes flash por mostrar: la página no es la misma aunque los datos no cambien"""
+    return len(get_messages(request)) > 0
+
+
+def page_variant(request) -> list:
+    """Lo que cambia por visitante en un dashboard: el token CSRF de sus formularios"""
+    return [versioning.csrf_variant(request)]
+
+
+def _without_replica_etag(response, reads):
+    """Contenido leído de la réplica (puede ir atrasado): no se etiqueta con la versión actual"""
+    if reads.used and response.has_header('ETag'):
+        del response['ETag']
+    return response
+
+
+def versioned_condition(*refs, vary_on: Optional[VaryFunc] = None):
+    """
+    condition() con ETag por versión de modelos. `vary_on(request, *args, **kwargs)` agrega
+    lo que además distingue la respuesta (formato, token CSRF, sesión...).
+    Con mensajes pendientes se sirve la vista tal cual, sin ETag, para no perderlos.
+    """
+    def decorator(view):
+        name = f'{view.__module__}.{view.__qualname__}'
+
+        def etag_func(request, *args, **kwargs):
+            extra = vary_on(request, *args, **kwargs) if vary_on else ()
+            return compute_etag(name, refs, extra)
+
+        conditional_view = condition(etag_func=etag_func)(view)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                # Los mensajes viven en la sesión (consulta síncrona)
+                if await sync_to_async(has_pending_messages)(request):
+                    return await view(request, *args, **kwargs)
+                with track_replica_reads() as reads:
+                    response = await conditional_view(request, *args, **kwargs)
+                return _without_replica_etag(response, reads)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if has_pending_messages(request):
+                return view(request, *args, **kwargs)
+            with track_replica_reads() as reads:
+                response = conditional_view(request, *args, **kwargs)
+            return _without_replica_etag(response, reads)
+        return wrapper
+    return decorator
@@ -0,0 +1,148 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Réplica de lectura para reportes y análisis. Nada va a la réplica por defecto: solo las
+# lecturas dentro de `with read_replica():`. Una petición que escribe queda fijada al primario
+# (lee lo que acaba de escribir) y, con una cookie, también las siguientes REPLICA_PIN_SECONDS,
+# mientras la réplica alcanza al primario.
+
+PIN_COOKIE = 'primary_pin'
+
+
+@dataclass
+class _RequestState:
+    pinned: bool = False
+    wrote: bool = False
+
+
+@dataclass
+class ReplicaReads:
+    used: bool = False
+
+
+_use_replica: ContextVar[bool] = ContextVar('use_replica', default=False)
+_request_state: ContextVar[Optional[_RequestState]] = ContextVar('db_request_state', default=None)
+_replica_reads: ContextVar[Optional[ReplicaReads]] = ContextVar('replica_reads', default=None)
+
+
+def replica_alias() -> Optional[str]:
+    """Alias de la réplica si está configurada en DATABASES"""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def read_replica():
+    """Las lecturas del bloque van a la réplica (salvo que la petición esté fijada al primario)"""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Fuerza el primario dentro de un bloque read_replica() (p. ej. un dato recién escrito)"""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def track_replica_reads():
+    """
+    Registra si alguna lectura del bloque fue a la réplica. Lo leído de la réplica puede ir
+    atrasado: no debe guardarse bajo la versión actual de los modelos (cachés, ETag).
+    """
+    reads = ReplicaReads()
+    token = _replica_reads.set(reads)
+    try:
+        yield reads
+    finally:
+        _replica_reads.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Escrituras y migraciones al primario; lecturas a la réplica solo dentro de read_replica()"""
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if alias is None or not _use_replica.get():
+            return DEFAULT_DB_ALIAS
+        state = _request_state.get()
+        if state is not None and (state.pinned or state.wrote):
+            return DEFAULT_DB_ALIAS
+        # Dentro de una transacción se lee lo que ella misma ve
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        reads = _replica_reads.get()
+        if reads is not None:
+            reads.used = True
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplica tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica se alimenta por replicación, no por migraciones
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReadYourWritesMiddleware:
+    """
+    Fija al primario las peticiones que escriben y, por cookie, las siguientes
+    REPLICA_PIN_SECONDS del mismo navegador. Sin réplica configurada no se instala.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if replica_alias() is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = _RequestState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self._pin(state, response)
+
+    async def __acall__(self, request):
+        # El estado es mutable: lo que marquen los hilos de sync_to_async se ve aquí
+        state = _RequestState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self._pin(state, response)
+
+    def _pin(self, state: _RequestState, response):
+        if state.wrote:
+            response.set_cookie(PIN_COOKIE, '1', max_age=self.pin_seconds, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,145 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StockEvent:
+    """Cambio de stock de un SKU, con el estado resultante para no volver a consultar la BD"""
+    sku: str
+    delta_kg: float
+    stock_kg: float
+    min_stock_kg: float
+    occurred_at: datetime = field(default_factory=timezone.now)
+
+    @classmethod
+    def from_item(cls, item, delta_kg: float) -> 'StockEvent':
+        return cls(sku=item.sku, delta_kg=delta_kg, stock_kg=item.stock_kg, min_stock_kg=item.min_stock_kg)
+
+    @property
+    def is_low(self) -> bool:
+        return self.stock_kg <= self.min_stock_kg
+
+
+def latest_per_sku(events: List[StockEvent]) -> List[StockEvent]:
+    """Coalesce una ventana de eventos: se queda con el último estado de cada SKU"""
+    latest = {}
+    for event in events:
+        latest[event.sku] = event
+    return list(latest.values())
+
+
+class StockEventPipeline:
+    """
+    Cola en proceso de eventos de stock con un hilo despachador en segundo plano.
+
+    El despachador agrupa los eventos que llegan durante STOCK_EVENTS_WINDOW_SECONDS
+    y entrega la ventana completa a cada observador una sola vez. Los correos que
+    devuelven los observadores salen por una única conexión del backend de email.
+    Con una ventana de 0 (p. ej. en pruebas) la entrega es síncrona en el hilo que publica.
+    """
+
+    def __init__(self, subject):
+        self.subject = subject
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        atexit.register(self.stop)
+
+    @property
+    def window(self) -> float:
+        return getattr(settings, 'STOCK_EVENTS_WINDOW_SECONDS', 2.0)
+
+    def publish(self, event: StockEvent) -> None:
+        if self.window <= 0:
+            self.deliver([event])
+            return
+        # El despachador lee la BD desde otro hilo: solo encolar lo que ya está confirmado
+        transaction.on_commit(lambda: self._enqueue(event))
+
+    def _enqueue(self, event: StockEvent) -> None:
+        self._queue.put(event)
+        self._ensure_started()
+
+    def flush(self) -> int:
+        """Entrega en el hilo actual todo lo pendiente; devuelve cuántos eventos se procesaron"""
+        events = self._drain()
+        if events:
+            self.deliver(events)
+        return len(events)
+
+    def deliver(self, events: List[StockEvent]) -> None:
+        outbox = []
+        # En el despachador (otro hilo) la entrega abre su propia traza
+        with span('events.deliver', events=len(events)):
+            for observer in list(self.subject._observers):
+                try:
+                    with span('events.observer', observer=type(observer).__name__):
+                        outbox.extend(observer.update_many(self.subject, events) or [])
+                except Exception:
+                    logger.exception("El observador %r falló al procesar %d eventos", observer, len(events))
+            if outbox:
+                # Una sola conexión para todos los resúmenes de la ventana
+                with span('events.send_mail', messages=len(outbox)):
+                    connection = get_connection(fail_silently=True)
+                    connection.send_messages(outbox)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Detiene el despachador y entrega lo que quede en la cola"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+        self._stopping.clear()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='stock-event-dispatcher', daemon=True)
+                self._thread.start()
+
+    def _drain(self) -> List[StockEvent]:
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            events = [first]
+            deadline = time.monotonic() + self.window
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    events.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self.deliver(events)
+            finally:
+                close_old_connections()
@@ -1,9 +1,14 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Tuple
+from dataclasses import dataclass, fields
+from typing import ClassVar, Dict, FrozenSet, Tuple, Type
+from products.pricing import price_book
 
 # Productos de Café (Factory Method - YA IMPLEMENTADO)
+# Los productos son dataclasses congeladas con __slots__: sin __dict__ por instancia,
+# porque se crean en grandes cantidades para cotizaciones y exportaciones de catálogo.
 class CoffeeProduct(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def label(self) -> str:
         pass
@@ -12,7 +17,7 @@ class CoffeeProduct(ABC):
     def get_price_per_kg(self) -> float:
         pass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ArabicaCoffee(CoffeeProduct):
     weight_kg: float
     origin: str = "Etiopía"
@@ -21,9 +26,9 @@ class ArabicaCoffee(CoffeeProduct):
         return f"Café Arábica Premium ({self.origin}) - {self.weight_kg}kg"
     
     def get_price_per_kg(self) -> float:
-        return 45.00  # Precio por kg
+        return price_book.coffee_price_per_kg('arabica')
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RobustaCoffee(CoffeeProduct):
     weight_kg: float
     origin: str = "Vietnam"
@@ -32,9 +37,9 @@ class RobustaCoffee(CoffeeProduct):
         return f"Café Robusta Intenso ({self.origin}) - {self.weight_kg}kg"
     
     def get_price_per_kg(self) -> float:
-        return 35.00  # Precio por kg
+        return price_book.coffee_price_per_kg('robusta')
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BlendCoffee(CoffeeProduct):
     weight_kg: float
     ratio: str
@@ -44,46 +49,82 @@ class BlendCoffee(CoffeeProduct):
         return f"Blend {self.blend_name} ({self.ratio}) - {self.weight_kg}kg"
     
     def get_price_per_kg(self) -> float:
-        return 40.00  # Precio por kg
+        return price_book.coffee_price_per_kg('blend')
 
-# Factory Method para productos de café
+# Factory Method para productos de café, con registro de tipos (plugins)
 class ProductFactory:
+    # kind -> (clase, campos que acepta, valores por defecto del factory)
+    _registry: Dict[str, Tuple[Type[CoffeeProduct], FrozenSet[str], Dict[str, object]]] = {}
+
+    @classmethod
+    def register(cls, kind: str, product_cls: Type[CoffeeProduct], **defaults) -> None:
+        """Registra un nuevo tipo de café; los kwargs que la clase no conoce se ignoran al crear"""
+        accepted = frozenset(f.name for f in fields(product_cls))
+        cls._registry[kind] = (product_cls, accepted, defaults)
+
+    @classmethod
+    def available_kinds(cls) -> Tuple[str, ...]:
+        return tuple(cls._registry)
+
     def create(self, kind: str, weight_kg: float, **kwargs) -> CoffeeProduct:
-        if kind == 'arabica':
-            origin = kwargs.get('origin', 'Etiopía')
-            return ArabicaCoffee(weight_kg=weight_kg, origin=origin)
-        elif kind == 'robusta':
-            origin = kwargs.get('origin', 'Vietnam')
-            return RobustaCoffee(weight_kg=weight_kg, origin=origin)
-        elif kind == 'blend':
-            ratio = kwargs.get('ratio', '50:50')
-            blend_name = kwargs.get('blend_name', 'House Blend')
-            return BlendCoffee(weight_kg=weight_kg, ratio=ratio, blend_name=blend_name)
-        else:
+        try:
+            product_cls, accepted, defaults = self._registry[kind]
+        except KeyError:
             raise ValueError(f"Tipo de café desconocido: {kind}")
+        if kwargs:
+            options = {**defaults, **{key: value for key, value in kwargs.items() if key in accepted}}
+        else:
+            options = defaults
+        return product_cls(weight_kg, **options)
+
+ProductFactory.register('arabica', ArabicaCoffee)
+ProductFactory.register('robusta', RobustaCoffee)
+ProductFactory.register('blend', BlendCoffee, ratio='50:50')
 
 # Productos para Combos (Abstract Factory - A IMPLEMENTAR)
-@dataclass
+# Tazas y filtros idénticos se comparten (Flyweight) con `shared()`: todos los combos
+# de un mismo nivel y precio apuntan a la misma instancia inmutable.
+@dataclass(frozen=True, slots=True)
 class Mug:
     design: str
     material: str
     capacity_ml: int
     price: float
+
+    _pool: ClassVar[Dict[tuple, 'Mug']] = {}
+
+    @classmethod
+    def shared(cls, design: str, material: str, capacity_ml: int, price: float) -> 'Mug':
+        key = (design, material, capacity_ml, price)
+        mug = cls._pool.get(key)
+        if mug is None:
+            mug = cls._pool.setdefault(key, cls(*key))
+        return mug
     
     def __str__(self) -> str:
         return f"Taza {self.design} ({self.material}, {self.capacity_ml}ml)"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Filter:
     size: str
     type: str
     quantity: int
     price: float
+
+    _pool: ClassVar[Dict[tuple, 'Filter']] = {}
+
+    @classmethod
+    def shared(cls, size: str, type: str, quantity: int, price: float) -> 'Filter':
+        key = (size, type, quantity, price)
+        filter = cls._pool.get(key)
+        if filter is None:
+            filter = cls._pool.setdefault(key, cls(*key))
+        return filter
     
     def __str__(self) -> str:
         return f"Filtro {self.size} ({self.type}, {self.quantity} unidades)"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Combo:
     coffee: CoffeeProduct
     mug: Mug
@@ -113,31 +154,33 @@ class ComboFactory(ABC):
     def get_combo_type(self) -> str:
         pass
 
+_product_factory = ProductFactory()
+
 # Fábricas Concretas para diferentes tipos de combos
 class BeginnerComboFactory(ComboFactory):
     def create_combo(self, coffee_type: str, coffee_weight: float) -> Combo:
-        coffee_factory = ProductFactory()
-        coffee = coffee_factory.create(coffee_type, coffee_weight)
+        coffee = _product_factory.create(coffee_type, coffee_weight)
         
-        mug = Mug(
+        mug = Mug.shared(
             design="Básica Cerámica",
             material="Cerámica",
             capacity_ml=300,
-            price=8.00
+            price=price_book.mug_price('beginner')
         )
         
-        filter = Filter(
+        filter = Filter.shared(
             size="Nº2",
             type="Papel",
             quantity=40,
-            price=5.00
+            price=price_book.filter_price('beginner')
         )
         
         return Combo(
             coffee=coffee,
             mug=mug,
             filter=filter,
-            combo_name="Combo Principiante"
+            combo_name="Combo Principiante",
+            discount=price_book.combo_discount('beginner')
         )
     
     def get_combo_type(self) -> str:
@@ -145,21 +188,20 @@ class BeginnerComboFactory(ComboFactory):
 
 class PremiumComboFactory(ComboFactory):
     def create_combo(self, coffee_type: str, coffee_weight: float) -> Combo:
-        coffee_factory = ProductFactory()
-        coffee = coffee_factory.create(coffee_type, coffee_weight)
+        coffee = _product_factory.create(coffee_type, coffee_weight)
         
-        mug = Mug(
+        mug = Mug.shared(
             design="Premium Porcelana",
             material="Porcelana",
             capacity_ml=350,
-            price=15.00
+            price=price_book.mug_price('premium')
         )
         
-        filter = Filter(
+        filter = Filter.shared(
             size="Nº4",
             type="Algodón Orgánico",
             quantity=30,
-            price=12.00
+            price=price_book.filter_price('premium')
         )
         
         return Combo(
@@ -167,7 +209,7 @@ class PremiumComboFactory(ComboFactory):
             mug=mug,
             filter=filter,
             combo_name="Combo Premium",
-            discount=0.15  # 15% de descuento
+            discount=price_book.combo_discount('premium')
         )
     
     def get_combo_type(self) -> str:
@@ -175,21 +217,20 @@ class PremiumComboFactory(ComboFactory):
 
 class ProfessionalComboFactory(ComboFactory):
     def create_combo(self, coffee_type: str, coffee_weight: float) -> Combo:
-        coffee_factory = ProductFactory()
-        coffee = coffee_factory.create(coffee_type, coffee_weight, origin="Especial")
+        coffee = _product_factory.create(coffee_type, coffee_weight, origin="Especial")
         
-        mug = Mug(
+        mug = Mug.shared(
             design="Barista Professional",
             material="Porcelana de Gres",
             capacity_ml=400,
-            price=25.00
+            price=price_book.mug_price('professional')
         )
         
-        filter = Filter(
+        filter = Filter.shared(
             size="Nº6",
             type="Acero Inoxidable",
             quantity=1,
-            price=20.00
+            price=price_book.filter_price('professional')
         )
         
         return Combo(
@@ -197,23 +238,26 @@ class ProfessionalComboFactory(ComboFactory):
             mug=mug,
             filter=filter,
             combo_name="Combo Profesional",
-            discount=0.20  # 20% de descuento
+            discount=price_book.combo_discount('professional')
         )
     
     def get_combo_type(self) -> str:
         return "Profesional"
 
-# Fábrica para crear las fábricas de combos
+# Fábrica para crear las fábricas de combos, con registro por nivel
 class ComboFactoryCreator:
-    @staticmethod
-    def create_factory(combo_level: str) -> ComboFactory:
-        if combo_level == 'beginner':
-            return BeginnerComboFactory()
-        elif combo_level == 'premium':
-            return PremiumComboFactory()
-        elif combo_level == 'professional':
-            return ProfessionalComboFactory()
-        else:
+    # Las fábricas no guardan estado: se comparte una instancia por nivel
+    _factories: Dict[str, ComboFactory] = {}
+
+    @classmethod
+    def register(cls, combo_level: str, factory_cls: Type[ComboFactory]) -> None:
+        cls._factories[combo_level] = factory_cls()
+
+    @classmethod
+    def create_factory(cls, combo_level: str) -> ComboFactory:
+        try:
+            return cls._factories[combo_level]
+        except KeyError:
             raise ValueError(f"Nivel de combo desconocido: {combo_level}")
     
     @staticmethod
@@ -222,4 +266,8 @@ class ComboFactoryCreator:
             {'value': 'beginner', 'name': '🎯 Combo Principiante', 'description': 'Perfecto para empezar'},
             {'value': 'premium', 'name': '⭐ Combo Premium', 'description': 'Experiencia mejorada'},
             {'value': 'professional', 'name': '🏆 Combo Profesional', 'description': 'Para expertos'}
-        ]
\ No newline at end of file
+        ]
+
+ComboFactoryCreator.register('beginner', BeginnerComboFactory)
+ComboFactoryCreator.register('premium', PremiumComboFactory)
+ComboFactoryCreator.register('professional', ProfessionalComboFactory)
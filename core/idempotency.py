@@ -0,0 +1,158 @@
+import hashlib
+import json
+import time
+import uuid
+from datetime import timedelta
+from functools import wraps
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.http.request import RawPostDataException
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+# Claves de idempotencia para POSTs con efectos (stock, producción, envíos).
+# La clave llega en la cabecera Idempotency-Key (integraciones) o en el campo
+# idempotency_key de los formularios ({% idempotency_field %}). La primera petición
+# reserva la fila antes de ejecutar la vista; las repetidas esperan a que termine y
+# reciben la misma respuesta (redirección y mensajes incluidos) sin volver a ejecutarla.
+# Solo se guardan los resultados: si la operación falló (mensaje de error, o la vista marca
+# la respuesta con `response.idempotency_release = True`) la clave se libera para reintentar.
+
+HEADER = 'Idempotency-Key'
+FIELD = 'idempotency_key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+MAX_STORED_BODY = 256 * 1024
+
+
+def new_key() -> str:
+    return uuid.uuid4().hex
+
+
+def ttl() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_TTL_SECONDS', 24 * 60 * 60))
+
+
+def purge_expired() -> int:
+    """Borra las claves más antiguas que IDEMPOTENCY_TTL_SECONDS"""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=timezone.now() - ttl()).delete()
+    return deleted
+
+
+def _request_key(request) -> Tuple[Optional[str], bool]:
+    """(clave, estricta): las claves de cabecera son estrictas, las de formulario no"""
+    key = request.headers.get(HEADER)
+    if key:
+        return key.strip()[:100], True
+    key = request.POST.get(FIELD) or request.GET.get(FIELD)
+    return (key.strip()[:100], False) if key else (None, False)
+
+
+def _fingerprint(request) -> str:
+    digest = hashlib.sha256(f'{request.method} {request.get_full_path()}\n'.encode())
+    try:
+        digest.update(request.body)
+    except RawPostDataException:
+        # multipart ya leído en streaming: se usan los campos del formulario
+        digest.update(repr(sorted(request.POST.lists())).encode())
+    return digest.hexdigest()
+
+
+def _replay(request, record: IdempotencyKey) -> HttpResponse:
+    for level, text, extra_tags in record.messages:
+        messages.add_message(request, level, text, extra_tags=extra_tags, fail_silently=True)
+    response = HttpResponse(bytes(record.body), status=record.status_code,
+                            content_type=record.content_type or None)
+    if record.location:
+        response['Location'] = record.location
+    response[REPLAY_HEADER] = 'true'
+    return response
+
+
+def _failed(request, response) -> bool:
+    """La vista informó un fallo de negocio: la respuesta no se guarda"""
+    if response.status_code >= 500 or getattr(response, 'idempotency_release', False):
+        return True
+    storage = getattr(request, '_messages', None)
+    return any(message.level >= messages.ERROR for message in getattr(storage, '_queued_messages', []))
+
+
+def _store(request, record: IdempotencyKey, response) -> None:
+    if hasattr(response, 'data') and not getattr(response, 'is_rendered', True):
+        # Response de DRF aún sin renderizar: se guarda su contenido como JSON
+        body, content_type = json.dumps(response.data, cls=DjangoJSONEncoder).encode(), 'application/json'
+    elif getattr(response, 'streaming', False):
+        body, content_type = b'', response.get('Content-Type', '')
+    else:
+        body, content_type = response.content, response.get('Content-Type', '')
+
+    storage = getattr(request, '_messages', None)
+    queued = getattr(storage, '_queued_messages', [])
+    record.status_code = response.status_code
+    record.content_type = content_type
+    record.location = response.get('Location', '')
+    record.body = body if len(body) <= MAX_STORED_BODY else b''
+    record.messages = [[message.level, str(message.message), message.extra_tags] for message in queued]
+    record.save(update_fields=['status_code', 'content_type', 'location', 'body', 'messages'])
+
+
+def _wait_for(record: IdempotencyKey) -> Optional[IdempotencyKey]:
+    """Espera a que termine la petición original (doble clic: llega mientras se procesa)"""
+    deadline = time.monotonic() + getattr(settings, 'IDEMPOTENCY_WAIT_SECONDS', 5)
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        record = IdempotencyKey.objects.filter(pk=record.pk).first()
+        if record is None or record.status_code is not None:
+            return record
+    return None
+
+
+def idempotent(view):
+    """
+    Decorador de vistas con efectos. Sin clave la vista se ejecuta como siempre.
+    Misma clave y mismo contenido → respuesta guardada; misma clave de cabecera con
+    otro contenido → 422. Si la vista falla (excepción, 5xx o un fallo informado) la clave
+    se libera.
+    """
+    scope = f'{view.__module__}.{view.__qualname__}'[:100]
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key, strict = _request_key(request)
+        if not key:
+            return view(request, *args, **kwargs)
+
+        fingerprint = _fingerprint(request)
+        claims = IdempotencyKey.objects.filter(scope=scope, key=key)
+        claims.filter(created_at__lt=timezone.now() - ttl()).delete()
+        if strict and claims.exclude(fingerprint=fingerprint).exists():
+            return JsonResponse({'detail': f'La clave {key} ya se usó con otro contenido'}, status=422)
+
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(scope=scope, key=key, fingerprint=fingerprint)
+        except IntegrityError:
+            record = claims.filter(fingerprint=fingerprint).first()
+            if record is not None and record.status_code is None:
+                record = _wait_for(record)
+            if record is None:
+                # La original sigue en curso, o falló y liberó la clave: el cliente puede reintentar
+                return JsonResponse({'detail': f'La petición con clave {key} aún se está procesando'}, status=409)
+            return _replay(request, record)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if _failed(request, response):
+            record.delete()
+        else:
+            _store(request, record, response)
+        return response
+    return wrapper
@@ -1,6 +1,11 @@
 from django.core.exceptions import ObjectDoesNotExist
-from inventory.models import InventoryItem, PurchaseOrder
+from django.db import transaction
+from inventory.models import InventoryItem, PurchaseOrder, StockMovement
+from inventory.locations import adjust_stock, get_location
+from inventory.traceability import allocate_lots
 from .observers import Subject
+from .events import StockEvent, StockEventPipeline
+from .tracing import span, traced
 
 class InventoryManager(Subject):
     _instance = None
@@ -11,6 +16,7 @@ class InventoryManager(Subject):
             cls._instance = super(InventoryManager, cls).__new__(cls)
             cls._instance.repo = repo
             cls._instance._observers = []
+            cls._instance.pipeline = StockEventPipeline(cls._instance)
         return cls._instance
 
     def attach(self, observer):
@@ -20,34 +26,45 @@ class InventoryManager(Subject):
     def detach(self, observer):
         self._observers.remove(observer)
 
-    def notify(self):
-        for observer in self._observers:
-            observer.update(self)
+    @traced('inventory.notify')
+    def notify(self, *events: StockEvent):
+        # Los observadores reciben los eventos agrupados por ventana, fuera de la petición
+        for event in events:
+            self.pipeline.publish(event)
     
-    def add_stock(self, sku: str, kg: float) -> InventoryItem:
+    @traced('inventory.add_stock', record_args=('sku', 'kg', 'location'))
+    def add_stock(self, sku: str, kg: float, location: str = None) -> InventoryItem:
+        """Entrada de stock en una ubicación (por código; sin ella, la ubicación por defecto)"""
         try:
             item = self.repo.get_item(sku)
-            item.update_stock(kg)
-            self.repo.save(item)
-            # Notificar después de agregar stock
-            self.notify()
-            return item
         except ObjectDoesNotExist:
             raise ValueError(f"Item con SKU {sku} no encontrado")
+        site = get_location(location)
+        with transaction.atomic():
+            adjust_stock(item, site, kg)
+            StockMovement.record(item, kg, 'RECEIPT', location=site)
+        # Notificar después de agregar stock
+        self.notify(StockEvent.from_item(item, kg))
+        return item
     
-    def consume_stock(self, sku: str, kg: float) -> InventoryItem:
+    @traced('inventory.consume_stock', record_args=('sku', 'kg', 'location', 'production_task.id'))
+    def consume_stock(self, sku: str, kg: float, production_task=None, location: str = None) -> InventoryItem:
         try:
             item = self.repo.get_item(sku)
-            if item.stock_kg >= kg:
-                item.update_stock(-kg)
-                self.repo.save(item)
-                # Notificar después de consumir stock
-                self.notify()
-                return item
-            else:
-                raise ValueError(f"Stock insuficiente para {sku}")
         except ObjectDoesNotExist:
             raise ValueError(f"Item con SKU {sku} no encontrado")
+        site = get_location(location)
+        # Nivel, movimiento y lotes en una transacción: si algo falla no queda stock descontado a medias
+        with transaction.atomic():
+            # El UPDATE condicional del nivel rechaza el consumo si la ubicación no alcanza
+            adjust_stock(item, site, -kg)
+            movement = StockMovement.record(item, -kg, 'CONSUMPTION', location=site)
+            # Trazabilidad: qué lotes (FIFO) cubren este consumo
+            with span('inventory.allocate_lots', sku=sku):
+                allocate_lots(item, kg, movement=movement, production_task=production_task)
+        # Notificar después de consumir stock
+        self.notify(StockEvent.from_item(item, -kg))
+        return item
     
     def check_low_stock(self):
         low_stock_items = []
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.query_plans import explain_dashboards
+
+
+class Command(BaseCommand):
+    help = "Ejecuta EXPLAIN sobre las consultas de los dashboards y marca los recorridos secuenciales"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Mostrar el plan completo de cada consulta')
+        parser.add_argument('--fail', action='store_true', help='Terminar con error si hay recorridos secuenciales')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Motor: {connection.vendor}")
+        flagged = 0
+        for plan in explain_dashboards():
+            if plan.sequential_scans:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️ {plan.name}: recorrido secuencial en {', '.join(plan.sequential_scans)}"))
+            else:
+                self.stdout.write(f"✅ {plan.name}")
+            if options['verbose_plans']:
+                self.stdout.write(plan.plan)
+
+        if flagged and options['fail']:
+            raise CommandError(f"{flagged} consultas sin índice")
+        self.stdout.write(f"{flagged} consultas con recorrido secuencial")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Borra las claves de idempotencia vencidas (IDEMPOTENCY_TTL_SECONDS); pensado para cron"
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+        self.stdout.write(f"🧹 {deleted} claves de idempotencia borradas")
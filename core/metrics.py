@@ -0,0 +1,120 @@
+import bisect
+import threading
+from typing import Dict, Sequence, Tuple
+
+# Histogramas y contadores en proceso, en formato de exposición de Prometheus.
+# Cada worker expone los suyos; Prometheus los agrega al hacer scrape de cada uno.
+
+LabelValues = Tuple[str, ...]
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, values)} {_format_number(total)}')
+        return '\n'.join(lines)
+
+
+class Histogram:
+    """Histograma acumulativo: observar es una búsqueda binaria y dos sumas"""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiqueta: [conteo por bucket (+Inf al final), suma, total]
+        self._series: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for values, (bucket_counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else _format_number(bound)
+                    labels = _format_labels(self.labels, values, f'le="{le}"')
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                lines.append(f'{self.name}_sum{_format_labels(self.labels, values)} {_format_number(total)}')
+                lines.append(f'{self.name}_count{_format_labels(self.labels, values)} {count}')
+        return '\n'.join(lines)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    'cafearoma_request_duration_seconds', 'Tiempo total de la petición por vista', ('view', 'method')))
+REQUEST_QUERIES = registry.register(Histogram(
+    'cafearoma_request_queries', 'Consultas SQL por petición', ('view',), buckets=QUERY_COUNT_BUCKETS))
+REQUEST_SQL_SECONDS = registry.register(Histogram(
+    'cafearoma_request_sql_seconds', 'Tiempo en SQL por petición', ('view',)))
+DUPLICATE_QUERIES = registry.register(Counter(
+    'cafearoma_duplicate_queries_total', 'Consultas repetidas (mismo SQL y parámetros) dentro de una petición',
+    ('view',)))
+REQUESTS = registry.register(Counter(
+    'cafearoma_requests_total', 'Peticiones atendidas', ('view', 'method', 'status')))
+SLOW_REQUESTS = registry.register(Counter(
+    'cafearoma_slow_requests_total', 'Peticiones que superaron REQUEST_METRICS_BUDGET_MS', ('view',)))
@@ -0,0 +1,149 @@
+import logging
+import time
+from collections import Counter as TallyCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """execute_wrapper que anota cada consulta (SQL, parámetros y duración) de una petición"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, time.perf_counter() - start))
+
+    @property
+    def sql_seconds(self) -> float:
+        return sum(duration for _, _, duration in self.queries)
+
+    def duplicates(self) -> int:
+        """Consultas idénticas (mismo SQL y parámetros) repetidas en la petición"""
+        tally = TallyCounter((sql, repr(params)) for sql, params, _ in self.queries)
+        return sum(count - 1 for count in tally.values() if count > 1)
+
+    def slowest(self, limit: int):
+        return sorted(self.queries, key=lambda query: query[2], reverse=True)[:limit]
+
+
+# El recorder de la petición viaja en un ContextVar: asgiref copia el contexto a los hilos de
+# sync_to_async, así también cuentan las consultas que gather_queries lanza en hilos del pool
+_active_recorder: ContextVar[Optional[QueryRecorder]] = ContextVar('query_recorder', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    """execute_wrapper fijo de cada conexión: anota la consulta en el recorder activo, si hay"""
+    recorder = _active_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def _install(connection) -> None:
+    # Al principio de la lista: los execute_wrapper() temporales de otros se sacan con pop()
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _install(connection)
+
+
+def install_query_hooks() -> None:
+    """Instala el wrapper en las conexiones del hilo actual abiertas antes de conectar la señal"""
+    for connection in connections.all():
+        _install(connection)
+
+
+@contextmanager
+def recording(recorder: QueryRecorder):
+    token = _active_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _active_recorder.reset(token)
+
+
+class RequestMetricsMiddleware:
+    """
+    Mide cada petición: tiempo total, número de consultas, tiempo en SQL y consultas
+    duplicadas, agregados por vista en histogramas (expuestos en /metrics).
+    Las peticiones que superan REQUEST_METRICS_BUDGET_MS se registran con sus consultas más lentas.
+
+    Con REQUEST_METRICS_ENABLED = False Django descarta el middleware al arrancar (coste cero).
+    Funciona bajo WSGI y ASGI; las consultas de cualquier hilo que herede el contexto de la
+    petición (sync_to_async, gather_queries) cuentan para ella.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budget_seconds = getattr(settings, 'REQUEST_METRICS_BUDGET_MS', 500) / 1000
+        self.slow_queries_logged = getattr(settings, 'REQUEST_METRICS_SLOW_QUERIES', 5)
+        connection_created.connect(_on_connection_created, dispatch_uid='core.middleware.record_query')
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        install_query_hooks()
+        start = time.perf_counter()
+        with recording(QueryRecorder()) as recorder:
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        self.record(request, response, recorder, elapsed)
+        return response
+
+    async def __acall__(self, request):
+        # Las vistas síncronas corren en el hilo de sync_to_async, con sus propias conexiones
+        await sync_to_async(install_query_hooks)()
+        start = time.perf_counter()
+        with recording(QueryRecorder()) as recorder:
+            response = await self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        self.record(request, response, recorder, elapsed)
+        return response
+
+    def record(self, request, response, recorder: QueryRecorder, elapsed: float) -> None:
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else 'unresolved'
+
+        metrics.REQUESTS.inc(view, request.method, str(response.status_code))
+        metrics.REQUEST_SECONDS.observe(elapsed, view, request.method)
+        metrics.REQUEST_QUERIES.observe(len(recorder.queries), view)
+        metrics.REQUEST_SQL_SECONDS.observe(recorder.sql_seconds, view)
+        duplicates = recorder.duplicates()
+        if duplicates:
+            metrics.DUPLICATE_QUERIES.inc(view, amount=duplicates)
+
+        if elapsed > self.budget_seconds:
+            metrics.SLOW_REQUESTS.inc(view)
+            slowest = '\n'.join(f'  {duration * 1000:8.1f} ms  {sql}'
+                                for sql, _, duration in recorder.slowest(self.slow_queries_logged))
+            logger.warning(
+                "Petición lenta %s %s (%s): %.0f ms, %d consultas (%.0f ms en SQL, %d duplicadas)\n%s",
+                request.method, request.path, view, elapsed * 1000, len(recorder.queries),
+                recorder.sql_seconds * 1000, duplicates, slowest,
+            )
@@ -13,4 +13,33 @@ class ProcessStage(models.TextChoices):
 
 class DeliverySpeed(models.TextChoices):
     RAPIDA = 'RA', 'Rápida'
-    ECONOMICA = 'EC', 'Económica'
\ No newline at end of file
+    ECONOMICA = 'EC', 'Económica'
+
+class IdempotencyKey(models.Model):
+    """
+    Resultado de una petición con clave de idempotencia (core.idempotency). Una petición
+    repetida con la misma clave y el mismo contenido se responde desde aquí sin re-ejecutarse.
+    status_code vacío = la primera petición aún se está procesando.
+    """
+    scope = models.CharField(max_length=100)
+    key = models.CharField(max_length=100)
+    fingerprint = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    location = models.CharField(max_length=500, blank=True, default='')
+    body = models.BinaryField(blank=True, default=b'')
+    # Mensajes flash de la respuesta original: [nivel, texto, etiquetas]
+    messages = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key', 'fingerprint'], name='idempotency_key_unique'),
+        ]
+        indexes = [
+            # Limpieza por antigüedad (purge_idempotency_keys)
+            models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key}"
@@ -1,6 +1,10 @@
+import logging
 from abc import ABC, abstractmethod
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
 from django.conf import settings
+from .events import latest_per_sku
+
+logger = logging.getLogger(__name__)
 
 class Subject(ABC):
     @abstractmethod
@@ -12,7 +16,7 @@ class Subject(ABC):
         pass
 
     @abstractmethod
-    def notify(self):
+    def notify(self, *events):
         pass
 
 class Observer(ABC):
@@ -20,26 +24,38 @@ class Observer(ABC):
     def update(self, subject):
         pass
 
+    def update_many(self, subject, events) -> list:
+        """
+        Recibe todos los eventos de stock de una ventana. Devuelve los correos a enviar;
+        por defecto llama a update() una sola vez por ventana.
+        """
+        self.update(subject)
+        return []
+
 class ResponsableDeCompras(Observer):
     def update(self, subject):
         low_stock_items = subject.check_low_stock()
         if low_stock_items:
-            print(f"🔔 NOTIFICACIÓN: Stock bajo detectado en {len(low_stock_items)} items")
+            logger.info("🔔 NOTIFICACIÓN: Stock bajo detectado en %d items", len(low_stock_items))
             for item in low_stock_items:
-                print(f"   - {item.sku} ({item.name}): {item.stock_kg}kg (mínimo: {item.min_stock_kg}kg)")
-            # Aquí podrías enviar un email
-            # self._send_notification_email(low_stock_items)
-    
-    def _send_notification_email(self, items):
+                logger.info("   - %s (%s): %skg (mínimo: %skg)", item.sku, item.name, item.stock_kg, item.min_stock_kg)
+
+    def update_many(self, subject, events) -> list:
+        """Un solo resumen por ventana, con el último estado de cada SKU bajo el mínimo"""
+        low_stock = [event for event in latest_per_sku(events) if event.is_low]
+        if not low_stock:
+            return []
+
+        logger.info("🔔 NOTIFICACIÓN: Stock bajo detectado en %d items", len(low_stock))
+        recipients = getattr(settings, 'PURCHASING_ALERT_RECIPIENTS', [])
+        if not recipients:
+            return []
+        return [self._build_digest_email(low_stock, recipients)]
+
+    def _build_digest_email(self, events, recipients) -> EmailMessage:
         subject = "Alerta: Stock Bajo en Café Aroma"
         message = "Los siguientes items necesitan reposición:\n\n"
-        for item in items:
-            message += f"- {item.name} (SKU: {item.sku}): {item.stock_kg}kg restantes\n"
-        
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            ['compras@cafearoma.com'],
-            fail_silently=True,
-        )
\ No newline at end of file
+        for event in events:
+            message += f"- SKU {event.sku}: {event.stock_kg}kg restantes (mínimo: {event.min_stock_kg}kg)\n"
+
+        return EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, recipients)
@@ -0,0 +1,65 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from inventory.models import InventoryItem, PurchaseOrder, RawGrain
+from orders.models import Order
+from production.models import ProductBatch, ProductionTask
+
+# Consultas con filtro u orden que hacen los dashboards y reportes.
+# Cada una debe resolverse con un índice; los listados completos sin filtro no se incluyen.
+DASHBOARD_QUERIES: Dict[str, Callable[[], QuerySet]] = {
+    'core.recent_batches': lambda: ProductBatch.objects.order_by('-mfg_date')[:3],
+    'core.recent_orders': lambda: Order.objects.order_by('-created_at')[:3],
+    'core.active_orders': lambda: Order.objects.filter(status__in=Order.ACTIVE_STATUSES).values('id'),
+    'orders.dashboard': lambda: Order.objects.order_by('-created_at'),
+    'orders.by_status': lambda: Order.objects.filter(status='PENDING').values('id'),
+    'production.dashboard_tasks': lambda: ProductionTask.objects.order_by('-created_at'),
+    'production.dashboard_batches': lambda: ProductBatch.objects.order_by('-mfg_date'),
+    'production.tasks_by_stage': lambda: ProductionTask.objects.filter(stage='CO').values('id'),
+    'production.batches_by_type': lambda: ProductBatch.objects.filter(coffee_type='AR'),
+    'inventory.recent_raw_grains': lambda: RawGrain.objects.order_by('-received_at')[:5],
+    'inventory.open_lots': lambda: RawGrain.objects.filter(
+        inventory_item_id=1, remaining_kg__gt=0).order_by('received_at', 'id'),
+    'inventory.open_purchase_orders': lambda: PurchaseOrder.objects.filter(
+        inventory_item__in=[1], status__in=PurchaseOrder.OPEN_STATUSES),
+}
+
+# "SCAN tabla" sin índice en SQLite; "Seq Scan on tabla" en PostgreSQL
+_SQLITE_SCAN = re.compile(r'\bSCAN (\w+)\b(?! USING (?:COVERING )?INDEX)')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    name: str
+    plan: str
+    sequential_scans: List[str]
+
+
+def sequential_scans(plan: str, vendor: str) -> List[str]:
+    """Tablas que el plan recorre completas (sin índice)"""
+    pattern = _POSTGRES_SCAN if vendor == 'postgresql' else _SQLITE_SCAN
+    return sorted(set(pattern.findall(plan)))
+
+
+def explain(queryset: QuerySet) -> str:
+    if connection.vendor != 'postgresql':
+        return queryset.explain()
+    # En tablas pequeñas PostgreSQL prefiere Seq Scan aunque exista el índice;
+    # desactivarlo deja como Seq Scan solo las consultas que no tienen índice utilizable.
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+
+def explain_dashboards() -> List[QueryPlan]:
+    plans = []
+    for name, build in DASHBOARD_QUERIES.items():
+        plan = explain(build())
+        plans.append(QueryPlan(name, plan, sequential_scans(plan, connection.vendor)))
+    return plans
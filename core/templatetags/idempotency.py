@@ -0,0 +1,18 @@
+from django import template
+from django.utils.html import format_html
+
+from core import idempotency
+
+register = template.Library()
+
+
+@register.simple_tag
+def idempotency_field():
+    """Campo oculto con una clave nueva: un doble envío del formulario se aplica una sola vez"""
+    return format_html('<input type="hidden" name="{}" value="{}">', idempotency.FIELD, idempotency.new_key())
+
+
+@register.simple_tag
+def idempotency_key():
+    """Clave nueva para enlaces con efectos: ?idempotency_key={% idempotency_key %}"""
+    return idempotency.new_key()
@@ -0,0 +1,18 @@
+from django import template
+
+from core import versioning
+
+register = template.Library()
+
+
+@register.simple_tag
+def versions_key(*labels):
+    """Clave de versión para {% cache %}: {% versions_key 'orders.Order' as key %}"""
+    return versioning.versions_key(*labels)
+
+
+@register.simple_tag(takes_context=True)
+def csrf_variant(context):
+    """Variante por sesión para fragmentos que contienen formularios con csrf_token"""
+    return versioning.csrf_variant(context['request'])
+
@@ -0,0 +1,58 @@
+import threading
+import time
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase
+
+from core import views as core_views
+from core.async_db import gather_queries
+from core.models import GrainType
+from inventory.models import InventoryItem
+from orders import views as orders_views
+from orders.models import Order
+
+
+class GatherQueriesTest(SimpleTestCase):
+    def test_consultas_en_hilos_distintos_y_a_la_vez(self):
+        """Con conexiones paralelas, cada consulta corre en su hilo y el total ≈ la más lenta"""
+        threads = []
+
+        def slow_query(value):
+            def run():
+                threads.append(threading.get_ident())
+                time.sleep(0.2)
+                return value
+            return run
+
+        with patch('core.async_db._parallel_allowed', return_value=True):
+            start = time.perf_counter()
+            result = async_to_sync(gather_queries)(a=slow_query(1), b=slow_query(2), c=slow_query(3))
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(result, {'a': 1, 'b': 2, 'c': 3})
+        self.assertEqual(len(set(threads)), 3)
+        self.assertLess(elapsed, 0.5)
+
+
+class AsyncDashboardTest(TestCase):
+    def setUp(self):
+        InventoryItem.objects.create(sku='ASY-1', name='Arábica', type=GrainType.ARABICA, stock_kg=5, min_stock_kg=10)
+        InventoryItem.objects.create(sku='ASY-2', name='Robusta', type=GrainType.ROBUSTA, stock_kg=50)
+        for status in ('PENDING', 'PENDING', 'SHIPPED', 'DELIVERED'):
+            Order.objects.create(customer=f'Cliente {status}', delivery_speed='EC', status=status)
+
+    def test_dashboard_async_igual_al_sincrono(self):
+        """La versión async muestra las mismas cifras que la síncrona"""
+        sync_page = core_views.dashboard(RequestFactory().get('/')).content
+        async_page = async_to_sync(core_views.dashboard_async)(AsyncRequestFactory().get('/')).content
+        self.assertEqual(async_page, sync_page)
+        self.assertIn(b'1 con stock bajo', async_page)
+
+    def test_pedidos_async_cuenta_por_estado(self):
+        response = async_to_sync(orders_views.orders_dashboard_async)(AsyncRequestFactory().get('/orders/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        content = response.content.decode()
+        self.assertIn('4 órdenes', content)
+        self.assertIn('<h5 class="mb-0 text-warning">2</h5>', content)
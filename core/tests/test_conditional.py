@@ -0,0 +1,55 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import GrainType
+from inventory.models import InventoryItem
+from production.models import ProductionTask
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        InventoryItem.objects.create(sku='ETAG-AR', name='Arábica', type=GrainType.ARABICA, stock_kg=50)
+        ProductionTask.objects.create(assigned_unit='Línea 1', planned_kg=10)
+
+    def test_dashboard_sin_cambios_responde_304_sin_consultas(self):
+        """Con el mismo ETag no se ejecuta la vista; al cambiar una tarea cambia el ETag"""
+        url = reverse('production:dashboard')
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        ProductionTask.objects.create(assigned_unit='Línea 2', planned_kg=5)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_mensajes_pendientes_evitan_el_304(self):
+        """Tras un POST con mensaje flash, la página se vuelve a renderizar para mostrarlo"""
+        url = reverse('inventory:dashboard')
+        etag = self.client.get(url)['ETag']
+        self.client.post(reverse('inventory:add_stock'), {'sku': 'NO-EXISTE', 'kg': 1})
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'NO-EXISTE')
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_reportes_varian_por_formato(self):
+        """El CSV y el PDF del mismo estado tienen ETags distintos"""
+        csv_etag = self.client.get(reverse('production:download_report', args=['csv']))['ETag']
+        response = self.client.get(reverse('production:download_report', args=['pdf']),
+                                   headers={'If-None-Match': csv_etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_lecturas_de_la_api(self):
+        """La API responde 304 sin consultas y deja de hacerlo tras una escritura"""
+        url = '/api/v1/inventory/items/?fields=sku,stock_kg'
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+
+        self.client.post('/api/v1/inventory/items/add-stock/', [{'sku': 'ETAG-AR', 'kg': 5}],
+                         content_type='application/json')
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
@@ -0,0 +1,100 @@
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase
+
+from core.conditional import versioned_condition
+from core.db_router import (PIN_COOKIE, PrimaryReplicaRouter, ReadYourWritesMiddleware, read_replica,
+                            track_replica_reads, use_primary)
+from production.models import ProductionTask
+
+REPLICA = {'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'replica.sqlite3'}}
+
+
+@patch.dict(settings.DATABASES, REPLICA)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_solo_el_bloque_explicito_lee_de_la_replica(self):
+        """Fuera de read_replica() todo va al primario; dentro, las lecturas van a la réplica"""
+        self.assertEqual(self.router.db_for_read(ProductionTask), 'default')
+        with read_replica():
+            self.assertEqual(self.router.db_for_read(ProductionTask), 'replica')
+            with use_primary():
+                self.assertEqual(self.router.db_for_read(ProductionTask), 'default')
+            self.assertEqual(self.router.db_for_write(ProductionTask), 'default')
+        self.assertEqual(self.router.db_for_read(ProductionTask), 'default')
+
+    def test_sin_replica_configurada_usa_el_primario(self):
+        with patch.dict(settings.DATABASES), read_replica():
+            del settings.DATABASES['replica']
+            self.assertEqual(self.router.db_for_read(ProductionTask), 'default')
+
+    def test_registro_de_lecturas_en_la_replica(self):
+        """track_replica_reads marca el bloque solo si una lectura fue efectivamente a la réplica"""
+        with track_replica_reads() as reads, read_replica(), use_primary():
+            self.router.db_for_read(ProductionTask)
+        self.assertFalse(reads.used)
+        with track_replica_reads() as reads, read_replica():
+            self.router.db_for_read(ProductionTask)
+        self.assertTrue(reads.used)
+
+    def test_contenido_de_la_replica_sin_etag_de_version(self):
+        """Una respuesta leída de la réplica no lleva el ETag de la versión actual; del primario sí"""
+        def view_reading(replica):
+            @versioned_condition(ProductionTask)
+            def view(request):
+                if replica:
+                    with read_replica():
+                        self.router.db_for_read(ProductionTask)
+                return HttpResponse('reporte')
+            return view
+
+        self.assertFalse(view_reading(replica=True)(RequestFactory().get('/')).has_header('ETag'))
+        self.assertTrue(view_reading(replica=False)(RequestFactory().get('/')).has_header('ETag'))
+
+    def test_migraciones_solo_en_el_primario(self):
+        self.assertTrue(self.router.allow_migrate('default', 'production'))
+        self.assertFalse(self.router.allow_migrate('replica', 'production'))
+
+
+@patch.dict(settings.DATABASES, REPLICA)
+class ReadYourWritesMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.routed = []
+
+    def view(self, write: bool):
+        def get_response(request):
+            if write:
+                self.router.db_for_write(ProductionTask)
+            with read_replica():
+                self.routed.append(self.router.db_for_read(ProductionTask))
+            return HttpResponse()
+        return ReadYourWritesMiddleware(get_response)
+
+    def test_la_peticion_que_escribe_lee_del_primario_y_fija_la_cookie(self):
+        """Tras escribir, la misma petición lee del primario y el navegador queda fijado unos segundos"""
+        response = self.view(write=True)(RequestFactory().post('/'))
+        self.assertEqual(self.routed, ['default'])
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], settings.REPLICA_PIN_SECONDS)
+
+    def test_la_cookie_fija_las_lecturas_siguientes(self):
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.view(write=False)(request)
+        response = self.view(write=False)(RequestFactory().get('/'))
+        self.assertEqual(self.routed, ['default', 'replica'])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_peticion_async_con_escritura_en_otro_hilo(self):
+        """Bajo ASGI la escritura hecha en el hilo de sync_to_async también fija el navegador"""
+        async def get_response(request):
+            await sync_to_async(self.router.db_for_write)(ProductionTask)
+            return HttpResponse()
+
+        response = async_to_sync(ReadYourWritesMiddleware(get_response))(AsyncRequestFactory().post('/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
@@ -0,0 +1,89 @@
+import threading
+
+from django.core import mail
+from django.test import TestCase, SimpleTestCase, override_settings
+
+from core.events import StockEvent, StockEventPipeline
+from core.inventory_manager import InventoryManager
+from core.models import GrainType
+from core.observers import Observer, ResponsableDeCompras
+from inventory.models import InventoryItem
+from inventory.repositories import DjangoInventoryRepo
+
+
+class RecordingObserver(Observer):
+    def __init__(self):
+        self.batches = []
+        self.delivered = threading.Event()
+
+    def update(self, subject):
+        pass
+
+    def update_many(self, subject, events):
+        self.batches.append(list(events))
+        self.delivered.set()
+        return []
+
+
+class FakeSubject:
+    def __init__(self, *observers):
+        self._observers = list(observers)
+
+
+def event(sku, stock_kg, min_stock_kg=10.0):
+    return StockEvent(sku=sku, delta_kg=-1.0, stock_kg=stock_kg, min_stock_kg=min_stock_kg)
+
+
+class StockEventPipelineTest(SimpleTestCase):
+    @override_settings(STOCK_EVENTS_WINDOW_SECONDS=0.05)
+    def test_despachador_agrupa_una_ventana(self):
+        """El hilo despachador entrega una ráfaga de eventos en una sola llamada por observador"""
+        observer = RecordingObserver()
+        pipeline = StockEventPipeline(FakeSubject(observer))
+        self.addCleanup(pipeline.stop)
+
+        for i in range(200):
+            pipeline._enqueue(event('ARAB-001', 50.0 - i * 0.1))
+
+        self.assertTrue(observer.delivered.wait(timeout=5))
+        pipeline.stop()
+        self.assertEqual(sum(len(batch) for batch in observer.batches), 200)
+        self.assertEqual(len(observer.batches), 1)
+
+    @override_settings(STOCK_EVENTS_WINDOW_SECONDS=60)
+    def test_un_resumen_por_ventana_con_una_conexion(self):
+        """200 consumos producen un único correo de resumen con el último estado por SKU"""
+        pipeline = StockEventPipeline(FakeSubject(ResponsableDeCompras()))
+        for i in range(200):
+            pipeline._queue.put(event('ARAB-001' if i % 2 else 'ROB-001', 20.0 - i * 0.1))
+
+        self.assertEqual(pipeline.flush(), 200)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('ARAB-001', mail.outbox[0].body)
+        self.assertIn('ROB-001', mail.outbox[0].body)
+
+    @override_settings(STOCK_EVENTS_WINDOW_SECONDS=0)
+    def test_sin_stock_bajo_no_hay_correo(self):
+        """Sin items bajo el mínimo no se envía nada"""
+        pipeline = StockEventPipeline(FakeSubject(ResponsableDeCompras()))
+        pipeline.publish(event('ARAB-001', 50.0))
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class InventoryManagerEventsTest(TestCase):
+    def test_consumo_publica_evento_con_estado_final(self):
+        """consume_stock publica un StockEvent con el stock resultante"""
+        InventoryItem.objects.create(sku='EVT-001', name='Café Eventos', type=GrainType.ARABICA,
+                                     stock_kg=12.0, min_stock_kg=10.0)
+        manager = InventoryManager(DjangoInventoryRepo())
+        observer = RecordingObserver()
+        manager.attach(observer)
+        self.addCleanup(manager.detach, observer)
+
+        manager.consume_stock('EVT-001', 5.0)
+
+        [[received]] = observer.batches
+        self.assertEqual(received.sku, 'EVT-001')
+        self.assertEqual(received.delta_kg, -5.0)
+        self.assertEqual(received.stock_kg, 7.0)
+        self.assertTrue(received.is_low)
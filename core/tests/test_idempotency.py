@@ -0,0 +1,92 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.messages import get_messages
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.idempotency import REPLAY_HEADER
+from core.models import GrainType, IdempotencyKey
+from inventory.models import InventoryItem, StockMovement
+from orders.adapters import ProviderAdapter
+from orders.models import Delivery, Order
+
+
+class IdempotencyTest(TestCase):
+    def setUp(self):
+        self.item = InventoryItem.objects.create(sku='IDEM-AR', name='Arábica', type=GrainType.ARABICA, stock_kg=10)
+
+    def test_doble_envio_de_formulario_se_aplica_una_vez(self):
+        """El segundo envío con la misma clave repite la redirección y el mensaje sin tocar el stock"""
+        data = {'sku': 'IDEM-AR', 'kg': 5, 'idempotency_key': 'form-1'}
+        first = self.client.post(reverse('inventory:add_stock'), data)
+        second = self.client.post(reverse('inventory:add_stock'), data)
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock_kg, 15)
+        self.assertEqual(StockMovement.objects.filter(reason='RECEIPT').count(), 1)
+        self.assertEqual(second.status_code, 302)
+        self.assertEqual(second['Location'], first['Location'])
+        self.assertEqual(second[REPLAY_HEADER], 'true')
+        self.assertTrue(any('Agregados 5' in str(message) for message in get_messages(second.wsgi_request)))
+
+    def test_misma_clave_de_formulario_con_otros_datos_es_otra_operacion(self):
+        """Un formulario servido desde caché reutiliza su clave: otro contenido no se confunde con un reintento"""
+        url = reverse('inventory:add_stock')
+        self.client.post(url, {'sku': 'IDEM-AR', 'kg': 5, 'idempotency_key': 'form-2'})
+        self.client.post(url, {'sku': 'IDEM-AR', 'kg': 2, 'idempotency_key': 'form-2'})
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock_kg, 17)
+
+    def test_api_con_cabecera(self):
+        """Reintento con la misma cabecera → misma respuesta; la clave con otro cuerpo → 422"""
+        url = '/api/v1/inventory/items/consume-stock/'
+        payload = [{'sku': 'IDEM-AR', 'kg': 4}]
+        headers = {'Idempotency-Key': 'api-1'}
+        first = self.client.post(url, payload, content_type='application/json', headers=headers)
+        with mock.patch('inventory.api.inv_manager.consume_stock') as consume:
+            second = self.client.post(url, payload, content_type='application/json', headers=headers)
+        consume.assert_not_called()
+        self.assertEqual(second.json(), first.json())
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock_kg, 6)
+
+        other = self.client.post(url, [{'sku': 'IDEM-AR', 'kg': 1}], content_type='application/json',
+                                 headers=headers)
+        self.assertEqual(other.status_code, 422)
+
+    def test_envio_no_llama_dos_veces_al_transportista(self):
+        """El enlace de envío repetido no vuelve a llamar al proveedor logístico"""
+        order = Order.objects.create(customer='Tienda', delivery_speed='RA')
+        url = f"{reverse('orders:create_shipment', args=[order.id])}?idempotency_key=ship-1"
+        shipment = {'success': True, 'tracking_number': 'T-1', 'carrier': 'DHL Express', 'estimated_days': 2,
+                    'message': '✅ Envío creado'}
+        with mock.patch.object(ProviderAdapter, 'create_shipment', return_value=shipment) as create_shipment:
+            self.client.get(url)
+            self.client.get(url)
+        self.assertEqual(create_shipment.call_count, 1)
+        self.assertEqual(Delivery.objects.filter(order=order).count(), 1)
+
+    def test_fallo_del_transportista_no_se_repite(self):
+        """Un envío fallido libera la clave: el mismo enlace vuelve a intentar con el proveedor"""
+        order = Order.objects.create(customer='Tienda', delivery_speed='RA')
+        url = f"{reverse('orders:create_shipment', args=[order.id])}?idempotency_key=ship-2"
+        outage = {'success': False, 'error': '❌ Error al crear envío: caído'}
+        shipment = {'success': True, 'tracking_number': 'T-2', 'carrier': 'DHL Express', 'estimated_days': 2,
+                    'message': '✅ Envío creado'}
+        with mock.patch.object(ProviderAdapter, 'create_shipment', side_effect=[outage, shipment]) as create_shipment:
+            self.client.get(url)
+            retry = self.client.get(url)
+        self.assertEqual(create_shipment.call_count, 2)
+        self.assertNotIn(REPLAY_HEADER, retry)
+        self.assertEqual(Delivery.objects.filter(order=order).count(), 1)
+
+    def test_limpieza_por_ttl(self):
+        """purge_idempotency_keys borra solo las claves vencidas"""
+        old = IdempotencyKey.objects.create(scope='s', key='viejo', fingerprint='f', status_code=302)
+        IdempotencyKey.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=2))
+        IdempotencyKey.objects.create(scope='s', key='nuevo', fingerprint='f', status_code=302)
+        call_command('purge_idempotency_keys', stdout=mock.Mock())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['nuevo'])
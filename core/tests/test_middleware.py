@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from core.async_db import gather_queries
+from core.middleware import QueryRecorder, RequestMetricsMiddleware
+from production.models import ProductionTask
+
+
+class QueryRecorderTest(SimpleTestCase):
+    def test_cuenta_duplicadas_y_ordena_por_duracion(self):
+        """Solo cuentan como duplicadas las consultas con el mismo SQL y los mismos parámetros"""
+        recorder = QueryRecorder()
+        recorder.queries = [('SELECT 1 WHERE id = %s', (1,), 0.002),
+                            ('SELECT 1 WHERE id = %s', (1,), 0.001),
+                            ('SELECT 1 WHERE id = %s', (2,), 0.005)]
+        self.assertEqual(recorder.duplicates(), 1)
+        self.assertEqual(recorder.slowest(1)[0][1], (2,))
+        self.assertAlmostEqual(recorder.sql_seconds, 0.008)
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        ProductionTask.objects.create(assigned_unit='Línea 1', planned_kg=10)
+
+    def test_metricas_por_vista_en_formato_prometheus(self):
+        """Cada petición suma su tiempo y sus consultas al histograma de su vista"""
+        before = metrics.REQUEST_QUERIES.count('production:dashboard')
+        self.client.get(reverse('production:dashboard'))
+        self.assertEqual(metrics.REQUEST_QUERIES.count('production:dashboard'), before + 1)
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        body = response.content.decode()
+        self.assertIn('# TYPE cafearoma_request_duration_seconds histogram', body)
+        self.assertIn('cafearoma_request_queries_bucket{view="production:dashboard",le="+Inf"}', body)
+
+    @override_settings(REQUEST_METRICS_BUDGET_MS=0)
+    def test_peticion_lenta_se_registra_con_sus_consultas(self):
+        """Las peticiones sobre el presupuesto dejan un aviso con las consultas más lentas"""
+        with self.assertLogs('core.middleware', level='WARNING') as logs:
+            self.client.get(reverse('production:dashboard'))
+        self.assertIn('Petición lenta GET /production/', logs.output[0])
+        self.assertIn('production_productiontask', logs.output[0])
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_desactivado_no_mide(self):
+        """Desactivado, el middleware no se instala y no registra nada"""
+        before = metrics.REQUEST_QUERIES.count('production:dashboard')
+        self.client.get(reverse('production:dashboard'))
+        self.assertEqual(metrics.REQUEST_QUERIES.count('production:dashboard'), before)
+
+    async def test_peticion_async(self):
+        """Bajo ASGI el middleware mide también las consultas de la vista síncrona"""
+        before = metrics.REQUEST_QUERIES.count('production:dashboard')
+        response = await self.async_client.get(reverse('production:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metrics.REQUEST_QUERIES.count('production:dashboard'), before + 1)
+
+    def test_cuenta_consultas_de_gather_queries_en_hilos(self):
+        """Las consultas que gather_queries lanza en hilos del pool cuentan para la petición"""
+        def select_one():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                return cursor.fetchone()[0]
+
+        async def view(request):
+            return HttpResponse(str(await gather_queries(a=select_one, b=select_one)))
+
+        middleware = RequestMetricsMiddleware(view)
+        with patch('core.async_db._parallel_allowed', return_value=True), \
+                patch.object(RequestMetricsMiddleware, 'record') as record:
+            async_to_sync(middleware)(AsyncRequestFactory().get('/'))
+        recorder = record.call_args.args[2]
+        self.assertEqual([sql for sql, _, _ in recorder.queries], ['SELECT 1', 'SELECT 1'])
+
+    def test_metrics_solo_staff_o_ips_permitidas(self):
+        """Desde otra IP /metrics es 403 salvo para usuarios staff"""
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code, 403)
+        self.client.force_login(User.objects.create_user('ops', is_staff=True))
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code, 200)
@@ -58,4 +58,48 @@ class TestAbstractFactoryPattern(TestCase):
         self.assertEqual(combo.combo_name, "Combo Premium")
         self.assertEqual(combo.mug.material, "Porcelana")
         self.assertEqual(combo.filter.type, "Algodón Orgánico")
-        self.assertEqual(combo.discount, 0.15)
\ No newline at end of file
+        self.assertEqual(combo.discount, 0.15)
+
+class TestFactoryRegistry(TestCase):
+    def test_registrar_nuevo_tipo_de_cafe(self):
+        """Un tipo de café nuevo se agrega por registro, sin tocar ProductFactory"""
+        from dataclasses import dataclass
+        from core.factories import CoffeeProduct
+
+        @dataclass(frozen=True, slots=True)
+        class LibericaCoffee(CoffeeProduct):
+            weight_kg: float
+            origin: str = "Filipinas"
+
+            def label(self) -> str:
+                return f"Café Liberica ({self.origin}) - {self.weight_kg}kg"
+
+            def get_price_per_kg(self) -> float:
+                return 50.00
+
+        ProductFactory.register('liberica', LibericaCoffee)
+        self.addCleanup(ProductFactory._registry.pop, 'liberica')
+
+        coffee = ProductFactory().create('liberica', 1.0, origin='Malasia', ratio='ignorado')
+        self.assertEqual(coffee.label(), "Café Liberica (Malasia) - 1.0kg")
+        self.assertIn('liberica', ProductFactory.available_kinds())
+
+    def test_tipos_desconocidos(self):
+        """Tipos y niveles no registrados siguen lanzando ValueError"""
+        with self.assertRaises(ValueError):
+            ProductFactory().create('kopi', 1.0)
+        with self.assertRaises(ValueError):
+            ComboFactoryCreator.create_factory('deluxe')
+
+    def test_productos_inmutables_con_slots_y_compartidos(self):
+        """Los combos no tienen __dict__ y las tazas/filtros idénticos se comparten"""
+        factory = ComboFactoryCreator.create_factory('premium')
+        combo1 = factory.create_combo('arabica', 0.25)
+        combo2 = factory.create_combo('blend', 1.0)
+
+        self.assertFalse(hasattr(combo1, '__dict__'))
+        self.assertFalse(hasattr(combo1.coffee, '__dict__'))
+        self.assertIs(combo1.mug, combo2.mug)
+        self.assertIs(combo1.filter, combo2.filter)
+        with self.assertRaises(AttributeError):
+            combo1.discount = 0.5
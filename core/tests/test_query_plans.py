@@ -0,0 +1,33 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from core.query_plans import explain_dashboards, sequential_scans
+
+
+class SequentialScanParserTest(SimpleTestCase):
+    def test_detecta_recorridos_en_ambos_motores(self):
+        """Distingue recorridos completos de búsquedas o recorridos por índice"""
+        sqlite_plan = ("2 0 0 SCAN orders_order\n"
+                       "3 0 0 SCAN production_productbatch USING INDEX batch_mfg_date_idx\n"
+                       "4 0 0 SEARCH inventory_rawgrain USING INDEX rawgrain_open_lots_idx (inventory_item_id=?)")
+        self.assertEqual(sequential_scans(sqlite_plan, 'sqlite'), ['orders_order'])
+
+        postgres_plan = ("Limit  (cost=0.15..0.36 rows=3 width=52)\n"
+                         "  ->  Index Scan using order_created_idx on orders_order\n"
+                         "Seq Scan on inventory_inventoryitem  (cost=0.00..1.05 rows=5 width=8)")
+        self.assertEqual(sequential_scans(postgres_plan, 'postgresql'), ['inventory_inventoryitem'])
+
+
+class DashboardIndexCoverageTest(TestCase):
+    def test_consultas_de_dashboards_usan_indices(self):
+        """Ninguna consulta de los dashboards recorre su tabla completa (SQLite o PostgreSQL)"""
+        flagged = {plan.name: plan.sequential_scans for plan in explain_dashboards() if plan.sequential_scans}
+        self.assertEqual(flagged, {})
+
+    def test_comando_explain_dashboards(self):
+        """El comando termina sin error cuando todas las consultas están indexadas"""
+        out = StringIO()
+        call_command('explain_dashboards', '--fail', stdout=out)
+        self.assertIn('0 consultas con recorrido secuencial', out.getvalue())
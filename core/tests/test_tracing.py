@@ -0,0 +1,89 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, TestCase
+
+from core.inventory_manager import InventoryManager
+from core.models import GrainType
+from core.tracing import InMemoryExporter, JsonFileExporter, NON_RECORDING_SPAN, span, traced, tracer
+from inventory.models import InventoryItem
+from inventory.repositories import DjangoInventoryRepo
+from production.facade import ProductionFacade
+
+
+class TracerTest(SimpleTestCase):
+    def setUp(self):
+        self.exporter = InMemoryExporter()
+        tracer.configure(exporters=[self.exporter], sample_rate=1.0)
+        self.addCleanup(tracer.reset)
+
+    def test_tramos_anidados_comparten_traza(self):
+        """Los hijos heredan el trace_id y apuntan al tramo padre; se exportan al cerrar"""
+        with span('padre', sku='AR-1') as parent:
+            with span('hijo') as child:
+                child.set_attribute('kg', 5)
+
+        hijo, padre = self.exporter.spans
+        self.assertEqual((padre.name, hijo.name), ('padre', 'hijo'))
+        self.assertEqual(hijo.trace_id, padre.trace_id)
+        self.assertEqual(hijo.parent_id, parent.span_id)
+        self.assertIsNone(padre.parent_id)
+        self.assertEqual(hijo.attributes, {'kg': 5})
+        self.assertGreaterEqual(padre.duration, hijo.duration)
+
+    def test_decorador_registra_argumentos_y_errores(self):
+        """traced() guarda los argumentos pedidos y el error, que se vuelve a lanzar"""
+        @traced('dominio.falla', record_args=('sku', 'item.kg'))
+        def falla(sku, item):
+            raise ValueError('sin stock')
+
+        with self.assertRaises(ValueError):
+            falla('AR-1', item=type('Item', (), {'kg': 3})())
+
+        recorded = self.exporter.spans[0]
+        self.assertEqual(recorded.attributes, {'sku': 'AR-1', 'item_kg': 3})
+        self.assertEqual(recorded.error, 'ValueError: sin stock')
+
+    def test_traza_no_muestreada_no_exporta_nada(self):
+        """Sin muestreo en la raíz, ningún descendiente se mide ni se exporta"""
+        tracer.configure(sample_rate=0.0)
+        with span('raiz') as root, span('hijo') as child:
+            pass
+        self.assertIs(root, NON_RECORDING_SPAN)
+        self.assertIs(child, NON_RECORDING_SPAN)
+        self.assertEqual(self.exporter.spans, [])
+
+    def test_exportador_json(self):
+        """JsonFileExporter escribe un objeto JSON por tramo"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'traces.jsonl'
+            tracer.configure(exporters=[JsonFileExporter(path)])
+            with span('json', lote='B-1'):
+                pass
+            record = json.loads(path.read_text(encoding='utf-8'))
+        self.assertEqual(record['name'], 'json')
+        self.assertEqual(record['attributes'], {'lote': 'B-1'})
+        self.assertIsNotNone(record['duration_ms'])
+
+
+class DomainTracingTest(TestCase):
+    def setUp(self):
+        self.exporter = InMemoryExporter()
+        tracer.configure(exporters=[self.exporter], sample_rate=1.0)
+        self.addCleanup(tracer.reset)
+        InventoryItem.objects.create(sku='TRACE-AR', name='Arábica', type=GrainType.ARABICA, stock_kg=50)
+        self.facade = ProductionFacade(InventoryManager(DjangoInventoryRepo()))
+
+    def test_produccion_genera_arbol_de_tramos(self):
+        """Iniciar una producción traza la tarea, el consumo de stock y el costo bajo un mismo tramo raíz"""
+        self.facade.start_production('TRACE-AR', 10, 'arabica')
+
+        by_name = {recorded.name: recorded for recorded in self.exporter.spans}
+        root = by_name['production.start']
+        self.assertIsNone(root.parent_id)
+        self.assertEqual(root.attributes, {'sku': 'TRACE-AR', 'kg': 10, 'kind': 'arabica'})
+        for name in ('production.create_task', 'inventory.consume_stock', 'production.material_cost'):
+            self.assertEqual(by_name[name].parent_id, root.span_id)
+        self.assertEqual(by_name['inventory.allocate_lots'].parent_id, by_name['inventory.consume_stock'].span_id)
+        self.assertEqual({recorded.trace_id for recorded in self.exporter.spans}, {root.trace_id})
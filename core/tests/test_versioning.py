@@ -0,0 +1,59 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from core import versioning
+from core.models import GrainType
+from inventory.models import InventoryItem
+from orders.models import Order
+from production.models import ProductionTask
+
+
+class ModelVersionTest(TestCase):
+    def test_guardar_y_borrar_suben_la_version(self):
+        """Cada save/delete de un modelo versionado cambia su clave, y solo la suya"""
+        before = versioning.get_versions(Order, ProductionTask)
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(customer='Cafetería Central', delivery_speed='EC')
+        after_save = versioning.get_versions(Order, ProductionTask)
+        self.assertGreater(after_save[Order], before[Order])
+        self.assertEqual(after_save[ProductionTask], before[ProductionTask])
+
+        order.delete()
+        self.assertGreater(versioning.get_versions(Order)[Order], after_save[Order])
+
+    def test_clave_desalojada_no_reutiliza_versiones(self):
+        """Si el contador desaparece de la caché se reinicia en un valor nuevo, no en 1"""
+        versioning.bump('orders.Order')
+        self.assertGreater(versioning.get_versions('orders.Order')['orders.Order'], 1)
+
+
+class DashboardFragmentCacheTest(TestCase):
+    def setUp(self):
+        self.task = ProductionTask.objects.create(assigned_unit='Línea 1', planned_kg=12.5)
+
+    def test_tabla_cacheada_se_rerenderiza_solo_al_cambiar(self):
+        """La tabla de tareas no consulta la BD mientras no cambie ProductionTask"""
+        url = reverse('production:dashboard')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, '12,5kg')
+
+        self.task.planned_kg = 30
+        self.task.save()
+        self.assertContains(self.client.get(url), '30,0kg')
+
+    def test_inventario_con_formularios_por_sesion(self):
+        """La tabla de inventario (con csrf_token) se cachea por sesión y se invalida al cambiar stock"""
+        InventoryItem.objects.create(sku='FRAG-AR', name='Arábica', type=GrainType.ARABICA, stock_kg=20)
+        url = reverse('inventory:dashboard')
+        first = self.client.get(url)
+        token = self.client.cookies['csrftoken'].value
+        self.assertContains(first, 'FRAG-AR')
+
+        other = self.client_class()
+        self.assertNotEqual(other.get(url).cookies['csrftoken'].value, token)
+
+        item = InventoryItem.objects.get(sku='FRAG-AR')
+        item.update_stock(5)
+        self.assertContains(self.client.get(url), '25,0kg')
@@ -0,0 +1,225 @@
+import functools
+import inspect
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """Tramo de una operación: nombre, tiempos, atributos y su lugar en la traza"""
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_time', 'duration', 'attributes', 'error',
+                 '_start')
+
+    recording = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error = None
+        self.duration = None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._start
+
+    def as_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time': self.start_time,
+            'duration_ms': round(self.duration * 1000, 3) if self.duration is not None else None,
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class _NonRecordingSpan:
+    """Tramo de una traza no muestreada: no mide ni exporta nada"""
+    recording = False
+    name = trace_id = span_id = parent_id = None
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+
+NON_RECORDING_SPAN = _NonRecordingSpan()
+
+_current_span: ContextVar = ContextVar('cafearoma_current_span', default=None)
+
+
+def current_span():
+    return _current_span.get() or NON_RECORDING_SPAN
+
+
+# Exportadores
+
+class InMemoryExporter:
+    """Guarda los tramos terminados en una lista (para pruebas)"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def names(self) -> List[str]:
+        return [span.name for span in self.spans]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class LoggingExporter:
+    """Una línea de log por tramo en el logger core.tracing"""
+
+    def export(self, span: Span) -> None:
+        logger.info("%s %.2f ms trace=%s span=%s parent=%s %s%s", span.name, span.duration * 1000,
+                    span.trace_id, span.span_id, span.parent_id or '-', span.attributes,
+                    f" error={span.error}" if span.error else '')
+
+
+class JsonFileExporter:
+    """Un objeto JSON por línea (por defecto en TRACING_JSON_PATH)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or getattr(settings, 'TRACING_JSON_PATH', 'traces.jsonl')
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.as_dict(), default=str, ensure_ascii=False)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as stream:
+            stream.write(line + '\n')
+
+
+# Trazador
+
+class Tracer:
+    """
+    Crea tramos anidados (vía contextvars) y los envía a los exportadores configurados.
+
+    El muestreo se decide una vez por traza, en el tramo raíz: las trazas no muestreadas
+    solo cuestan leer y fijar una variable de contexto por operación.
+    Configuración por defecto: TRACING_SAMPLE_RATE y TRACING_EXPORTERS (rutas de clases).
+    """
+
+    def __init__(self):
+        self._exporters = None
+        self._sample_rate = None
+        self._lock = threading.Lock()
+
+    def configure(self, exporters: Optional[Iterable] = None, sample_rate: Optional[float] = None) -> None:
+        with self._lock:
+            if exporters is not None:
+                self._exporters = list(exporters)
+            if sample_rate is not None:
+                self._sample_rate = sample_rate
+
+    def reset(self) -> None:
+        """Vuelve a leer la configuración de settings en el próximo tramo"""
+        with self._lock:
+            self._exporters = None
+            self._sample_rate = None
+
+    @property
+    def sample_rate(self) -> float:
+        if self._sample_rate is None:
+            self._sample_rate = getattr(settings, 'TRACING_SAMPLE_RATE', 0.0)
+        return self._sample_rate
+
+    @property
+    def exporters(self) -> list:
+        if self._exporters is None:
+            with self._lock:
+                if self._exporters is None:
+                    self._exporters = [import_string(path)()
+                                       for path in getattr(settings, 'TRACING_EXPORTERS', ())]
+        return self._exporters
+
+    def _export(self, span: Span) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception:
+                logger.exception("El exportador %r falló con el tramo %s", exporter, span.name)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        parent = _current_span.get()
+        if parent is NON_RECORDING_SPAN or (parent is None and random.random() >= self.sample_rate):
+            token = _current_span.set(NON_RECORDING_SPAN)
+            try:
+                yield NON_RECORDING_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+
+        current = Span(name, parent.trace_id if parent else f'{random.getrandbits(128):032x}',
+                       parent.span_id if parent else None, attributes)
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            current.end()
+            _current_span.reset(token)
+            self._export(current)
+
+    def traced(self, name: Optional[str] = None, record_args: Sequence[str] = (), **attributes) -> Callable:
+        """
+        Decorador: un tramo por llamada. `record_args` guarda argumentos como atributos
+        (admite 'self.sku'); solo se evalúan si la traza está muestreada.
+        """
+        def decorator(func):
+            span_name = name or func.__qualname__
+            signature = inspect.signature(func) if record_args else None
+            # 'self.sku' -> sku, 'task.id' -> task_id
+            keys = [(path, path.removeprefix('self.').replace('.', '_')) for path in record_args]
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, **attributes) as span:
+                    if signature is not None and span.recording:
+                        bound = signature.bind_partial(*args, **kwargs).arguments
+                        for path, key in keys:
+                            span.set_attribute(key, _lookup(bound, path))
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+def _lookup(arguments: dict, path: str):
+    head, *rest = path.split('.')
+    value = arguments.get(head)
+    for attr in rest:
+        value = getattr(value, attr, None)
+    return value
+
+
+# Instancia compartida por el proceso
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced
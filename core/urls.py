@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'core'
 
 urlpatterns = [
-    path('', views.dashboard, name='dashboard'),
+    # Bajo ASGI, la versión async lanza sus consultas a la vez (ASYNC_DASHBOARDS)
+    path('', views.dashboard_async if settings.ASYNC_DASHBOARDS else views.dashboard, name='dashboard'),
+    path('metrics', views.metrics, name='metrics'),
 ]
\ No newline at end of file
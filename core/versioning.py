@@ -0,0 +1,93 @@
+import hashlib
+import time
+from typing import Iterable, Union
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+# Modelos cuyas tablas se cachean como fragmentos en los dashboards o sirven de ETag
+# (core.conditional). Cada uno tiene un contador de versión en la caché que sube al guardar o borrar.
+VERSIONED_MODELS = (
+    'inventory.InventoryItem',
+    'inventory.RawGrain',
+    'inventory.StockLevel',
+    'production.ProductionTask',
+    'production.ProductBatch',
+    'orders.Order',
+    'orders.OrderLine',
+    'orders.Delivery',
+)
+# Duración de los fragmentos: la versión ya invalida por cambios, esto solo limita lo olvidado
+FRAGMENT_TIMEOUT = 60 * 60
+
+ModelRef = Union[str, type]
+
+
+def _model(ref: ModelRef):
+    return apps.get_model(ref) if isinstance(ref, str) else ref
+
+
+def _key(ref: ModelRef) -> str:
+    return f'model-version:{_model(ref)._meta.label_lower}'
+
+
+def _initial_version() -> int:
+    # Si la clave se desalojó, se reinicia en un valor nuevo (milisegundos) para no
+    # volver a una versión antigua cuyos fragmentos podrían seguir en la caché
+    return int(time.time() * 1000)
+
+
+def get_versions(*refs: ModelRef) -> dict:
+    """Versión actual de cada modelo (una sola lectura a la caché)"""
+    keys = {_key(ref): ref for ref in refs}
+    found = cache.get_many(list(keys))
+    for key in keys.keys() - found.keys():
+        cache.add(key, _initial_version(), timeout=None)
+        found[key] = cache.get(key)
+    return {keys[key]: found[key] for key in keys}
+
+
+def versions_key(*refs: ModelRef) -> str:
+    """Clave compuesta para {% cache %}: cambia en cuanto cambia cualquiera de los modelos"""
+    versions = get_versions(*refs)
+    return '.'.join(str(versions[ref]) for ref in refs)
+
+
+def bump(*refs: ModelRef) -> None:
+    for ref in refs:
+        try:
+            cache.incr(_key(ref))
+        except ValueError:
+            cache.add(_key(ref), _initial_version(), timeout=None)
+
+
+def invalidate(*refs: ModelRef) -> None:
+    """
+    Sube la versión ahora, para que la propia transacción vea sus cambios, y otra vez al
+    confirmar, porque entretanto otra petición pudo cachear los datos viejos bajo la versión
+    intermedia. Se llama también tras operaciones masivas (bulk_create/update), que no emiten señales.
+    """
+    bump(*refs)
+    transaction.on_commit(lambda: bump(*refs))
+
+
+def csrf_variant(request) -> str:
+    """Variante de fragmento por sesión para tablas con formularios ({% csrf_token %})"""
+    from django.middleware.csrf import get_token
+
+    get_token(request)
+    return hashlib.sha256(request.META['CSRF_COOKIE'].encode()).hexdigest()[:16]
+
+
+def _bump_sender(sender, **kwargs):
+    invalidate(sender)
+
+
+def connect_signals(labels: Iterable[str] = VERSIONED_MODELS) -> None:
+    for label in labels:
+        model = apps.get_model(label)
+        post_save.connect(_bump_sender, sender=model, dispatch_uid=f'version-save:{label}')
+        post_delete.connect(_bump_sender, sender=model, dispatch_uid=f'version-delete:{label}')
+
@@ -1,14 +1,22 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
 from inventory.models import InventoryItem
 from production.models import ProductBatch
 from orders.models import Order
+from .async_db import gather_queries
+from .conditional import versioned_condition
+from .metrics import registry
 
+@versioned_condition(InventoryItem, ProductBatch, Order)
 def dashboard(request):
     # Estadísticas para el dashboard
     total_items = InventoryItem.objects.count()
     low_stock_items = [item for item in InventoryItem.objects.all() if item.needs_restock()]
     total_batches = ProductBatch.objects.count()
-    active_orders = Order.objects.exclude(status__in=['DELIVERED', 'CANCELLED']).count()
+    active_orders = Order.objects.filter(status__in=Order.ACTIVE_STATUSES).count()
     
     context = {
         'title': 'Dashboard - Café Aroma',
@@ -19,4 +27,29 @@ def dashboard(request):
         'recent_batches': ProductBatch.objects.order_by('-mfg_date')[:3],
         'recent_orders': Order.objects.order_by('-created_at')[:3]
     }
-    return render(request, 'core/dashboard.html', context)
\ No newline at end of file
+    return render(request, 'core/dashboard.html', context)
+
+
+@versioned_condition(InventoryItem, ProductBatch, Order)
+async def dashboard_async(request):
+    """Versión ASGI del dashboard: las seis consultas se lanzan a la vez"""
+    stats = await gather_queries(
+        total_items=InventoryItem.objects.count,
+        # Mismo criterio que InventoryItem.needs_restock, contado en la BD
+        low_stock_count=InventoryItem.objects.filter(stock_kg__lte=F('min_stock_kg')).count,
+        total_batches=ProductBatch.objects.count,
+        active_orders=Order.objects.filter(status__in=Order.ACTIVE_STATUSES).count,
+        recent_batches=lambda: list(ProductBatch.objects.order_by('-mfg_date')[:3]),
+        recent_orders=lambda: list(Order.objects.order_by('-created_at')[:3]),
+    )
+    context = {'title': 'Dashboard - Café Aroma', **stats}
+    # La plantilla lee la sesión (mensajes): se renderiza en el hilo síncrono
+    return await sync_to_async(render)(request, 'core/dashboard.html', context)
+
+
+def metrics(request):
+    """Métricas del proceso en formato de texto de Prometheus (staff o IP de METRICS_ALLOWED_IPS)"""
+    allowed_ips = getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if not (request.user.is_staff or request.META.get('REMOTE_ADDR') in allowed_ips):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,17 +1,32 @@
 from django.contrib import admin
-from .models import RawGrain, InventoryItem, PurchaseOrder
+from .models import RawGrain, InventoryItem, Location, PurchaseOrder, StockLevel
 
 @admin.register(RawGrain)
 class RawGrainAdmin(admin.ModelAdmin):
-    list_display = ['lot_code', 'type', 'supplier', 'quantity_kg', 'received_at']
+    list_display = ['lot_code', 'type', 'supplier', 'quantity_kg', 'remaining_kg', 'inventory_item', 'received_at']
     list_filter = ['type', 'supplier']
     search_fields = ['lot_code', 'supplier']
 
 @admin.register(InventoryItem)
 class InventoryItemAdmin(admin.ModelAdmin):
-    list_display = ['sku', 'name', 'type', 'stock_kg', 'min_stock_kg']
+    list_display = ['sku', 'name', 'type', 'stock_kg', 'min_stock_kg', 'supplier', 'target_stock_kg']
     list_filter = ['type']
     search_fields = ['sku', 'name']
+    # El total se mantiene desde los niveles por ubicación: editarlo aquí lo desincronizaría
+    readonly_fields = ['stock_kg']
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ['code', 'name', 'kind']
+    list_filter = ['kind']
+
+@admin.register(StockLevel)
+class StockLevelAdmin(admin.ModelAdmin):
+    # Solo lectura del stock: los cambios pasan por los comandos para mantener el total del SKU
+    list_display = ['item', 'location', 'stock_kg']
+    list_filter = ['location']
+    search_fields = ['item__sku']
+    readonly_fields = ['item', 'location', 'stock_kg']
 
 @admin.register(PurchaseOrder)
 class PurchaseOrderAdmin(admin.ModelAdmin):
@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.utils.decorators import method_decorator
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.api import BulkItemError, ProjectedListMixin, VersionedReadMixin, bulk_payload
+from core.idempotency import idempotent
+from core.inventory_manager import InventoryManager
+from .models import InventoryItem, RawGrain
+from .repositories import DjangoInventoryRepo
+from .serializers import InventoryItemSerializer, RawGrainSerializer, StockChangeSerializer
+
+inv_manager = InventoryManager(DjangoInventoryRepo())
+
+
+class InventoryItemViewSet(VersionedReadMixin, ProjectedListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = InventoryItem.objects.all()
+    serializer_class = InventoryItemSerializer
+    lookup_field = 'sku'
+
+    @action(detail=False, methods=['post'], url_path='add-stock')
+    @method_decorator(idempotent)
+    def add_stock(self, request):
+        """[{"sku": ..., "kg": ..., "location": ...}, ...] — todo o nada"""
+        return self._change_stock(request, inv_manager.add_stock)
+
+    @action(detail=False, methods=['post'], url_path='consume-stock')
+    @method_decorator(idempotent)
+    def consume_stock(self, request):
+        """[{"sku": ..., "kg": ...}, ...] — todo o nada (FIFO por lotes, como en la vista)"""
+        return self._change_stock(request, inv_manager.consume_stock)
+
+    def _change_stock(self, request, operation):
+        changes = bulk_payload(request.data, StockChangeSerializer)
+        items = []
+        with transaction.atomic():
+            for index, change in enumerate(changes):
+                try:
+                    items.append(operation(change['sku'], change['kg'], location=change.get('location') or None))
+                except ValueError as e:
+                    raise BulkItemError(index, str(e))
+        serializer = InventoryItemSerializer(items, many=True, fields=['sku', 'stock_kg', 'min_stock_kg'])
+        return Response({'results': serializer.data})
+
+
+class RawGrainViewSet(VersionedReadMixin, ProjectedListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = RawGrain.objects.all()
+    serializer_class = RawGrainSerializer
+    lookup_field = 'lot_code'
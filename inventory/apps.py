@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class InventoryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "inventory"
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from core.inventory_manager import InventoryManager
+        from .locations import create_default_level
+        from .models import InventoryItem
+        from .replenishment import ReplenishmentEngine
+        from .repositories import DjangoInventoryRepo
+
+        InventoryManager(DjangoInventoryRepo()).attach(ReplenishmentEngine())
+        post_save.connect(create_default_level, sender=InventoryItem, dispatch_uid='inventory-default-level')
@@ -1,7 +1,15 @@
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 import json
+from .locations import adjust_stock, apply_stock_deltas, get_location, move_stock
+from .models import InventoryItem, Location, StockMovement
 from .repositories import DjangoInventoryRepo
+from .traceability import allocate_lots, release_lots
+from core.events import StockEvent
+from core.inventory_manager import InventoryManager
+from core.tracing import traced
 
 class Command(ABC):
     @abstractmethod
@@ -13,27 +21,40 @@ class Command(ABC):
         pass
 
 class AgregarStockCommand(Command):
-    def __init__(self, repo, sku: str, kg: float):
+    def __init__(self, repo, sku: str, kg: float, location: str = None):
         self.repo = repo
         self.sku = sku
         self.kg = kg
+        # Código de la ubicación; sin él, la ubicación por defecto
+        self.location = location
         self._previous_stock = None
         self._executed = False
 
+    @traced('inventory.command.execute', command='AgregarStockCommand', record_args=('self.sku', 'self.kg'))
     def execute(self):
         item = self.repo.get_item(self.sku)
+        site = get_location(self.location)
+        self.location = site.code
         self._previous_stock = item.stock_kg
-        item.stock_kg += self.kg
-        self.repo.save(item)
+        # Nivel y movimiento en la misma transacción: no queda stock sin su movimiento
+        with transaction.atomic():
+            adjust_stock(item, site, self.kg)
+            StockMovement.record(item, self.kg, 'RECEIPT', location=site)
         self._executed = True
-        return f"Agregados {self.kg}kg a {self.sku}. Stock actual: {item.stock_kg}kg"
+        InventoryManager(self.repo).notify(StockEvent.from_item(item, self.kg))
+        return f"Agregados {self.kg}kg a {self.sku} en {site.code}. Stock actual: {item.stock_kg}kg"
 
+    @traced('inventory.command.undo', command='AgregarStockCommand', record_args=('self.sku', 'self.kg'))
     def undo(self):
         if self._executed and self._previous_stock is not None:
+            # Se revierte el delta en su ubicación: los movimientos posteriores de otros se conservan
             item = self.repo.get_item(self.sku)
-            item.stock_kg = self._previous_stock
-            self.repo.save(item)
-            return f"Stock de {self.sku} revertido a {self._previous_stock}kg (undo)"
+            site = get_location(self.location)
+            with transaction.atomic():
+                adjust_stock(item, site, -self.kg)
+                StockMovement.record(item, -self.kg, 'UNDO', location=site)
+            InventoryManager(self.repo).notify(StockEvent.from_item(item, -self.kg))
+            return f"Stock de {self.sku} revertido a {item.stock_kg}kg (undo)"
         return "No se puede deshacer - comando no ejecutado"
 
     def to_dict(self):
@@ -41,35 +62,52 @@ class AgregarStockCommand(Command):
             'type': 'AgregarStockCommand',
             'sku': self.sku,
             'kg': self.kg,
+            'location': self.location,
             'previous_stock': self._previous_stock,
             'executed': self._executed
         }
 
 class ConsumirStockCommand(Command):
-    def __init__(self, repo, sku: str, kg: float):
+    def __init__(self, repo, sku: str, kg: float, location: str = None):
         self.repo = repo
         self.sku = sku
         self.kg = kg
+        self.location = location
         self._previous_stock = None
+        self._movement_id = None
         self._executed = False
 
+    @traced('inventory.command.execute', command='ConsumirStockCommand', record_args=('self.sku', 'self.kg'))
     def execute(self):
         item = self.repo.get_item(self.sku)
+        site = get_location(self.location)
+        self.location = site.code
         self._previous_stock = item.stock_kg
-        if item.stock_kg >= self.kg:
-            item.stock_kg -= self.kg
-            self.repo.save(item)
-            self._executed = True
-            return f"Consumidos {self.kg}kg de {self.sku}. Stock actual: {item.stock_kg}kg"
-        else:
-            raise ValueError(f"Stock insuficiente en {self.sku}")
+        with transaction.atomic():
+            try:
+                adjust_stock(item, site, -self.kg)
+            except ValueError:
+                raise ValueError(f"Stock insuficiente en {self.sku} ({site.code})")
+            movement = StockMovement.record(item, -self.kg, 'CONSUMPTION', location=site)
+            # Consume las capas de costo FIFO del SKU
+            allocate_lots(item, self.kg, movement=movement)
+        self._movement_id = movement.id
+        self._executed = True
+        InventoryManager(self.repo).notify(StockEvent.from_item(item, -self.kg))
+        return f"Consumidos {self.kg}kg de {self.sku} en {site.code}. Stock actual: {item.stock_kg}kg"
 
+    @traced('inventory.command.undo', command='ConsumirStockCommand', record_args=('self.sku', 'self.kg'))
     def undo(self):
         if self._executed and self._previous_stock is not None:
             item = self.repo.get_item(self.sku)
-            item.stock_kg = self._previous_stock
-            self.repo.save(item)
-            return f"Stock de {self.sku} revertido a {self._previous_stock}kg (undo)"
+            site = get_location(self.location)
+            with transaction.atomic():
+                adjust_stock(item, site, self.kg)
+                if self._movement_id is not None:
+                    release_lots(self._movement_id)
+                StockMovement.record(item, self.kg, 'UNDO', location=site)
+            InventoryManager(self.repo).notify(StockEvent.from_item(item, self.kg))
+            return f"Stock de {self.sku} revertido a {item.stock_kg}kg (undo)"
         return "No se puede deshacer - comando no ejecutado"
 
     def to_dict(self):
@@ -77,7 +115,55 @@ class ConsumirStockCommand(Command):
             'type': 'ConsumirStockCommand',
             'sku': self.sku,
             'kg': self.kg,
+            'location': self.location,
             'previous_stock': self._previous_stock,
+            'movement_id': self._movement_id,
+            'executed': self._executed
+        }
+
+class TransferirStockCommand(Command):
+    """Traslado entre ubicaciones: mueve niveles, el total del SKU no cambia"""
+    def __init__(self, repo, sku: str, kg: float, from_location: str, to_location: str):
+        self.repo = repo
+        self.sku = sku
+        self.kg = kg
+        self.from_location = from_location
+        self.to_location = to_location
+        self._executed = False
+
+    def _move(self, source_code: str, target_code: str):
+        item = self.repo.get_item(self.sku)
+        source, target = get_location(source_code), get_location(target_code)
+        move_stock(item, source, target, self.kg)
+        StockMovement.objects.bulk_create([
+            StockMovement(item=item, delta_kg=-self.kg, stock_after_kg=item.stock_kg, reason='TRANSFER_OUT',
+                          location=source),
+            StockMovement(item=item, delta_kg=self.kg, stock_after_kg=item.stock_kg, reason='TRANSFER_IN',
+                          location=target),
+        ])
+        return source, target
+
+    @traced('inventory.command.execute', command='TransferirStockCommand', record_args=('self.sku', 'self.kg'))
+    def execute(self):
+        source, target = self._move(self.from_location, self.to_location)
+        self._executed = True
+        return f"Trasladados {self.kg}kg de {self.sku} de {source.code} a {target.code}"
+
+    @traced('inventory.command.undo', command='TransferirStockCommand', record_args=('self.sku', 'self.kg'))
+    def undo(self):
+        if self._executed:
+            self._move(self.to_location, self.from_location)
+            self._executed = False
+            return f"Traslado de {self.kg}kg de {self.sku} revertido a {self.from_location} (undo)"
+        return "No se puede deshacer - comando no ejecutado"
+
+    def to_dict(self):
+        return {
+            'type': 'TransferirStockCommand',
+            'sku': self.sku,
+            'kg': self.kg,
+            'from_location': self.from_location,
+            'to_location': self.to_location,
             'executed': self._executed
         }
 
@@ -88,13 +174,17 @@ class AgregarProductoCommand(Command):
         self._added_item = None
         self._executed = False
 
+    @traced('inventory.command.execute', command='AgregarProductoCommand')
     def execute(self):
         from .models import InventoryItem
         self._added_item = InventoryItem(**self.item_data)
         self.repo.save(self._added_item)
+        if self._added_item.stock_kg:
+            StockMovement.record(self._added_item, self._added_item.stock_kg, 'INITIAL')
         self._executed = True
         return f"Producto {self._added_item.sku} agregado exitosamente"
 
+    @traced('inventory.command.undo', command='AgregarProductoCommand')
     def undo(self):
         if self._executed and self._added_item:
             self._added_item.delete()
@@ -108,6 +198,139 @@ class AgregarProductoCommand(Command):
             'executed': self._executed
         }
 
+class _PrefetchedRepo:
+    """Repositorio que sirve los items ya leídos por la macro y delega el resto"""
+    def __init__(self, repo, items: dict):
+        self.repo = repo
+        self.items = items
+
+    def get_item(self, sku: str):
+        if sku in self.items:
+            return self.items[sku]
+        return self.repo.get_item(sku)
+
+    def save(self, item):
+        self.repo.save(item)
+
+class MacroCommand(Command):
+    """
+    Varios comandos de stock/producto como una sola operación (p. ej. una recepción de 30 líneas):
+    se ejecutan en una transacción con los items leídos en una consulta, quedan como una sola
+    entrada del historial y se deshacen juntos con una escritura en bloque por tabla.
+    """
+    STOCK_COMMANDS = (AgregarStockCommand, ConsumirStockCommand)
+
+    def __init__(self, repo, commands: list, label: str = ''):
+        self.repo = repo
+        self.commands = commands
+        self.label = label or f'{len(commands)} comandos'
+        self._executed = False
+
+    @traced('inventory.command.execute', command='MacroCommand')
+    def execute(self):
+        if not self.commands:
+            raise ValueError("La macro no tiene comandos")
+        skus = [command.sku for command in self.commands if isinstance(command, self.STOCK_COMMANDS)]
+        with transaction.atomic():
+            repo = _PrefetchedRepo(self.repo, InventoryItem.objects.in_bulk(skus, field_name='sku'))
+            for index, command in enumerate(self.commands, start=1):
+                command.repo = repo
+                try:
+                    command.execute()
+                except (ValueError, ObjectDoesNotExist) as e:
+                    raise ValueError(f"Línea {index}: {e}")
+        self._executed = True
+        return f"Macro '{self.label}' ejecutada: {len(self.commands)} comandos en una transacción"
+
+    @traced('inventory.command.undo', command='MacroCommand')
+    def undo(self):
+        if not self._executed:
+            return "No se puede deshacer - comando no ejecutado"
+        executed = [command for command in self.commands if command._executed]
+        new_skus = {command.item_data['sku'] for command in executed if isinstance(command, AgregarProductoCommand)}
+        # Los productos creados por la macro se borran enteros (con sus niveles y movimientos)
+        stock = [command for command in executed
+                 if isinstance(command, self.STOCK_COMMANDS) and command.sku not in new_skus]
+
+        with transaction.atomic():
+            items = InventoryItem.objects.in_bulk({command.sku for command in stock}, field_name='sku')
+            locations = Location.objects.in_bulk({command.location for command in stock}, field_name='code')
+            deltas = defaultdict(float)
+            for command in stock:
+                sign = -1 if isinstance(command, AgregarStockCommand) else 1
+                deltas[(items[command.sku].id, locations[command.location].id)] += sign * command.kg
+            updated = apply_stock_deltas(dict(deltas)) if deltas else {}
+
+            movement_ids = [command._movement_id for command in stock
+                            if isinstance(command, ConsumirStockCommand) and command._movement_id is not None]
+            if movement_ids:
+                release_lots(*movement_ids)
+            StockMovement.objects.bulk_create([
+                StockMovement(item=updated[items[command.sku].id],
+                              delta_kg=-command.kg if isinstance(command, AgregarStockCommand) else command.kg,
+                              stock_after_kg=updated[items[command.sku].id].stock_kg, reason='UNDO',
+                              location=locations[command.location])
+                for command in stock
+            ])
+            if new_skus:
+                InventoryItem.objects.filter(sku__in=new_skus).delete()
+
+        net = defaultdict(float)
+        for (item_id, _), delta in deltas.items():
+            net[item_id] += delta
+        InventoryManager(self.repo).notify(*[StockEvent.from_item(updated[item_id], delta)
+                                             for item_id, delta in net.items()])
+        self._executed = False
+        return f"Macro '{self.label}' revertida: {len(executed)} comandos (undo)"
+
+    def to_dict(self):
+        return {
+            'type': 'MacroCommand',
+            'label': self.label,
+            'commands': [command.to_dict() for command in self.commands],
+            'executed': self._executed
+        }
+
+def command_from_dict(repo, data: dict) -> Command:
+    """Recrea un comando del historial de la sesión (None si el tipo no se reconoce)"""
+    command_type = data['type']
+    
+    if command_type == 'AgregarStockCommand':
+        command = AgregarStockCommand(repo, data['sku'], data['kg'], data.get('location'))
+        command._executed = data['executed']
+        command._previous_stock = data['previous_stock']
+        
+    elif command_type == 'ConsumirStockCommand':
+        command = ConsumirStockCommand(repo, data['sku'], data['kg'], data.get('location'))
+        command._executed = data['executed']
+        command._previous_stock = data['previous_stock']
+        command._movement_id = data.get('movement_id')
+
+    elif command_type == 'TransferirStockCommand':
+        command = TransferirStockCommand(repo, data['sku'], data['kg'], data['from_location'], data['to_location'])
+        command._executed = data['executed']
+
+    elif command_type == 'MacroCommand':
+        children = [command_from_dict(repo, child) for child in data['commands']]
+        if None in children:
+            return None
+        command = MacroCommand(repo, children, data.get('label', ''))
+        command._executed = data['executed']
+        
+    elif command_type == 'AgregarProductoCommand':
+        command = AgregarProductoCommand(repo, data['item_data'])
+        command._executed = data['executed']
+        if command._executed:
+            # Recuperar el item agregado
+            try:
+                command._added_item = repo.get_item(data['item_data']['sku'])
+            except ObjectDoesNotExist:
+                command._added_item = None
+    
+    else:
+        return None
+    return command
+
 class CommandInvoker:
     def __init__(self, request):
         self.request = request
@@ -127,42 +350,23 @@ class CommandInvoker:
 
     def undo_last(self):
         if self._history:
-            # Recuperar el último comando
-            last_command_dict = self._history.pop()
-            self.request.session['command_history'] = self._history
-            self.request.session.modified = True
-            
-            # Recrear el comando a partir del dict
-            repo = DjangoInventoryRepo()
-            command_type = last_command_dict['type']
-            
-            if command_type == 'AgregarStockCommand':
-                command = AgregarStockCommand(repo, last_command_dict['sku'], last_command_dict['kg'])
-                command._executed = last_command_dict['executed']
-                command._previous_stock = last_command_dict['previous_stock']
-                
-            elif command_type == 'ConsumirStockCommand':
-                command = ConsumirStockCommand(repo, last_command_dict['sku'], last_command_dict['kg'])
-                command._executed = last_command_dict['executed']
-                command._previous_stock = last_command_dict['previous_stock']
-                
-            elif command_type == 'AgregarProductoCommand':
-                command = AgregarProductoCommand(repo, last_command_dict['item_data'])
-                command._executed = last_command_dict['executed']
-                if command._executed:
-                    # Recuperar el item agregado
-                    try:
-                        command._added_item = repo.get_item(last_command_dict['item_data']['sku'])
-                    except ObjectDoesNotExist:
-                        command._added_item = None
-            
-            else:
+            # Recrear el último comando a partir del dict
+            command = command_from_dict(DjangoInventoryRepo(), self._history[-1])
+            if command is None:
+                self._pop_last()
                 return "Tipo de comando no reconocido"
-            
-            # Ejecutar undo
-            return command.undo()
+
+            # Ejecutar undo; si falla, el comando sigue en el historial para reintentarlo
+            result = command.undo()
+            self._pop_last()
+            return result
         return "No hay comandos para deshacer"
 
+    def _pop_last(self):
+        self._history.pop()
+        self.request.session['command_history'] = self._history
+        self.request.session.modified = True
+
     def get_history(self):
         return self._history
 
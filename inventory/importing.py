@@ -0,0 +1,244 @@
+import csv
+import io
+import json
+import logging
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Set
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from core.events import StockEvent
+from core.inventory_manager import InventoryManager
+from core.models import GrainType
+from core import versioning
+from .locations import default_location, ensure_level
+from .models import InventoryItem, RawGrain, StockLevel, StockMovement
+from .repositories import DjangoInventoryRepo
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'jsonl')
+DEFAULT_CHUNK_SIZE = 2000
+# Solo se guardan los primeros errores; el resto solo se cuenta
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ImportResult:
+    """Resumen de una importación: filas creadas, rechazadas y kg ingresados por SKU"""
+    created: int = 0
+    rejected: int = 0
+    received_kg: Dict[str, float] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+    def reject(self, line: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Línea {line}: {reason}")
+
+    def as_dict(self) -> dict:
+        return {'created': self.created, 'rejected': self.rejected,
+                'received_kg': self.received_kg, 'errors': self.errors}
+
+
+def detect_format(filename: str, default: str = 'csv') -> str:
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_records(stream: IO[str], fmt: str) -> Iterator[tuple]:
+    """Lee el archivo fila a fila (sin cargarlo entero); produce (número de línea, dict o error)"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_num, ValueError(f"JSON inválido ({e.msg})")
+                continue
+            yield line_num, record if isinstance(record, dict) else ValueError("Se esperaba un objeto JSON")
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}. Opciones: {', '.join(FORMATS)}")
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class RawGrainImporter:
+    """
+    Importa recepciones de grano verde por bloques.
+
+    Cada bloque se valida en memoria, se comprueban sus lot_code contra los ya vistos
+    en el archivo y contra la BD (un solo `lot_code__in` por bloque) y se inserta con
+    `bulk_create` dentro de una transacción, junto con un UPDATE agregado de stock por SKU.
+    La memoria solo crece con el conjunto de lot_code vistos. Si una importación concurrente
+    gana la carrera por un lot_code, esas filas se rechazan como duplicadas y el bloque se reintenta.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, notify: bool = True):
+        self.chunk_size = chunk_size
+        self.notify = notify
+        self._seen_lots: Set[str] = set()
+        self._sku_ids: Dict[str, Optional[int]] = {}
+
+    def run(self, stream: IO[str], fmt: str = 'csv') -> ImportResult:
+        result = ImportResult()
+        for chunk in _chunks(iter_records(stream, fmt), self.chunk_size):
+            self._import_chunk(chunk, result)
+        return result
+
+    def _import_chunk(self, chunk: list, result: ImportResult) -> None:
+        self._resolve_skus({str(row.get('sku') or '').strip() for _, row in chunk if isinstance(row, dict)})
+        candidates = []
+        for line, row in chunk:
+            if isinstance(row, Exception):
+                result.reject(line, str(row))
+                continue
+            try:
+                candidates.append((line, self._build(row)))
+            except ValueError as e:
+                result.reject(line, str(e))
+
+        existing = self._existing_lots(candidates)
+        rows = []
+        for line, grain in candidates:
+            if grain.lot_code in existing or grain.lot_code in self._seen_lots:
+                result.reject(line, f"lot_code duplicado: {grain.lot_code}")
+                continue
+            self._seen_lots.add(grain.lot_code)
+            rows.append((line, grain))
+
+        while rows:
+            received = defaultdict(float)
+            for _, grain in rows:
+                if grain.inventory_item_id is not None:
+                    received[grain.inventory_item_id] += grain.quantity_kg
+            try:
+                with transaction.atomic():
+                    RawGrain.objects.bulk_create([grain for _, grain in rows], batch_size=500)
+                    versioning.invalidate(RawGrain)
+                    self._receive_stock(received, result)
+            except IntegrityError:
+                # Otra importación insertó alguno de estos lot_code después de la comprobación:
+                # esas filas son duplicadas y el resto del bloque se vuelve a intentar
+                taken = self._existing_lots(rows)
+                if not taken:
+                    raise
+                for line, grain in rows:
+                    if grain.lot_code in taken:
+                        result.reject(line, f"lot_code duplicado: {grain.lot_code}")
+                rows = [(line, grain) for line, grain in rows if grain.lot_code not in taken]
+                continue
+            result.created += len(rows)
+            return
+
+    @staticmethod
+    def _existing_lots(rows: list) -> Set[str]:
+        return set(RawGrain.objects.filter(
+            lot_code__in=[grain.lot_code for _, grain in rows]).values_list('lot_code', flat=True))
+
+    def _build(self, row: dict) -> RawGrain:
+        lot_code = str(row.get('lot_code') or '').strip()
+        if not lot_code:
+            raise ValueError("Falta lot_code")
+        if len(lot_code) > RawGrain._meta.get_field('lot_code').max_length:
+            raise ValueError(f"lot_code demasiado largo: {lot_code}")
+
+        grain_type = str(row.get('type') or '').strip().upper()
+        if grain_type not in GrainType.values:
+            raise ValueError(f"Tipo de grano inválido: {row.get('type')!r}")
+
+        try:
+            quantity_kg = float(row.get('quantity_kg'))
+        except (TypeError, ValueError):
+            raise ValueError(f"quantity_kg inválido: {row.get('quantity_kg')!r}")
+        if not math.isfinite(quantity_kg) or quantity_kg <= 0:
+            raise ValueError("quantity_kg debe ser mayor que 0")
+
+        cost_field = RawGrain._meta.get_field('unit_cost')
+        try:
+            unit_cost = Decimal(str(row.get('unit_cost'))).quantize(Decimal('0.01'))
+            # NaN pasa por quantize y solo falla al compararlo
+            if not unit_cost.is_finite():
+                raise InvalidOperation
+            if unit_cost < 0:
+                raise ValueError("unit_cost no puede ser negativo")
+            if abs(unit_cost) >= Decimal(10) ** (cost_field.max_digits - cost_field.decimal_places):
+                raise ValueError(f"unit_cost excede {cost_field.max_digits} dígitos: {unit_cost}")
+        except InvalidOperation:
+            raise ValueError(f"unit_cost inválido: {row.get('unit_cost')!r}")
+
+        supplier = str(row.get('supplier') or '').strip()
+        if not supplier:
+            raise ValueError("Falta supplier")
+
+        sku = str(row.get('sku') or '').strip()
+        item_id = None
+        if sku:
+            item_id = self._sku_ids.get(sku)
+            if item_id is None:
+                raise ValueError(f"SKU desconocido: {sku}")
+
+        # bulk_create no pasa por save(): los kg abiertos del lote se fijan aquí
+        return RawGrain(supplier=supplier, type=grain_type, origin=str(row.get('origin') or '').strip(),
+                        lot_code=lot_code, quantity_kg=quantity_kg, unit_cost=unit_cost,
+                        inventory_item_id=item_id, remaining_kg=quantity_kg)
+
+    def _resolve_skus(self, skus: Set[str]) -> None:
+        missing = [sku for sku in skus if sku and sku not in self._sku_ids]
+        if not missing:
+            return
+        found = dict(InventoryItem.objects.filter(sku__in=missing).values_list('sku', 'id'))
+        for sku in missing:
+            self._sku_ids[sku] = found.get(sku)
+
+    def _receive_stock(self, received: Dict[int, float], result: ImportResult) -> None:
+        """Un UPDATE por SKU con el total del bloque, más su movimiento de recepción"""
+        # Las recepciones entran en la ubicación por defecto (la tostaduría)
+        location = default_location()
+        with_level = set(StockLevel.objects.filter(location=location, item_id__in=list(received))
+                         .values_list('item_id', flat=True))
+        for item_id, kg in received.items():
+            if item_id not in with_level:
+                ensure_level(InventoryItem(pk=item_id), location)
+            StockLevel.objects.filter(item_id=item_id, location=location).update(stock_kg=F('stock_kg') + kg)
+            InventoryItem.objects.filter(id=item_id).update(stock_kg=F('stock_kg') + kg)
+
+        items = InventoryItem.objects.filter(id__in=list(received)).only('id', 'sku', 'stock_kg', 'min_stock_kg')
+        movements, events = [], []
+        for item in items:
+            kg = received[item.id]
+            movements.append(StockMovement(item=item, delta_kg=kg, stock_after_kg=item.stock_kg, reason='RECEIPT',
+                                           location=location))
+            events.append(StockEvent.from_item(item, kg))
+            result.received_kg[item.sku] = round(result.received_kg.get(item.sku, 0.0) + kg, 6)
+        StockMovement.objects.bulk_create(movements)
+        # El UPDATE con F() no emite señales: se invalida a mano la tabla de inventario cacheada
+        versioning.invalidate(InventoryItem, StockLevel)
+
+        if self.notify and events:
+            InventoryManager(DjangoInventoryRepo()).notify(*events)
+
+
+def import_raw_grains(stream, fmt: str = 'csv', chunk_size: int = DEFAULT_CHUNK_SIZE) -> ImportResult:
+    """Importa un archivo CSV o JSON Lines de lotes; acepta flujos de texto o binarios (UTF-8)"""
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    return RawGrainImporter(chunk_size=chunk_size).run(stream, fmt)
@@ -0,0 +1,116 @@
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+
+from core import versioning
+from .models import InventoryItem, Location, StockLevel
+
+# Stock por ubicación (tostaduría y bodegas). Cada cambio toca la fila de StockLevel de su
+# ubicación con un UPDATE condicional, y el total del SKU (InventoryItem.stock_kg) se ajusta
+# en el mismo paso con F(): el total nunca se recalcula sumando niveles al leer.
+
+
+def default_location() -> Location:
+    """Ubicación de los movimientos que no indican una (la tostaduría)"""
+    code = getattr(settings, 'DEFAULT_LOCATION_CODE', 'TOSTADURIA')
+    location, _ = Location.objects.get_or_create(code=code, defaults={'name': 'Tostaduría', 'kind': 'ROASTERY'})
+    return location
+
+
+def get_location(code: Optional[str] = None) -> Location:
+    if not code:
+        return default_location()
+    try:
+        return Location.objects.get(code=code)
+    except Location.DoesNotExist:
+        raise ValueError(f"Ubicación {code} no encontrada")
+
+
+def ensure_level(item: InventoryItem, location: Location) -> StockLevel:
+    """
+    Nivel del SKU en la ubicación, creándolo si falta. El de la ubicación por defecto arranca
+    con lo que el total no reparte entre las demás (items creados con bulk_create o antes de
+    las ubicaciones); el de cualquier otra, en cero.
+    """
+    level = StockLevel.objects.filter(item=item, location=location).first()
+    if level is not None:
+        return level
+    initial = 0.0
+    if location.code == default_location().code:
+        others = StockLevel.objects.filter(item=item).aggregate(total=Sum('stock_kg'))['total'] or 0.0
+        total = InventoryItem.objects.filter(pk=item.pk).values_list('stock_kg', flat=True).get()
+        initial = max(total - others, 0.0)
+    level, _ = StockLevel.objects.get_or_create(item=item, location=location, defaults={'stock_kg': initial})
+    return level
+
+
+def adjust_stock(item: InventoryItem, location: Location, delta_kg: float) -> InventoryItem:
+    """Suma delta_kg al nivel de la ubicación y al total del SKU; sin stock suficiente → ValueError"""
+    with transaction.atomic():
+        ensure_level(item, location)
+        levels = StockLevel.objects.filter(item=item, location=location)
+        if delta_kg < 0:
+            # La comprobación va en el propio UPDATE: dos consumos simultáneos no dejan el nivel negativo
+            levels = levels.filter(stock_kg__gte=-delta_kg)
+        if not levels.update(stock_kg=F('stock_kg') + delta_kg):
+            raise ValueError(f"Stock insuficiente para {item.sku} en {location.code}")
+        InventoryItem.objects.filter(pk=item.pk).update(stock_kg=F('stock_kg') + delta_kg)
+    item.refresh_from_db(fields=['stock_kg'])
+    # Los UPDATE con F() no emiten señales
+    versioning.invalidate(InventoryItem, StockLevel)
+    return item
+
+
+def move_stock(item: InventoryItem, source: Location, target: Location, kg: float) -> None:
+    """Traslada kg entre dos ubicaciones; el total del SKU no cambia"""
+    if source.pk == target.pk:
+        raise ValueError("El origen y el destino del traslado son la misma ubicación")
+    if kg <= 0:
+        raise ValueError("La cantidad a trasladar debe ser mayor que 0")
+    with transaction.atomic():
+        ensure_level(item, source)
+        ensure_level(item, target)
+        moved = StockLevel.objects.filter(item=item, location=source, stock_kg__gte=kg).update(
+            stock_kg=F('stock_kg') - kg)
+        if not moved:
+            raise ValueError(f"Stock insuficiente para {item.sku} en {source.code}")
+        StockLevel.objects.filter(item=item, location=target).update(stock_kg=F('stock_kg') + kg)
+    versioning.invalidate(StockLevel)
+
+
+def apply_stock_deltas(deltas: Dict[Tuple[int, int], float]) -> Dict[int, InventoryItem]:
+    """
+    Aplica de una vez {(item_id, location_id): delta_kg}: lee los niveles y los items en una
+    consulta cada uno (bloqueados) y los escribe con un bulk_update por tabla. Si algún nivel
+    quedaría negativo → ValueError y no se escribe nada. Devuelve los items por id.
+    """
+    item_ids = {item_id for item_id, _ in deltas}
+    with transaction.atomic():
+        levels = {
+            (level.item_id, level.location_id): level
+            for level in StockLevel.objects.select_for_update().select_related('location').filter(
+                item_id__in=item_ids, location_id__in={location_id for _, location_id in deltas})
+        }
+        items = InventoryItem.objects.select_for_update().in_bulk(list(item_ids))
+        for (item_id, location_id), delta in deltas.items():
+            level = levels.get((item_id, location_id))
+            if level is None or item_id not in items or level.stock_kg + delta < 0:
+                sku = items[item_id].sku if item_id in items else item_id
+                where = level.location.code if level is not None else location_id
+                raise ValueError(f"Stock insuficiente para {sku} en {where}")
+            level.stock_kg += delta
+            items[item_id].stock_kg += delta
+        StockLevel.objects.bulk_update([levels[key] for key in deltas], ['stock_kg'])
+        InventoryItem.objects.bulk_update(list(items.values()), ['stock_kg'])
+    # bulk_update no emite señales
+    versioning.invalidate(InventoryItem, StockLevel)
+    return items
+
+
+def create_default_level(sender, instance: InventoryItem, created: bool, raw: bool = False, **kwargs) -> None:
+    """post_save de InventoryItem: el stock inicial de un SKU nuevo queda en la ubicación por defecto"""
+    if created and not raw:
+        StockLevel.objects.get_or_create(item=instance, location=default_location(),
+                                         defaults={'stock_kg': instance.stock_kg})
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from inventory.forecasting import apply_reorder_points, forecast_demand
+
+
+class Command(BaseCommand):
+    help = "Calcula puntos de reorden dinámicos a partir del historial de consumo (y opcionalmente los aplica)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365, help='Días de historial a considerar')
+        parser.add_argument('--window', type=int, default=28, help='Ventana de la media móvil (días)')
+        parser.add_argument('--alpha', type=float, default=0.3, help='Factor de suavizado exponencial')
+        parser.add_argument('--lead-time', type=float, default=7, help='Plazo de entrega del proveedor (días)')
+        parser.add_argument('--z', type=float, default=1.65, help='Factor de nivel de servicio')
+        parser.add_argument('--apply', action='store_true', help='Guardar los puntos en min_stock_kg')
+
+    def handle(self, *args, **options):
+        forecast = forecast_demand(
+            history_days=options['days'],
+            window=options['window'],
+            alpha=options['alpha'],
+            lead_time_days=options['lead_time'],
+            service_z=options['z'],
+        )
+
+        for row in forecast.as_rows():
+            self.stdout.write(
+                f"{row['sku']:<20} media={row['moving_average']:.2f} ewma={row['ewma']:.2f} "
+                f"σ={row['std']:.2f} → punto de reorden {row['reorder_point']:.2f} kg"
+            )
+
+        if options['apply']:
+            updated = apply_reorder_points(forecast)
+            self.stdout.write(self.style.SUCCESS(f"✅ {updated} puntos de reorden actualizados"))
+        else:
+            self.stdout.write(f"{len(forecast.skus)} SKUs analizados (usa --apply para guardar)")
@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.importing import DEFAULT_CHUNK_SIZE, FORMATS, detect_format, import_raw_grains
+
+
+class Command(BaseCommand):
+    help = "Importa lotes de grano verde desde un archivo CSV o JSON Lines (por bloques, sin cargarlo entero)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Ruta del archivo ('-' para leer de la entrada estándar)")
+        parser.add_argument('--format', choices=FORMATS, help='Formato del archivo (por defecto, según la extensión)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Filas por bloque')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        try:
+            if path == '-':
+                result = import_raw_grains(sys.stdin, fmt, options['chunk_size'])
+            else:
+                with open(path, encoding='utf-8-sig', newline='') as stream:
+                    result = import_raw_grains(stream, fmt, options['chunk_size'])
+        except OSError as e:
+            raise CommandError(f"No se pudo leer {path}: {e}")
+
+        for error in result.errors:
+            self.stderr.write(f"⚠️ {error}")
+        for sku, kg in sorted(result.received_kg.items()):
+            self.stdout.write(f"{sku:<20} +{kg:.2f} kg")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {result.created} lotes importados, {result.rejected} rechazados"))
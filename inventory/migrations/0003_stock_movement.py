@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_replenishment_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta_kg', models.FloatField()),
+                ('stock_after_kg', models.FloatField()),
+                ('reason', models.CharField(choices=[('INITIAL', 'Stock inicial'), ('RECEIPT', 'Entrada'), ('CONSUMPTION', 'Consumo'), ('UNDO', 'Reversión')], max_length=12)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='inventory.inventoryitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'created_at'], name='movement_item_created_idx'), models.Index(fields=['reason', 'created_at'], name='movement_reason_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def init_remaining_kg(apps, schema_editor):
+    # Los lotes existentes se consideran sin consumir
+    RawGrain = apps.get_model('inventory', 'RawGrain')
+    RawGrain.objects.filter(remaining_kg__isnull=True).update(remaining_kg=F('quantity_kg'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_stock_movement'),
+        ('production', '0003_alter_productiontask_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LotConsumption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('qty_kg', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='rawgrain',
+            name='inventory_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lots', to='inventory.inventoryitem'),
+        ),
+        migrations.AddField(
+            model_name='rawgrain',
+            name='remaining_kg',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='rawgrain',
+            index=models.Index(condition=models.Q(('remaining_kg__gt', 0)), fields=['inventory_item', 'received_at'], name='rawgrain_open_lots_idx'),
+        ),
+        migrations.AddField(
+            model_name='lotconsumption',
+            name='movement',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='lot_consumptions', to='inventory.stockmovement'),
+        ),
+        migrations.AddField(
+            model_name='lotconsumption',
+            name='production_task',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lot_consumptions', to='production.productiontask'),
+        ),
+        migrations.AddField(
+            model_name='lotconsumption',
+            name='raw_grain',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='consumptions', to='inventory.rawgrain'),
+        ),
+        migrations.RunPython(init_remaining_kg, migrations.RunPython.noop),
+    ]
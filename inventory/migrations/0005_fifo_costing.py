@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_lot_traceability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lotconsumption',
+            name='cost',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='lotconsumption',
+            name='unit_cost',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_fifo_costing'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(condition=models.Q(('status__in', ['PENDING', 'ORDERED'])), fields=['inventory_item', 'status'], name='po_open_item_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rawgrain',
+            index=models.Index(fields=['-received_at'], name='rawgrain_received_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_default_location(apps, schema_editor):
+    """Todo el stock existente queda en la tostaduría"""
+    Location = apps.get_model('inventory', 'Location')
+    StockLevel = apps.get_model('inventory', 'StockLevel')
+    InventoryItem = apps.get_model('inventory', 'InventoryItem')
+    code = getattr(settings, 'DEFAULT_LOCATION_CODE', 'TOSTADURIA')
+    location, _ = Location.objects.get_or_create(code=code, defaults={'name': 'Tostaduría', 'kind': 'ROASTERY'})
+    StockLevel.objects.bulk_create([
+        StockLevel(item_id=item_id, location=location, stock_kg=stock_kg)
+        for item_id, stock_kg in InventoryItem.objects.values_list('id', 'stock_kg').iterator()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=20, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('ROASTERY', 'Tostaduría'), ('WAREHOUSE', 'Bodega')], default='WAREHOUSE', max_length=10)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='stockmovement',
+            name='reason',
+            field=models.CharField(choices=[('INITIAL', 'Stock inicial'), ('RECEIPT', 'Entrada'), ('CONSUMPTION', 'Consumo'), ('UNDO', 'Reversión'), ('TRANSFER_OUT', 'Traslado (salida)'), ('TRANSFER_IN', 'Traslado (entrada)')], max_length=12),
+        ),
+        migrations.AddField(
+            model_name='stockmovement',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='inventory.location'),
+        ),
+        migrations.CreateModel(
+            name='StockLevel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock_kg', models.FloatField(default=0)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_levels', to='inventory.inventoryitem')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_levels', to='inventory.location')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('location', 'item'), name='stocklevel_location_item_unique')],
+            },
+        ),
+        migrations.RunPython(seed_default_location, migrations.RunPython.noop),
+    ]
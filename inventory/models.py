@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from core.models import GrainType
 
 class RawGrain(models.Model):
@@ -9,6 +11,22 @@ class RawGrain(models.Model):
     quantity_kg = models.FloatField()
     received_at = models.DateTimeField(auto_now_add=True)
     unit_cost = models.DecimalField(max_digits=10, decimal_places=2)
+    # Trazabilidad: SKU al que ingresó el lote y kg aún sin consumir (FIFO)
+    inventory_item = models.ForeignKey('InventoryItem', on_delete=models.SET_NULL, null=True, blank=True,
+                                       related_name='lots')
+    remaining_kg = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['inventory_item', 'received_at'], name='rawgrain_open_lots_idx',
+                         condition=models.Q(remaining_kg__gt=0)),
+            models.Index(fields=['-received_at'], name='rawgrain_received_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.remaining_kg is None:
+            self.remaining_kg = self.quantity_kg
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.lot_code} - {self.get_type_display()}"
@@ -19,6 +37,9 @@ class InventoryItem(models.Model):
     type = models.CharField(max_length=2, choices=GrainType.choices)
     stock_kg = models.FloatField(default=0)
     min_stock_kg = models.FloatField(default=10)
+    # Reposición automática: proveedor habitual y nivel objetivo tras reponer
+    supplier = models.CharField(max_length=200, blank=True, default='')
+    target_stock_kg = models.FloatField(null=True, blank=True)
     
     def update_stock(self, kg: float):
         self.stock_kg += kg
@@ -26,10 +47,47 @@ class InventoryItem(models.Model):
         
     def needs_restock(self):
         return self.stock_kg <= self.min_stock_kg
+
+    def reorder_target_kg(self) -> float:
+        """Nivel al que se repone; por defecto un múltiplo del stock mínimo"""
+        if self.target_stock_kg is not None:
+            return self.target_stock_kg
+        return self.min_stock_kg * getattr(settings, 'REPLENISHMENT_TARGET_FACTOR', 2.0)
         
     def __str__(self):
         return f"{self.sku} - {self.name}"
 
+class Location(models.Model):
+    """Sitio que guarda stock: la tostaduría y las bodegas regionales"""
+    KIND_CHOICES = [
+        ('ROASTERY', 'Tostaduría'),
+        ('WAREHOUSE', 'Bodega'),
+    ]
+
+    code = models.CharField(max_length=20, unique=True)
+    name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='WAREHOUSE')
+
+    def __str__(self):
+        return f"{self.code} - {self.name}"
+
+class StockLevel(models.Model):
+    """
+    Stock de un SKU en una ubicación. InventoryItem.stock_kg es el total del SKU y se mantiene
+    incrementalmente con cada cambio de nivel (inventory.locations), nunca sumando al leer.
+    """
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='stock_levels')
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='stock_levels')
+    stock_kg = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'item'], name='stocklevel_location_item_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.item.sku} @ {self.location.code}: {self.stock_kg}kg"
+
 class PurchaseOrder(models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pendiente'),
@@ -37,12 +95,70 @@ class PurchaseOrder(models.Model):
         ('RECEIVED', 'Recibido'),
         ('CANCELLED', 'Cancelado'),
     ]
+    OPEN_STATUSES = ('PENDING', 'ORDERED')
     
     created_at = models.DateTimeField(auto_now_add=True)
     supplier = models.CharField(max_length=200)
     qty_kg = models.FloatField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
     inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [
+            # Reabastecimiento: solo importan las órdenes abiertas (OPEN_STATUSES) de cada SKU
+            models.Index(fields=['inventory_item', 'status'], name='po_open_item_idx',
+                         condition=models.Q(status__in=['PENDING', 'ORDERED'])),
+        ]
     
     def __str__(self):
-        return f"PO-{self.id} - {self.supplier}"
\ No newline at end of file
+        return f"PO-{self.id} - {self.supplier}"
+
+class StockMovement(models.Model):
+    """Serie temporal de movimientos de stock; base para el pronóstico de demanda"""
+    REASON_CHOICES = [
+        ('INITIAL', 'Stock inicial'),
+        ('RECEIPT', 'Entrada'),
+        ('CONSUMPTION', 'Consumo'),
+        ('UNDO', 'Reversión'),
+        ('TRANSFER_OUT', 'Traslado (salida)'),
+        ('TRANSFER_IN', 'Traslado (entrada)'),
+    ]
+
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='movements')
+    delta_kg = models.FloatField()
+    stock_after_kg = models.FloatField()
+    reason = models.CharField(max_length=12, choices=REASON_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+    # Ubicación del movimiento (vacía en los movimientos anteriores a las ubicaciones)
+    location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='movements')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['item', 'created_at'], name='movement_item_created_idx'),
+            models.Index(fields=['reason', 'created_at'], name='movement_reason_created_idx'),
+        ]
+
+    @classmethod
+    def record(cls, item: InventoryItem, delta_kg: float, reason: str, location: 'Location' = None) -> 'StockMovement':
+        return cls.objects.create(item=item, delta_kg=delta_kg, stock_after_kg=item.stock_kg, reason=reason,
+                                  location=location)
+
+    def __str__(self):
+        return f"{self.item.sku} {self.delta_kg:+}kg ({self.get_reason_display()})"
+
+class LotConsumption(models.Model):
+    """Kg de un lote de grano verde consumidos por un movimiento de stock (y su tarea de producción)"""
+    raw_grain = models.ForeignKey(RawGrain, on_delete=models.PROTECT, related_name='consumptions')
+    movement = models.ForeignKey(StockMovement, on_delete=models.CASCADE, null=True, blank=True,
+                                 related_name='lot_consumptions')
+    production_task = models.ForeignKey('production.ProductionTask', on_delete=models.SET_NULL, null=True,
+                                        blank=True, related_name='lot_consumptions')
+    qty_kg = models.FloatField()
+    # Costo FIFO: costo unitario del lote al momento del consumo y su total
+    unit_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.raw_grain.lot_code}: {self.qty_kg}kg"
@@ -0,0 +1,89 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import Sum
+
+from core.events import latest_per_sku
+from core.observers import Observer
+from .models import InventoryItem, PurchaseOrder, RawGrain
+
+logger = logging.getLogger(__name__)
+
+UNASSIGNED_SUPPLIER = 'Proveedor por asignar'
+
+
+class ReplenishmentEngine(Observer):
+    """
+    Genera órdenes de compra a partir de los eventos de stock bajo.
+
+    Solo revisa los SKUs que aparecen en la ventana de eventos (nunca toda la tabla).
+    La cantidad a pedir es: nivel objetivo - stock actual - cantidad ya abierta en
+    órdenes PENDING/ORDERED, así que repetir la ejecución no duplica pedidos.
+    """
+
+    def update(self, subject):
+        self.replenish(item.sku for item in subject.check_low_stock())
+
+    def update_many(self, subject, events) -> list:
+        skus = [event.sku for event in latest_per_sku(events) if event.is_low]
+        if skus:
+            self.replenish(skus)
+        return []
+
+    def replenish(self, skus: Iterable[str]) -> Dict[str, List[PurchaseOrder]]:
+        """Crea las órdenes necesarias para los SKUs dados, agrupadas por proveedor"""
+        skus = set(skus)
+        if not skus:
+            return {}
+
+        with transaction.atomic():
+            # Bloquear los items evita que dos despachadores pidan lo mismo a la vez
+            items = [item for item in InventoryItem.objects.select_for_update().filter(sku__in=skus)
+                     if item.needs_restock()]
+            if not items:
+                return {}
+
+            open_qty = dict(
+                PurchaseOrder.objects
+                .filter(inventory_item__in=items, status__in=PurchaseOrder.OPEN_STATUSES)
+                .values('inventory_item')
+                .annotate(total=Sum('qty_kg'))
+                .values_list('inventory_item', 'total')
+            )
+            suppliers = self._suppliers_for(items)
+
+            orders_by_supplier = defaultdict(list)
+            for item in items:
+                qty = item.reorder_target_kg() - item.stock_kg - open_qty.get(item.id, 0)
+                if qty <= 0:
+                    continue
+                supplier = suppliers[item.id]
+                orders_by_supplier[supplier].append(
+                    PurchaseOrder(supplier=supplier, qty_kg=round(qty, 3), inventory_item=item)
+                )
+
+            PurchaseOrder.objects.bulk_create(
+                [order for orders in orders_by_supplier.values() for order in orders]
+            )
+
+        for supplier, orders in orders_by_supplier.items():
+            logger.info("🧾 %d órdenes de compra para %s (%.1f kg)",
+                        len(orders), supplier, sum(order.qty_kg for order in orders))
+        return dict(orders_by_supplier)
+
+    @staticmethod
+    def _suppliers_for(items: List[InventoryItem]) -> Dict[int, str]:
+        """Proveedor del item o, si no tiene, el del último lote recibido del mismo tipo"""
+        missing_types = {item.type for item in items if not item.supplier}
+        latest_by_type = {}
+        if missing_types:
+            for grain_type, supplier in (RawGrain.objects.filter(type__in=missing_types)
+                                         .order_by('type', '-received_at')
+                                         .values_list('type', 'supplier')):
+                latest_by_type.setdefault(grain_type, supplier)
+        return {
+            item.id: item.supplier or latest_by_type.get(item.type, UNASSIGNED_SUPPLIER)
+            for item in items
+        }
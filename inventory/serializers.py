@@ -0,0 +1,28 @@
+from rest_framework import serializers
+
+from core.api import ProjectedSerializer, positive_kg
+from .models import InventoryItem, RawGrain
+
+
+class InventoryItemSerializer(ProjectedSerializer):
+    class Meta:
+        model = InventoryItem
+        fields = ['id', 'sku', 'name', 'type', 'stock_kg', 'min_stock_kg', 'supplier', 'target_stock_kg']
+
+
+class RawGrainSerializer(ProjectedSerializer):
+    class Meta:
+        model = RawGrain
+        fields = ['id', 'lot_code', 'supplier', 'type', 'origin', 'quantity_kg', 'remaining_kg', 'unit_cost',
+                  'received_at', 'inventory_item']
+
+
+class StockChangeSerializer(serializers.Serializer):
+    """Un elemento de /items/add-stock/ o /items/consume-stock/"""
+    sku = serializers.CharField(max_length=50)
+    kg = serializers.FloatField()
+    # Código de ubicación; sin él, la ubicación por defecto
+    location = serializers.CharField(max_length=20, required=False, allow_blank=True)
+
+    def validate_kg(self, value):
+        return positive_kg(value)
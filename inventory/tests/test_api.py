@@ -0,0 +1,57 @@
+from django.test import TestCase
+
+from core.models import GrainType
+from inventory.models import InventoryItem, LotConsumption, RawGrain
+
+
+class InventoryApiTest(TestCase):
+    def setUp(self):
+        self.item = InventoryItem.objects.create(sku='API-AR', name='Arábica API', type=GrainType.ARABICA,
+                                                 stock_kg=40)
+        RawGrain.objects.create(supplier='Finca Norte', type=GrainType.ARABICA, origin='Huila', lot_code='API-1',
+                                quantity_kg=40, unit_cost='4.00', inventory_item=self.item)
+        for i in range(5):
+            InventoryItem.objects.create(sku=f'API-X{i}', name=f'Extra {i}', type=GrainType.ROBUSTA, stock_kg=i)
+
+    def test_listado_paginado_por_cursor_con_proyeccion(self):
+        """?fields= recorta la respuesta y la consulta; el cursor recorre todas las filas sin repetir"""
+        seen = []
+        url = '/api/v1/inventory/items/?fields=sku,stock_kg&page_size=4'
+        while url:
+            with self.assertNumQueries(1):
+                data = self.client.get(url).json()
+            self.assertEqual(set(data['results'][0]), {'sku', 'stock_kg'})
+            seen.extend(row['sku'] for row in data['results'])
+            url = data['next']
+        self.assertEqual(sorted(seen), sorted(InventoryItem.objects.values_list('sku', flat=True)))
+
+        response = self.client.get('/api/v1/inventory/items/?fields=sku,precio')
+        self.assertEqual(response.status_code, 400)
+
+    def test_consumo_en_lote_usa_el_manager(self):
+        """El consumo pasa por InventoryManager: descuenta stock y asigna lotes FIFO"""
+        response = self.client.post('/api/v1/inventory/items/consume-stock/',
+                                    [{'sku': 'API-AR', 'kg': 10}, {'sku': 'API-X4', 'kg': 1}],
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['stock_kg'], 30)
+        self.assertEqual(LotConsumption.objects.get().qty_kg, 10)
+
+    def test_lote_con_error_se_revierte_completo(self):
+        """Si un elemento falla, ninguno se aplica y se informa su posición"""
+        response = self.client.post('/api/v1/inventory/items/add-stock/',
+                                    [{'sku': 'API-AR', 'kg': 5}, {'sku': 'NO-EXISTE', 'kg': 5}],
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['index'], 1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock_kg, 40)
+
+    def test_kg_no_finitos_rechazados(self):
+        """Los kg NaN, infinitos o cero se rechazan con 400 sin tocar el stock"""
+        for kg in ('NaN', 'Infinity', '-Infinity', 0):
+            response = self.client.post('/api/v1/inventory/items/add-stock/', [{'sku': 'API-AR', 'kg': kg}],
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock_kg, 40)
@@ -1,6 +1,9 @@
-from django.test import TestCase
-from inventory.models import InventoryItem
-from inventory.commands import AgregarProductoCommand, AgregarStockCommand
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from inventory.models import InventoryItem, RawGrain, StockLevel, StockMovement
+from inventory.commands import (AgregarProductoCommand, AgregarStockCommand, CommandInvoker, ConsumirStockCommand,
+                                MacroCommand)
 from inventory.repositories import DjangoInventoryRepo
 from core.models import GrainType
 
@@ -53,4 +56,100 @@ class CommandPatternTest(TestCase):
         # Probar undo
         command.undo()
         item.refresh_from_db()
-        self.assertEqual(item.stock_kg, 10.0)
\ No newline at end of file
+        self.assertEqual(item.stock_kg, 10.0)
+
+    def test_undo_fallido_conserva_el_historial(self):
+        """Si el undo falla (el stock agregado ya se consumió) el comando sigue en el historial"""
+        InventoryItem.objects.create(sku='TEST-003', name='Café Test', type=GrainType.ARABICA,
+                                     stock_kg=0.0, min_stock_kg=5.0)
+        request = RequestFactory().post('/')
+        request.session = SessionStore()
+        invoker = CommandInvoker(request)
+        invoker.execute_command(AgregarStockCommand(self.repo, 'TEST-003', 15.0))
+        ConsumirStockCommand(self.repo, 'TEST-003', 10.0).execute()
+
+        with self.assertRaises(ValueError):
+            invoker.undo_last()
+        self.assertEqual([entry['type'] for entry in request.session['command_history']], ['AgregarStockCommand'])
+
+class MacroCommandTest(TestCase):
+    def setUp(self):
+        self.repo = DjangoInventoryRepo()
+        self.arabica = InventoryItem.objects.create(sku='MAC-AR', name='Arábica', type=GrainType.ARABICA,
+                                                    stock_kg=20.0)
+        self.robusta = InventoryItem.objects.create(sku='MAC-RO', name='Robusta', type=GrainType.ROBUSTA,
+                                                    stock_kg=5.0)
+        self.lot = RawGrain.objects.create(supplier='Finca Norte', type=GrainType.ARABICA, origin='Huila',
+                                           lot_code='MAC-LOT', quantity_kg=20, unit_cost='4.00',
+                                           inventory_item=self.arabica)
+
+    def macro(self):
+        return MacroCommand(self.repo, [
+            AgregarStockCommand(self.repo, 'MAC-AR', 10.0),
+            ConsumirStockCommand(self.repo, 'MAC-AR', 8.0),
+            AgregarStockCommand(self.repo, 'MAC-RO', 3.0),
+            AgregarProductoCommand(self.repo, {'sku': 'MAC-NEW', 'name': 'Nuevo', 'type': GrainType.BLEND,
+                                               'stock_kg': 7.0}),
+            AgregarStockCommand(self.repo, 'MAC-NEW', 2.0),
+        ], label='Recepción')
+
+    def test_macro_es_todo_o_nada(self):
+        """Si una línea falla, ninguna de las anteriores queda aplicada"""
+        command = MacroCommand(self.repo, [
+            AgregarStockCommand(self.repo, 'MAC-AR', 10.0),
+            ConsumirStockCommand(self.repo, 'MAC-RO', 50.0),
+        ])
+        with self.assertRaisesMessage(ValueError, 'Línea 2'):
+            command.execute()
+
+        self.arabica.refresh_from_db()
+        self.assertEqual(self.arabica.stock_kg, 20.0)
+        self.assertFalse(StockMovement.objects.exists())
+
+    def test_undo_revierte_la_macro_entera(self):
+        """El undo devuelve stock, niveles y lotes, y borra los productos creados por la macro"""
+        command = self.macro()
+        command.execute()
+        self.arabica.refresh_from_db()
+        self.assertEqual(self.arabica.stock_kg, 22.0)
+
+        command.undo()
+        self.arabica.refresh_from_db()
+        self.robusta.refresh_from_db()
+        self.lot.refresh_from_db()
+        self.assertEqual(self.arabica.stock_kg, 20.0)
+        self.assertEqual(self.robusta.stock_kg, 5.0)
+        self.assertEqual(StockLevel.objects.get(item=self.arabica).stock_kg, 20.0)
+        self.assertEqual(self.lot.remaining_kg, 20)
+        self.assertFalse(InventoryItem.objects.filter(sku='MAC-NEW').exists())
+        self.assertEqual(StockMovement.objects.filter(reason='UNDO').count(), 3)
+
+    def test_una_sola_entrada_de_historial(self):
+        """El invoker guarda la macro como un paso y la reconstruye desde la sesión para deshacerla"""
+        request = RequestFactory().post('/')
+        request.session = SessionStore()
+        invoker = CommandInvoker(request)
+        invoker.execute_command(self.macro())
+        self.assertEqual(len(invoker.get_history()), 1)
+
+        result = invoker.undo_last()
+        self.assertIn('revertida', result)
+        self.robusta.refresh_from_db()
+        self.assertEqual(self.robusta.stock_kg, 5.0)
+
+    def test_formulario_en_lote(self):
+        """Líneas "SKU kg" con coma decimal: 1,5 son 1.5 kg"""
+        response = self.client.post(reverse('inventory:batch_stock'), {'lines': 'MAC-AR 4\nMAC-RO 1,5\n'})
+        self.assertRedirects(response, reverse('inventory:dashboard'), fetch_redirect_response=False)
+        self.robusta.refresh_from_db()
+        self.assertEqual(self.robusta.stock_kg, 6.5)
+        self.assertEqual([entry['type'] for entry in self.client.session['command_history']], ['MacroCommand'])
+
+    def test_formulario_en_lote_rechaza_lineas_invalidas(self):
+        """Tokens de más, kg negativos o no finitos se rechazan con su número de línea y nada se aplica"""
+        for text in ('MAC-RO 1,5\nMAC-AR 12 5', 'MAC-RO 1\nMAC-AR -3', 'MAC-RO nan', 'MAC-RO inf'):
+            response = self.client.post(reverse('inventory:batch_stock'), {'lines': text}, follow=True)
+            errors = [str(message) for message in response.context['messages']]
+            self.assertTrue(any('Línea' in error for error in errors), errors)
+        self.robusta.refresh_from_db()
+        self.assertEqual(self.robusta.stock_kg, 5.0)
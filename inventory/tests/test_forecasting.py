@@ -0,0 +1,102 @@
+from datetime import timedelta
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.inventory_manager import InventoryManager
+from core.models import GrainType
+from inventory.commands import AgregarStockCommand, ConsumirStockCommand
+from inventory.forecasting import apply_reorder_points, ewma_last, forecast_demand
+from inventory.models import InventoryItem, StockMovement
+from inventory.repositories import DjangoInventoryRepo
+
+
+class StockMovementTest(TestCase):
+    def setUp(self):
+        self.repo = DjangoInventoryRepo()
+        self.item = InventoryItem.objects.create(sku='MOV-001', name='Café Movimientos',
+                                                 type=GrainType.ARABICA, stock_kg=100.0)
+
+    def test_todas_las_rutas_registran_movimientos(self):
+        """InventoryManager y los comandos (incluido undo) escriben la serie de movimientos"""
+        manager = InventoryManager(self.repo)
+        manager.add_stock('MOV-001', 10.0)
+        manager.consume_stock('MOV-001', 5.0)
+        command = ConsumirStockCommand(self.repo, 'MOV-001', 20.0)
+        command.execute()
+        command.undo()
+        AgregarStockCommand(self.repo, 'MOV-001', 1.0).execute()
+
+        movements = list(self.item.movements.order_by('id').values_list('reason', 'delta_kg', 'stock_after_kg'))
+        self.assertEqual(movements, [
+            ('RECEIPT', 10.0, 110.0),
+            ('CONSUMPTION', -5.0, 105.0),
+            ('CONSUMPTION', -20.0, 85.0),
+            ('UNDO', 20.0, 105.0),
+            ('RECEIPT', 1.0, 106.0),
+        ])
+
+    def test_consumo_deshecho_no_es_demanda(self):
+        """Consumir y deshacer deja la demanda en cero; deshacer una entrada tampoco es demanda"""
+        consume = ConsumirStockCommand(self.repo, 'MOV-001', 20.0)
+        consume.execute()
+        consume.undo()
+        receipt = AgregarStockCommand(self.repo, 'MOV-001', 5.0)
+        receipt.execute()
+        receipt.undo()
+
+        forecast = forecast_demand(history_days=7, window=7)
+        rows = {row['sku']: row for row in forecast.as_rows()}
+        self.assertAlmostEqual(rows.get('MOV-001', {}).get('moving_average', 0.0), 0.0)
+        self.assertAlmostEqual(rows.get('MOV-001', {}).get('reorder_point', 0.0), 0.0)
+
+
+class ForecastingTest(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.steady = InventoryItem.objects.create(sku='FC-STEADY', name='Estable', type=GrainType.ARABICA)
+        self.bursty = InventoryItem.objects.create(sku='FC-BURST', name='Irregular', type=GrainType.ROBUSTA)
+        now = timezone.now()
+        movements = []
+        for days_ago in range(30):
+            moment = now - timedelta(days=days_ago)
+            movements.append(StockMovement(item=self.steady, delta_kg=-2.0, stock_after_kg=0,
+                                           reason='CONSUMPTION', created_at=moment))
+            if days_ago % 5 == 0:
+                movements.append(StockMovement(item=self.bursty, delta_kg=-10.0, stock_after_kg=0,
+                                               reason='CONSUMPTION', created_at=moment))
+        # Entradas no cuentan como demanda
+        movements.append(StockMovement(item=self.steady, delta_kg=500.0, stock_after_kg=0,
+                                       reason='RECEIPT', created_at=now))
+        StockMovement.objects.bulk_create(movements)
+
+    def test_ewma_vectorizado_igual_a_recurrencia(self):
+        """La expansión en pesos da el mismo resultado que la recurrencia día a día"""
+        matrix = np.random.default_rng(7).random((50, 120))
+        expected = matrix[:, 0].copy()
+        for day in range(1, matrix.shape[1]):
+            expected = 0.3 * matrix[:, day] + 0.7 * expected
+        np.testing.assert_allclose(ewma_last(matrix, 0.3), expected)
+
+    def test_puntos_de_reorden(self):
+        """Demanda constante: sin stock de seguridad; demanda irregular: con stock de seguridad"""
+        forecast = forecast_demand(history_days=30, window=30, lead_time_days=7, until=self.today)
+        rows = {row['sku']: row for row in forecast.as_rows()}
+
+        self.assertAlmostEqual(rows['FC-STEADY']['moving_average'], 2.0)
+        self.assertAlmostEqual(rows['FC-STEADY']['std'], 0.0)
+        self.assertAlmostEqual(rows['FC-STEADY']['reorder_point'], 14.0)
+        self.assertAlmostEqual(rows['FC-BURST']['moving_average'], 2.0)
+        self.assertGreater(rows['FC-BURST']['reorder_point'], rows['FC-STEADY']['reorder_point'])
+
+    def test_aplicar_puntos_de_reorden(self):
+        """Aplicar actualiza min_stock_kg de los SKUs con historial"""
+        forecast = forecast_demand(history_days=30, window=30, until=self.today)
+        self.assertEqual(apply_reorder_points(forecast), 2)
+        self.steady.refresh_from_db()
+        self.assertEqual(self.steady.min_stock_kg, 14.0)
+
+        call_command('forecast_reorder_points', '--days=30', '--window=30', '--apply', stdout=StringIO())
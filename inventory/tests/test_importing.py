@@ -0,0 +1,98 @@
+import io
+import json
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import GrainType
+from inventory.importing import RawGrainImporter, import_raw_grains
+from inventory.models import InventoryItem, RawGrain, StockMovement
+
+CSV_HEADER = "lot_code,supplier,type,origin,quantity_kg,unit_cost,sku\n"
+
+
+class RawGrainImportTest(TestCase):
+    def setUp(self):
+        self.arabica = InventoryItem.objects.create(sku='IMP-AR', name='Arábica', type=GrainType.ARABICA,
+                                                    stock_kg=10.0)
+        self.robusta = InventoryItem.objects.create(sku='IMP-RO', name='Robusta', type=GrainType.ROBUSTA,
+                                                    stock_kg=0.0)
+        RawGrain.objects.create(supplier='Finca Norte', type=GrainType.ARABICA, origin='Huila',
+                                lot_code='EXISTE-1', quantity_kg=5, unit_cost='4.00')
+
+    def test_csv_por_bloques_con_stock_agregado(self):
+        """Importa por bloques, rechaza duplicados e inválidos y suma el stock con un UPDATE por SKU"""
+        rows = [f"C-{i},Finca Sur,AR,Nariño,10,4.50,IMP-AR\n" for i in range(7)] + [
+            "C-R,Finca Este,RO,Cauca,20.5,3.10,IMP-RO\n",
+            "C-1,Finca Sur,AR,Nariño,10,4.50,IMP-AR\n",   # duplicado en el archivo
+            "EXISTE-1,Finca Sur,AR,Nariño,10,4.50,IMP-AR\n",  # ya existe en la BD
+            "C-X,Finca Sur,XX,Nariño,10,4.50,IMP-AR\n",   # tipo inválido
+            "C-Y,Finca Sur,AR,Nariño,-3,4.50,IMP-AR\n",   # cantidad inválida
+            "C-Z,Finca Sur,AR,Nariño,3,4.50,NO-EXISTE\n",  # SKU desconocido
+        ]
+        result = import_raw_grains(io.StringIO(CSV_HEADER + ''.join(rows)), 'csv', chunk_size=3)
+
+        self.assertEqual((result.created, result.rejected), (8, 5))
+        self.assertEqual(result.received_kg, {'IMP-AR': 70.0, 'IMP-RO': 20.5})
+        self.arabica.refresh_from_db()
+        self.assertEqual(self.arabica.stock_kg, 80.0)
+
+        lot = RawGrain.objects.get(lot_code='C-R')
+        self.assertEqual((lot.remaining_kg, lot.inventory_item_id), (20.5, self.robusta.id))
+        self.assertEqual(StockMovement.objects.filter(item=self.arabica, reason='RECEIPT').count(), 3)
+
+    def test_costos_no_finitos_o_fuera_de_rango_son_errores_de_fila(self):
+        """NaN, infinito, negativo o más dígitos que el campo rechazan la fila sin abortar la importación"""
+        rows = [f"K-{i},Finca Sur,AR,Nariño,1,{cost},IMP-AR\n"
+                for i, cost in enumerate(['NaN', 'Infinity', '-1', '123456789.00', 'abc', '99999999.99'])]
+        result = import_raw_grains(io.StringIO(CSV_HEADER + ''.join(rows)), 'csv')
+
+        self.assertEqual((result.created, result.rejected), (1, 5))
+        self.assertEqual(list(RawGrain.objects.filter(lot_code__startswith='K-').values_list('lot_code', flat=True)),
+                         ['K-5'])
+
+    def test_lot_code_insertado_por_otra_importacion(self):
+        """Si otra importación inserta un lot_code tras la comprobación, esa fila es duplicada y el resto entra"""
+        existing_lots = RawGrainImporter._existing_lots
+        RawGrain.objects.create(supplier='Otra importación', type=GrainType.ARABICA, origin='Huila',
+                                lot_code='P-1', quantity_kg=1, unit_cost='4.00')
+        calls = []
+
+        def existing(rows):
+            # La primera comprobación no la ve, como si se hubiera insertado justo después
+            calls.append(rows)
+            return set() if len(calls) == 1 else existing_lots(rows)
+
+        rows = [f"P-{i},Finca Sur,AR,Nariño,10,4.50,IMP-AR\n" for i in range(3)]
+        with patch.object(RawGrainImporter, '_existing_lots', side_effect=existing):
+            result = import_raw_grains(io.StringIO(CSV_HEADER + ''.join(rows)), 'csv')
+
+        self.assertEqual((result.created, result.rejected), (2, 1))
+        self.assertEqual(result.errors, ['Línea 3: lot_code duplicado: P-1'])
+        self.arabica.refresh_from_db()
+        self.assertEqual(self.arabica.stock_kg, 30.0)
+
+    def test_jsonl_y_comando(self):
+        """El comando lee JSON Lines desde la entrada estándar"""
+        lines = [json.dumps({'lot_code': f'J-{i}', 'supplier': 'Finca Oeste', 'type': 'bl', 'origin': 'Tolima',
+                             'quantity_kg': 2, 'unit_cost': '5', 'sku': 'IMP-AR'}) for i in range(3)]
+        stream = io.StringIO('\n'.join(lines + ['{roto']))
+        out, err = io.StringIO(), io.StringIO()
+        with patch('sys.stdin', stream):
+            call_command('import_raw_grains', '-', '--format', 'jsonl', stdout=out, stderr=err)
+
+        self.assertIn('3 lotes importados, 1 rechazados', out.getvalue())
+        self.assertIn('JSON inválido', err.getvalue())
+        self.assertEqual(RawGrain.objects.filter(lot_code__startswith='J-', type=GrainType.BLEND).count(), 3)
+
+    def test_endpoint_de_importacion(self):
+        """El endpoint acepta un archivo subido y devuelve el resumen en JSON"""
+        upload = SimpleUploadedFile('recepcion.csv', (CSV_HEADER + "U-1,Finca Sur,RO,Cauca,4,3.00,IMP-RO\n").encode())
+        response = self.client.post(reverse('inventory:import_raw_grains'), {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(self.client.post(reverse('inventory:import_raw_grains')).status_code, 400)
@@ -0,0 +1,110 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from core.inventory_manager import InventoryManager
+from core.models import GrainType
+from inventory.commands import AgregarStockCommand, TransferirStockCommand
+from inventory.locations import default_location
+from inventory.models import InventoryItem, Location, StockLevel, StockMovement
+from inventory.repositories import DjangoInventoryRepo
+
+
+class StockByLocationTest(TestCase):
+    def setUp(self):
+        self.repo = DjangoInventoryRepo()
+        self.manager = InventoryManager(self.repo)
+        self.item = InventoryItem.objects.create(sku='LOC-AR', name='Arábica Multisitio',
+                                                 type=GrainType.ARABICA, stock_kg=100.0)
+        self.roastery = default_location()
+        self.north = Location.objects.create(code='BOD-NORTE', name='Bodega Norte')
+
+    def level(self, location):
+        return StockLevel.objects.get(item=self.item, location=location).stock_kg
+
+    def test_stock_inicial_en_la_ubicacion_por_defecto(self):
+        """Un SKU nuevo deja su stock inicial en la tostaduría"""
+        self.assertEqual(self.level(self.roastery), 100.0)
+
+    def test_entrada_y_consumo_por_ubicacion_mantienen_el_total(self):
+        """Agregar y consumir en una bodega mueve su nivel y el total del SKU, no el de la tostaduría"""
+        self.manager.add_stock('LOC-AR', 30.0, location='BOD-NORTE')
+        self.manager.consume_stock('LOC-AR', 10.0, location='BOD-NORTE')
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock_kg, 120.0)
+        self.assertEqual(self.level(self.north), 20.0)
+        self.assertEqual(self.level(self.roastery), 100.0)
+        self.assertEqual(StockMovement.objects.filter(location=self.north).count(), 2)
+
+    def test_consumo_sin_stock_en_la_ubicacion(self):
+        """El total alcanza pero la bodega no: el consumo se rechaza y nada cambia"""
+        with self.assertRaises(ValueError):
+            self.manager.consume_stock('LOC-AR', 5.0, location='BOD-NORTE')
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock_kg, 100.0)
+        self.assertFalse(StockLevel.objects.filter(location=self.north).exists())
+
+    def test_traslado_y_deshacer(self):
+        """El traslado mueve stock entre ubicaciones sin tocar el total, y se puede deshacer"""
+        command = TransferirStockCommand(self.repo, 'LOC-AR', 40.0, self.roastery.code, 'BOD-NORTE')
+        command.execute()
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock_kg, 100.0)
+        self.assertEqual(self.level(self.roastery), 60.0)
+        self.assertEqual(self.level(self.north), 40.0)
+        self.assertEqual(set(StockMovement.objects.values_list('reason', flat=True)),
+                         {'TRANSFER_OUT', 'TRANSFER_IN'})
+
+        command.undo()
+        self.assertEqual(self.level(self.roastery), 100.0)
+        self.assertEqual(self.level(self.north), 0.0)
+
+    def test_traslado_mayor_al_stock_de_origen(self):
+        """Un traslado que la ubicación de origen no cubre no mueve nada"""
+        command = TransferirStockCommand(self.repo, 'LOC-AR', 150.0, self.roastery.code, 'BOD-NORTE')
+        with self.assertRaises(ValueError):
+            command.execute()
+        self.assertEqual(self.level(self.roastery), 100.0)
+
+    def test_deshacer_entrada_revierte_su_ubicacion(self):
+        """El undo de una entrada resta el delta en la misma ubicación"""
+        command = AgregarStockCommand(self.repo, 'LOC-AR', 25.0, 'BOD-NORTE')
+        command.execute()
+        command.undo()
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock_kg, 100.0)
+        self.assertEqual(self.level(self.north), 0.0)
+
+    def test_items_sin_nivel_se_inicializan_desde_el_total(self):
+        """Items creados con bulk_create (sin señales) toman su nivel de la tostaduría del total"""
+        InventoryItem.objects.bulk_create([InventoryItem(sku='LOC-BULK', name='Masivo',
+                                                         type=GrainType.ROBUSTA, stock_kg=50.0)])
+        self.manager.consume_stock('LOC-BULK', 20.0)
+
+        level = StockLevel.objects.get(item__sku='LOC-BULK', location=self.roastery)
+        self.assertEqual(level.stock_kg, 30.0)
+        self.assertEqual(InventoryItem.objects.get(sku='LOC-BULK').stock_kg, 30.0)
+
+
+class LocationDashboardTest(TestCase):
+    def setUp(self):
+        self.item = InventoryItem.objects.create(sku='DSH-AR', name='Arábica Panel',
+                                                 type=GrainType.ARABICA, stock_kg=80.0)
+        self.south = Location.objects.create(code='BOD-SUR', name='Bodega Sur')
+
+    def test_panel_por_ubicacion_y_traslado_desde_la_vista(self):
+        """El panel de una bodega muestra su stock y el traslado se deshace desde el historial"""
+        response = self.client.post(reverse('inventory:transfer_stock'), {
+            'sku': 'DSH-AR', 'kg': 30, 'from_location': default_location().code, 'to_location': 'BOD-SUR'})
+        self.assertRedirects(response, reverse('inventory:dashboard') + f'?location={default_location().code}',
+                             fetch_redirect_response=False)
+
+        response = self.client.get(reverse('inventory:dashboard'), {'location': 'BOD-SUR'})
+        self.assertEqual([item.location_stock_kg for item in response.context['items']], [30.0])
+
+        self.client.get(reverse('inventory:undo'))
+        self.assertEqual(StockLevel.objects.get(item=self.item, location=self.south).stock_kg, 0.0)
+        self.assertEqual(self.client.session['command_history'], [])
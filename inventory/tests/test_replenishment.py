@@ -0,0 +1,65 @@
+from django.test import TestCase
+
+from core.inventory_manager import InventoryManager
+from core.models import GrainType
+from inventory.models import InventoryItem, PurchaseOrder, RawGrain
+from inventory.replenishment import ReplenishmentEngine, UNASSIGNED_SUPPLIER
+from inventory.repositories import DjangoInventoryRepo
+
+
+class ReplenishmentEngineTest(TestCase):
+    def setUp(self):
+        self.engine = ReplenishmentEngine()
+        self.arabica = InventoryItem.objects.create(
+            sku='REP-AR', name='Arábica Reposición', type=GrainType.ARABICA,
+            stock_kg=8.0, min_stock_kg=10.0, target_stock_kg=50.0, supplier='Finca La Esperanza'
+        )
+        self.robusta = InventoryItem.objects.create(
+            sku='REP-RO', name='Robusta Reposición', type=GrainType.ROBUSTA,
+            stock_kg=4.0, min_stock_kg=10.0
+        )
+
+    def test_cantidad_descuenta_ordenes_abiertas(self):
+        """Pedido = objetivo - stock - cantidad abierta en órdenes PENDING/ORDERED"""
+        PurchaseOrder.objects.create(supplier='Finca La Esperanza', qty_kg=30.0, status='ORDERED',
+                                     inventory_item=self.arabica)
+        PurchaseOrder.objects.create(supplier='Finca La Esperanza', qty_kg=99.0, status='RECEIVED',
+                                     inventory_item=self.arabica)
+
+        orders = self.engine.replenish(['REP-AR'])
+
+        [order] = orders['Finca La Esperanza']
+        self.assertEqual(order.qty_kg, 12.0)  # 50 - 8 - 30
+        self.assertEqual(order.status, 'PENDING')
+
+    def test_idempotente(self):
+        """Ejecutarlo dos veces no duplica órdenes"""
+        self.engine.replenish(['REP-AR', 'REP-RO'])
+        self.engine.replenish(['REP-AR', 'REP-RO'])
+
+        self.assertEqual(PurchaseOrder.objects.filter(inventory_item=self.arabica).count(), 1)
+        self.assertEqual(PurchaseOrder.objects.filter(inventory_item=self.robusta).count(), 1)
+
+    def test_agrupa_por_proveedor_y_usa_ultimo_lote(self):
+        """Sin proveedor propio se usa el del último lote recibido del mismo tipo"""
+        RawGrain.objects.create(supplier='Importadora Vietnam', type=GrainType.ROBUSTA, origin='Vietnam',
+                                lot_code='LOT-RO-1', quantity_kg=100, unit_cost='3.50')
+
+        orders = self.engine.replenish(['REP-AR', 'REP-RO'])
+
+        self.assertEqual(set(orders), {'Finca La Esperanza', 'Importadora Vietnam'})
+        self.assertEqual(orders['Importadora Vietnam'][0].qty_kg, 16.0)  # 10 * 2 - 4
+
+        item = InventoryItem.objects.create(sku='REP-BL', name='Blend', type=GrainType.BLEND, stock_kg=0)
+        self.assertEqual(self.engine.replenish([item.sku])[UNASSIGNED_SUPPLIER][0].qty_kg, 20.0)
+
+    def test_consumo_genera_orden_desde_el_evento(self):
+        """Cruzar el mínimo al consumir genera la orden a partir del evento de stock"""
+        InventoryItem.objects.create(sku='REP-EVT', name='Arábica', type=GrainType.ARABICA,
+                                     stock_kg=15.0, min_stock_kg=10.0, supplier='Finca Sur')
+
+        InventoryManager(DjangoInventoryRepo()).consume_stock('REP-EVT', 6.0)
+
+        order = PurchaseOrder.objects.get(inventory_item__sku='REP-EVT')
+        self.assertEqual(order.supplier, 'Finca Sur')
+        self.assertEqual(order.qty_kg, 11.0)  # 20 - 9
@@ -0,0 +1,97 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from core.inventory_manager import InventoryManager
+from core.models import GrainType
+from inventory.commands import ConsumirStockCommand
+from inventory.models import InventoryItem, RawGrain, StockLevel, StockMovement
+from inventory.repositories import DjangoInventoryRepo
+from inventory.traceability import customers_for_lot, lots_for_batch, lots_for_order, trace_lot
+from orders.models import Order, OrderLine
+from production.facade import ProductionFacade
+from production.models import ProductBatch, ProductionTask
+
+
+class LotTraceabilityTest(TestCase):
+    def setUp(self):
+        self.item = InventoryItem.objects.create(sku='TRZ-AR', name='Arábica Trazable',
+                                                 type=GrainType.ARABICA, stock_kg=100.0)
+        self.lot_a = RawGrain.objects.create(supplier='Finca Norte', type=GrainType.ARABICA, origin='Huila',
+                                             lot_code='LOT-A', quantity_kg=30, unit_cost='4.00',
+                                             inventory_item=self.item)
+        self.lot_b = RawGrain.objects.create(supplier='Finca Sur', type=GrainType.ARABICA, origin='Nariño',
+                                             lot_code='LOT-B', quantity_kg=70, unit_cost='5.00',
+                                             inventory_item=self.item)
+        self.facade = ProductionFacade(InventoryManager(DjangoInventoryRepo()))
+
+    def _produce_and_sell(self, kg, customer):
+        task = self.facade.start_production('TRZ-AR', kg, 'arabica')['production_task']
+        for _ in range(3):
+            result = self.facade.advance_production_stage(task.id)
+        order = Order.objects.create(customer=customer, delivery_speed='EC')
+        OrderLine.objects.create(order=order, product_batch=result['product_batch'], qty_kg=kg)
+        return task, result['product_batch'], order
+
+    def test_consumo_fifo_enlazado_a_la_tarea(self):
+        """La producción consume los lotes más antiguos primero y los enlaza a la tarea"""
+        task, _, _ = self._produce_and_sell(40, 'Cafetería Central')
+
+        self.lot_a.refresh_from_db()
+        self.lot_b.refresh_from_db()
+        self.assertEqual(self.lot_a.remaining_kg, 0)
+        self.assertEqual(self.lot_b.remaining_kg, 60)
+        self.assertEqual(
+            sorted(task.lot_consumptions.values_list('raw_grain__lot_code', 'qty_kg')),
+            [('LOT-A', 30.0), ('LOT-B', 10.0)],
+        )
+
+    def test_consultas_hacia_adelante_y_atras(self):
+        """Qué clientes recibieron un lote y de qué lotes viene un pedido, con consultas acotadas"""
+        _, batch1, order1 = self._produce_and_sell(20, 'Cafetería Central')
+        _, batch2, order2 = self._produce_and_sell(20, 'Hotel Aroma')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(customers_for_lot('LOT-A'), ['Cafetería Central', 'Hotel Aroma'])
+        with self.assertNumQueries(1):
+            self.assertEqual(customers_for_lot('LOT-B'), ['Hotel Aroma'])
+        with self.assertNumQueries(1):
+            self.assertEqual(set(lots_for_order(order2.id).values_list('lot_code', flat=True)), {'LOT-A', 'LOT-B'})
+        self.assertEqual(list(lots_for_batch(batch1.code).values_list('lot_code', flat=True)), ['LOT-A'])
+
+        with self.assertNumQueries(1):
+            graph = trace_lot('LOT-A')
+        self.assertEqual(graph['product_batches'], sorted([batch1.code, batch2.code]))
+        self.assertEqual([o['customer'] for o in graph['orders']], ['Cafetería Central', 'Hotel Aroma'])
+        self.assertEqual(graph['consumed_kg'], 30.0)
+
+    def test_endpoint_trazabilidad(self):
+        """El endpoint devuelve el grafo del lote o 404"""
+        self._produce_and_sell(10, 'Cafetería Central')
+
+        response = self.client.get('/inventory/trace/LOT-A/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['orders'][0]['customer'], 'Cafetería Central')
+        self.assertEqual(self.client.get('/inventory/trace/NO-EXISTE/').status_code, 404)
+
+    def test_produccion_fallida_no_deja_tarea(self):
+        """Si no hay stock suficiente no se crea la tarea ni se consumen lotes"""
+        result = self.facade.start_production('TRZ-AR', 500, 'arabica')
+        self.assertFalse(result['success'])
+        self.assertFalse(ProductionTask.objects.exists())
+        self.assertFalse(ProductBatch.objects.exists())
+        self.lot_a.refresh_from_db()
+        self.assertEqual(self.lot_a.remaining_kg, 30)
+
+    def test_fallo_al_asignar_lotes_revierte_el_consumo(self):
+        """Si la asignación de lotes falla no queda stock descontado sin movimiento ni lotes"""
+        consumers = (lambda: InventoryManager(DjangoInventoryRepo()).consume_stock('TRZ-AR', 10),
+                     lambda: ConsumirStockCommand(DjangoInventoryRepo(), 'TRZ-AR', 10).execute())
+        targets = ('core.inventory_manager.allocate_lots', 'inventory.commands.allocate_lots')
+        for consume, target in zip(consumers, targets):
+            with patch(target, side_effect=RuntimeError('fallo')), self.assertRaises(RuntimeError):
+                consume()
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.stock_kg, 100.0)
+        self.assertEqual(StockLevel.objects.get(item=self.item).stock_kg, 100.0)
+        self.assertFalse(StockMovement.objects.filter(reason='CONSUMPTION').exists())
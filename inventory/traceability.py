@@ -0,0 +1,125 @@
+import logging
+from decimal import Decimal
+from typing import List, Optional
+
+from django.db import transaction
+from django.db.models import QuerySet, Sum
+
+from core import versioning
+from orders.models import Order
+from production.models import ProductBatch
+from .models import InventoryItem, LotConsumption, RawGrain, StockMovement
+
+logger = logging.getLogger(__name__)
+
+# El grafo de trazabilidad tiene profundidad fija:
+#   RawGrain → LotConsumption → ProductionTask → ProductBatch → OrderLine → Order
+# así que cada consulta hacia adelante o hacia atrás es un único JOIN sobre claves
+# indexadas (lot_code y code son únicos; las FKs tienen índice), sin recorrer nodo a nodo.
+LOT_TO_ORDER = 'lines__product_batch__production_task__lot_consumptions__raw_grain'
+LOT_TO_BATCH = 'production_task__lot_consumptions__raw_grain'
+
+
+def allocate_lots(item: InventoryItem, kg: float, movement: Optional[StockMovement] = None,
+                  production_task=None) -> List[LotConsumption]:
+    """
+    Asigna un consumo a los lotes abiertos del SKU en orden FIFO (más antiguo primero),
+    guardando el costo unitario de cada capa. Solo se leen los lotes que se tocan, vía el
+    índice parcial de lotes abiertos; la parte sin lote registrado queda sin trazar ni costear.
+    """
+    pending = kg
+    touched, consumptions = [], []
+    with transaction.atomic():
+        open_lots = (RawGrain.objects.select_for_update()
+                     .filter(inventory_item=item, remaining_kg__gt=0)
+                     .order_by('received_at', 'id'))
+        for lot in open_lots.iterator(chunk_size=16):
+            take = min(pending, lot.remaining_kg)
+            lot.remaining_kg = round(lot.remaining_kg - take, 6)
+            pending = round(pending - take, 6)
+            touched.append(lot)
+            consumptions.append(LotConsumption(
+                raw_grain=lot, movement=movement, production_task=production_task, qty_kg=take,
+                unit_cost=lot.unit_cost, cost=Decimal(str(take)) * lot.unit_cost,
+            ))
+            if pending <= 0:
+                break
+
+        if pending > 0:
+            logger.warning("%.3f kg de %s consumidos sin lote de origen registrado", pending, item.sku)
+        RawGrain.objects.bulk_update(touched, ['remaining_kg'])
+        if touched:
+            versioning.invalidate(RawGrain)
+        return LotConsumption.objects.bulk_create(consumptions)
+
+
+def release_lots(*movement_ids: int) -> int:
+    """Devuelve a sus lotes los kg asignados a uno o varios movimientos (undo de consumos)"""
+    with transaction.atomic():
+        consumptions = list(LotConsumption.objects.filter(movement_id__in=movement_ids).select_related('raw_grain'))
+        # Varios consumos pueden venir del mismo lote: se acumulan sobre una sola instancia
+        lots = {}
+        for consumption in consumptions:
+            lot = lots.setdefault(consumption.raw_grain_id, consumption.raw_grain)
+            lot.remaining_kg = round(lot.remaining_kg + consumption.qty_kg, 6)
+        RawGrain.objects.bulk_update(list(lots.values()), ['remaining_kg'])
+        if lots:
+            versioning.invalidate(RawGrain)
+        LotConsumption.objects.filter(movement_id__in=movement_ids).delete()
+    return len(consumptions)
+
+
+def consumption_cost(**filters) -> Decimal:
+    """Costo FIFO total de los consumos que cumplen el filtro (p. ej. production_task=task)"""
+    return LotConsumption.objects.filter(**filters).aggregate(total=Sum('cost'))['total'] or Decimal('0')
+
+
+# Hacia adelante: del lote a lo producido y vendido
+def batches_for_lot(lot_code: str) -> QuerySet:
+    return ProductBatch.objects.filter(**{f'{LOT_TO_BATCH}__lot_code': lot_code}).distinct()
+
+
+def orders_for_lot(lot_code: str) -> QuerySet:
+    return Order.objects.filter(**{f'{LOT_TO_ORDER}__lot_code': lot_code}).distinct()
+
+
+def customers_for_lot(lot_code: str) -> List[str]:
+    return list(orders_for_lot(lot_code).order_by('customer').values_list('customer', flat=True).distinct())
+
+
+# Hacia atrás: de lo vendido a los lotes de origen
+def lots_for_batch(batch_code: str) -> QuerySet:
+    return RawGrain.objects.filter(consumptions__production_task__batches__code=batch_code).distinct()
+
+
+def lots_for_order(order_id: int) -> QuerySet:
+    return RawGrain.objects.filter(
+        consumptions__production_task__batches__orderline__order_id=order_id
+    ).distinct()
+
+
+def trace_lot(lot_code: str) -> dict:
+    """Grafo completo de un lote (tareas, lotes terminados, pedidos) en una sola consulta"""
+    rows = (LotConsumption.objects
+            .filter(raw_grain__lot_code=lot_code)
+            .values_list('production_task_id', 'qty_kg',
+                         'production_task__batches__code',
+                         'production_task__batches__orderline__order_id',
+                         'production_task__batches__orderline__order__customer'))
+
+    tasks, batches, orders = {}, set(), {}
+    for task_id, qty_kg, batch_code, order_id, customer in rows:
+        if task_id is not None:
+            tasks.setdefault(task_id, qty_kg)
+        if batch_code:
+            batches.add(batch_code)
+        if order_id is not None:
+            orders[order_id] = customer
+
+    return {
+        'lot_code': lot_code,
+        'production_tasks': sorted(tasks),
+        'consumed_kg': sum(tasks.values()),
+        'product_batches': sorted(batches),
+        'orders': [{'id': order_id, 'customer': customer} for order_id, customer in sorted(orders.items())],
+    }
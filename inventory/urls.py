@@ -7,8 +7,12 @@ urlpatterns = [
     path('', views.inventory_dashboard, name='dashboard'),
     path('add-stock/', views.add_stock, name='add_stock'),
     path('consume-stock/', views.consume_stock, name='consume_stock'),
+    path('batch-stock/', views.batch_stock, name='batch_stock'),
+    path('transfer/', views.transfer_stock, name='transfer_stock'),
     path('add-product/', views.add_product_command, name='add_product'),
     path('undo/', views.undo_last_command, name='undo'),
     path('clear-history/', views.clear_command_history, name='clear_history'),
     path('download-report/', views.download_inventory_report, name='download_report'),
+    path('import/raw-grains/', views.import_raw_grain_lots, name='import_raw_grains'),
+    path('trace/<str:lot_code>/', views.trace_raw_grain_lot, name='trace_lot'),
 ]
\ No newline at end of file
@@ -1,21 +1,46 @@
+import math
+from urllib.parse import urlencode
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from .models import InventoryItem, RawGrain
+from .models import InventoryItem, Location, RawGrain, StockLevel
 from .repositories import DjangoInventoryRepo
-from .commands import CommandInvoker, AgregarStockCommand, ConsumirStockCommand, AgregarProductoCommand
+from .commands import (CommandInvoker, AgregarStockCommand, ConsumirStockCommand, AgregarProductoCommand,
+                       MacroCommand, TransferirStockCommand)
+from .traceability import trace_lot
+from .importing import detect_format, import_raw_grains
+from django.views.decorators.http import require_POST
 from core.reports import ReportGenerator  # Asegúrate de importar ReportGenerator
+from core.conditional import page_variant, versioned_condition
+from core.db_router import read_replica
+from core.idempotency import idempotent
 
 # Inicializar repositorio
 repo = DjangoInventoryRepo()
 
+def _dashboard_variant(request):
+    # El historial de comandos vive en la sesión de cada usuario; cada ubicación tiene su vista
+    return page_variant(request) + [request.session.get('command_history', []), request.GET.get('location', '')]
+
+@versioned_condition(InventoryItem, RawGrain, StockLevel, vary_on=_dashboard_variant)
 def inventory_dashboard(request):
-    items = InventoryItem.objects.all()
-    raw_grains = RawGrain.objects.all()[:5]
+    code = request.GET.get('location')
+    location = Location.objects.filter(code=code).first() if code else None
+    if location is not None:
+        # Vista de una ubicación: solo su partición de niveles (índice location, item)
+        levels = StockLevel.objects.filter(location=location).select_related('item').order_by('item__sku')
+        items = []
+        for level in levels:
+            level.item.location_stock_kg = level.stock_kg
+            items.append(level.item)
+    else:
+        items = InventoryItem.objects.all()
+    raw_grains = RawGrain.objects.order_by('-received_at')[:5]
     
     # Inicializar CommandInvoker con la request
     command_invoker = CommandInvoker(request)
     
-    # Verificar stock bajo
+    # Verificar stock bajo (el mínimo es por SKU: se compara contra el total)
     low_stock_items = []
     for item in items:
         if item.needs_restock():
@@ -25,18 +50,28 @@ def inventory_dashboard(request):
         'items': items,
         'raw_grains': raw_grains,
         'low_stock_items': low_stock_items,
-        'command_history': command_invoker.get_history()
+        'command_history': command_invoker.get_history(),
+        'locations': Location.objects.order_by('code'),
+        'location': location,
     }
     return render(request, 'inventory/dashboard.html', context)
 
+def _redirect_dashboard(location):
+    response = redirect('inventory:dashboard')
+    if location:
+        response['Location'] += '?' + urlencode({'location': location})
+    return response
+
+@idempotent
 def add_stock(request):
     if request.method == 'POST':
         sku = request.POST.get('sku')
         kg = float(request.POST.get('kg', 0))
+        location = request.POST.get('location') or None
         
         # Usar CommandInvoker con la request
         command_invoker = CommandInvoker(request)
-        command = AgregarStockCommand(repo, sku, kg)
+        command = AgregarStockCommand(repo, sku, kg, location)
         
         try:
             result = command_invoker.execute_command(command)
@@ -44,16 +79,18 @@ def add_stock(request):
         except Exception as e:
             messages.error(request, f'❌ Error: {e}')
         
-        return redirect('inventory:dashboard')
+        return _redirect_dashboard(location)
 
+@idempotent
 def consume_stock(request):
     if request.method == 'POST':
         sku = request.POST.get('sku')
         kg = float(request.POST.get('kg', 0))
+        location = request.POST.get('location') or None
         
         # Usar CommandInvoker con la request
         command_invoker = CommandInvoker(request)
-        command = ConsumirStockCommand(repo, sku, kg)
+        command = ConsumirStockCommand(repo, sku, kg, location)
         
         try:
             result = command_invoker.execute_command(command)
@@ -61,7 +98,63 @@ def consume_stock(request):
         except Exception as e:
             messages.error(request, f'❌ Error: {e}')
         
-        return redirect('inventory:dashboard')
+        return _redirect_dashboard(location)
+
+def _parse_lines(text: str):
+    """Líneas "SKU kg" del formulario de movimientos en lote (kg admite coma decimal: 12,5)"""
+    lines = []
+    for number, raw in enumerate(text.splitlines(), start=1):
+        if not raw.strip():
+            continue
+        parts = raw.replace(';', ' ').split()
+        try:
+            sku, kg_text = parts
+            kg = float(kg_text.replace(',', '.'))
+        except ValueError:
+            raise ValueError(f'Línea {number} inválida: "{raw.strip()}" (se espera "SKU kg")')
+        if not math.isfinite(kg) or kg <= 0:
+            raise ValueError(f'Línea {number}: los kg deben ser un número mayor que cero ("{raw.strip()}")')
+        lines.append((sku, kg))
+    return lines
+
+@idempotent
+def batch_stock(request):
+    """Recepción o consumo de muchas líneas en un solo POST: una transacción y un solo undo"""
+    if request.method == 'POST':
+        location = request.POST.get('location') or None
+        command_class = ConsumirStockCommand if request.POST.get('operation') == 'consume' else AgregarStockCommand
+        
+        command_invoker = CommandInvoker(request)
+        try:
+            lines = _parse_lines(request.POST.get('lines', ''))
+            command = MacroCommand(repo, [command_class(repo, sku, kg, location) for sku, kg in lines],
+                                   label=f"{'Consumo' if command_class is ConsumirStockCommand else 'Recepción'} "
+                                         f"de {len(lines)} líneas")
+            result = command_invoker.execute_command(command)
+            messages.success(request, f'✅ {result}')
+        except Exception as e:
+            messages.error(request, f'❌ Error: {e}')
+        
+        return _redirect_dashboard(location)
+
+@idempotent
+def transfer_stock(request):
+    if request.method == 'POST':
+        sku = request.POST.get('sku')
+        kg = float(request.POST.get('kg', 0))
+        source = request.POST.get('from_location')
+        target = request.POST.get('to_location')
+        
+        command_invoker = CommandInvoker(request)
+        command = TransferirStockCommand(repo, sku, kg, source, target)
+        
+        try:
+            result = command_invoker.execute_command(command)
+            messages.success(request, f'🚚 {result}')
+        except Exception as e:
+            messages.error(request, f'❌ Error: {e}')
+        
+        return _redirect_dashboard(source)
 
 def add_product_command(request):
     if request.method == 'POST':
@@ -88,8 +181,12 @@ def add_product_command(request):
 def undo_last_command(request):
     # Usar CommandInvoker con la request
     command_invoker = CommandInvoker(request)
-    result = command_invoker.undo_last()
-    messages.info(request, f'↩️ {result}')
+    try:
+        result = command_invoker.undo_last()
+        messages.info(request, f'↩️ {result}')
+    except ValueError as e:
+        # p. ej. el stock agregado ya se consumió en esa ubicación
+        messages.error(request, f'❌ No se pudo deshacer: {e}')
     return redirect('inventory:dashboard')
 
 def clear_command_history(request):
@@ -100,9 +197,31 @@ def clear_command_history(request):
     return redirect('inventory:dashboard')
 
 # AÑADIR ESTA FUNCIÓN FALTANTE
+@versioned_condition(InventoryItem, RawGrain)
 def download_inventory_report(request):
     """Descarga reporte de inventario en formato CSV"""
-    items = InventoryItem.objects.all()
-    raw_grains = RawGrain.objects.all()
-    
-    return ReportGenerator.generate_inventory_csv(items, raw_grains)
\ No newline at end of file
+    with read_replica():
+        items = InventoryItem.objects.all()
+        raw_grains = RawGrain.objects.all()
+        
+        return ReportGenerator.generate_inventory_csv(items, raw_grains)
+
+def trace_raw_grain_lot(request, lot_code):
+    """Trazabilidad de un lote de grano verde: tareas, lotes terminados y clientes que lo recibieron"""
+    if not RawGrain.objects.filter(lot_code=lot_code).exists():
+        return JsonResponse({'error': f'Lote {lot_code} no encontrado'}, status=404)
+    return JsonResponse(trace_lot(lot_code))
+
+
+@require_POST
+def import_raw_grain_lots(request):
+    """Importa un archivo de recepciones (CSV o JSON Lines) leyéndolo por bloques"""
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'error': "Falta el archivo ('file')"}, status=400)
+    fmt = request.POST.get('format') or detect_format(upload.name)
+    try:
+        result = import_raw_grains(upload.open('rb'), fmt)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(result.as_dict())
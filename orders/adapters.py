@@ -2,6 +2,8 @@ import json
 import requests
 from django.conf import settings
 
+from core.tracing import traced
+
 class ExternalLogisticsAPI:
     """
     Simulación de API externa de logística con interfaz diferente a la nuestra
@@ -46,6 +48,7 @@ class ProviderAdapter:
     def __init__(self, provider: ExternalLogisticsAPI):
         self.provider = provider
 
+    @traced('logistics.create_shipment', record_args=('order_id', 'speed'))
     def create_shipment(self, order_id: int, speed: str) -> dict:
         """Nuestra interfaz uniforme para crear envíos"""
         # Adaptar nuestros parámetros a los de la API externa
@@ -67,6 +70,7 @@ class ProviderAdapter:
                 'error': f'❌ Error al crear envío: {str(e)}'
             }
 
+    @traced('logistics.shipment_status', record_args=('tracking_number',))
     def get_shipment_status(self, tracking_number: str) -> dict:
         """Obtiene el estado de un envío"""
         try:
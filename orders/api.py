@@ -0,0 +1,94 @@
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils.decorators import method_decorator
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core import versioning
+from core.api import BulkItemError, ProjectedListMixin, VersionedReadMixin, bulk_payload
+from core.idempotency import idempotent
+from production.models import ProductBatch
+from .models import Delivery, Order, OrderLine
+from .serializers import CreateOrderSerializer, DeliverySerializer, OrderSerializer, ShipOrdersSerializer
+from .shipping import ship_order
+
+
+class OrderViewSet(VersionedReadMixin, ProjectedListMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Order.objects.all()
+    serializer_class = OrderSerializer
+    # Las líneas muestran el código del lote
+    versioned_models = (Order, OrderLine, ProductBatch)
+    prefetch_fields = {
+        'lines': Prefetch('lines', queryset=OrderLine.objects.select_related('product_batch')
+                          .only('id', 'order', 'qty_kg', 'product_batch__code')),
+    }
+
+    @method_decorator(idempotent)
+    def create(self, request, *args, **kwargs):
+        """[{"customer", "delivery_speed", "lines": [{"product_batch": código, "qty_kg"}]}, ...]"""
+        entries = bulk_payload(request.data, CreateOrderSerializer)
+        codes = {line['product_batch'] for entry in entries for line in entry['lines']}
+        batches = ProductBatch.objects.only('id', 'code').in_bulk(codes, field_name='code')
+
+        lines = []
+        for index, entry in enumerate(entries):
+            missing = sorted({line['product_batch'] for line in entry['lines']} - set(batches))
+            if missing:
+                raise BulkItemError(index, f"Lotes no encontrados: {', '.join(missing)}")
+
+        with transaction.atomic():
+            orders = Order.objects.bulk_create([
+                Order(customer=entry['customer'], delivery_speed=entry['delivery_speed']) for entry in entries
+            ])
+            for order, entry in zip(orders, entries):
+                lines.extend(OrderLine(order=order, product_batch=batches[line['product_batch']],
+                                       qty_kg=line['qty_kg']) for line in entry['lines'])
+            OrderLine.objects.bulk_create(lines)
+        # bulk_create no emite señales: se invalidan a mano las versiones de pedidos y líneas
+        versioning.invalidate(Order, OrderLine)
+
+        serializer = OrderSerializer(orders, many=True, fields=['id', 'customer', 'delivery_speed', 'status'])
+        return Response({'results': serializer.data}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    @method_decorator(idempotent)
+    def ship(self, request):
+        """
+        {"order_ids": [...]} — crea el envío de cada orden con el proveedor logístico.
+        Todo lo que se puede comprobar se comprueba antes de llamar al proveedor; sus envíos no
+        se pueden revertir, así que cada orden se confirma por separado y el resultado va por
+        orden (207 si alguna falló).
+        """
+        payload = ShipOrdersSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        order_ids = payload.validated_data['order_ids']
+        orders = Order.objects.in_bulk(order_ids)
+        shipped = set(Delivery.objects.filter(order_id__in=order_ids).values_list('order_id', flat=True))
+
+        seen = set()
+        for index, order_id in enumerate(order_ids):
+            if order_id in seen:
+                raise BulkItemError(index, f'Orden #{order_id} repetida en la petición')
+            seen.add(order_id)
+            if order_id not in orders:
+                raise BulkItemError(index, f'Orden #{order_id} no encontrada')
+            if order_id in shipped:
+                raise BulkItemError(index, f'La orden #{order_id} ya tiene un envío registrado')
+
+        results = []
+        for order_id in order_ids:
+            with transaction.atomic():
+                result = ship_order(orders[order_id])
+            if result['success']:
+                results.append({'order': order_id, 'success': True, 'tracking_number': result['tracking_number'],
+                                'carrier': result['carrier'], 'estimated_days': result['estimated_days']})
+            else:
+                results.append({'order': order_id, 'success': False, 'error': result['error']})
+        failed = any(not result['success'] for result in results)
+        return Response({'results': results}, status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK)
+
+
+class DeliveryViewSet(VersionedReadMixin, ProjectedListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Delivery.objects.all()
+    serializer_class = DeliverySerializer
@@ -9,12 +9,20 @@ class Order(models.Model):
         ('DELIVERED', 'Entregado'),
         ('CANCELLED', 'Cancelado'),
     ]
+    ACTIVE_STATUSES = ('PENDING', 'PROCESSING', 'SHIPPED')
     
     id = models.AutoField(primary_key=True)
     customer = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
     delivery_speed = models.CharField(max_length=2, choices=DeliverySpeed.choices)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+
+    class Meta:
+        indexes = [
+            # Listados recientes y conteos por estado de los dashboards
+            models.Index(fields=['-created_at'], name='order_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+        ]
     
     def confirm_received(self):
         self.status = 'DELIVERED'
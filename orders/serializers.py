@@ -0,0 +1,44 @@
+from rest_framework import serializers
+
+from core.api import ProjectedSerializer, positive_kg
+from core.models import DeliverySpeed
+from .models import Delivery, Order, OrderLine
+
+
+class OrderLineSerializer(serializers.ModelSerializer):
+    product_batch = serializers.SlugRelatedField(slug_field='code', read_only=True)
+
+    class Meta:
+        model = OrderLine
+        fields = ['id', 'product_batch', 'qty_kg']
+
+
+class OrderSerializer(ProjectedSerializer):
+    lines = OrderLineSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ['id', 'customer', 'created_at', 'delivery_speed', 'status', 'lines']
+
+
+class DeliverySerializer(ProjectedSerializer):
+    class Meta:
+        model = Delivery
+        fields = ['id', 'order', 'route', 'shipped_at', 'received_confirmed']
+
+
+class OrderLineInputSerializer(serializers.Serializer):
+    product_batch = serializers.CharField(max_length=50, help_text='Código del lote')
+    qty_kg = serializers.FloatField(validators=[positive_kg])
+
+
+class CreateOrderSerializer(serializers.Serializer):
+    """Un elemento de POST /orders/"""
+    customer = serializers.CharField(max_length=200)
+    delivery_speed = serializers.ChoiceField(choices=DeliverySpeed.choices, default=DeliverySpeed.ECONOMICA)
+    lines = OrderLineInputSerializer(many=True, required=False, default=list)
+
+
+class ShipOrdersSerializer(serializers.Serializer):
+    """Cuerpo de /orders/ship/"""
+    order_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
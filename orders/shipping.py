@@ -0,0 +1,23 @@
+from .adapters import LogisticsAdapterFactory
+from .models import Delivery, Order
+
+
+def ship_order(order: Order, adapter=None) -> dict:
+    """Crea el envío con el proveedor logístico, registra la entrega y marca la orden como enviada"""
+    if Delivery.objects.filter(order=order).exists():
+        return {'success': False, 'error': f'❌ La orden #{order.id} ya tiene un envío registrado'}
+
+    adapter = adapter or LogisticsAdapterFactory.create_adapter('default')
+    # Determinar la velocidad
+    speed = 'rapida' if order.delivery_speed == 'RA' else 'economica'
+
+    result = adapter.create_shipment(order.id, speed)
+    if result['success']:
+        result['delivery'] = Delivery.objects.create(
+            order=order,
+            route=result['carrier'],
+            received_confirmed=False
+        )
+        order.status = 'SHIPPED'
+        order.save()
+    return result
@@ -0,0 +1,81 @@
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+
+from orders.adapters import ExternalLogisticsAPI
+from orders.models import Delivery, Order
+from production.models import ProductBatch, ProductionTask
+
+
+class OrdersApiTest(TestCase):
+    def setUp(self):
+        task = ProductionTask.objects.create(assigned_unit='Línea 1', planned_kg=10)
+        ProductBatch.objects.create(code='API-B1', coffee_type='AR', qty_kg=10, mfg_date=date(2025, 1, 1),
+                                    expiry_date=date(2026, 1, 1), production_task=task)
+
+    def _post(self, url, payload):
+        return self.client.post(url, payload, content_type='application/json')
+
+    def test_crear_en_lote_y_enviar(self):
+        """Las órdenes se crean con sus líneas en lote y se envían con el adaptador logístico"""
+        response = self._post('/api/v1/orders/', [
+            {'customer': 'Tienda Centro', 'delivery_speed': 'RA', 'lines': [{'product_batch': 'API-B1', 'qty_kg': 2}]},
+            {'customer': 'Tienda Norte'},
+        ])
+        self.assertEqual(response.status_code, 201)
+        order_ids = [order['id'] for order in response.json()['results']]
+
+        with self.assertNumQueries(2):
+            listing = self.client.get('/api/v1/orders/?fields=id,lines').json()['results']
+        self.assertEqual(listing[1]['lines'][0]['product_batch'], 'API-B1')
+
+        shipped = self._post('/api/v1/orders/ship/', {'order_ids': order_ids}).json()['results']
+        self.assertTrue(shipped[0]['tracking_number'].startswith('DHL_EXPRESS'))
+        self.assertEqual(Delivery.objects.count(), 2)
+        self.assertFalse(Order.objects.exclude(status='SHIPPED').exists())
+
+        again = self._post('/api/v1/orders/ship/', {'order_ids': order_ids[:1]})
+        self.assertEqual(again.status_code, 400)
+
+    def test_lote_inexistente(self):
+        """Una línea con un lote desconocido rechaza la petición sin crear órdenes"""
+        response = self._post('/api/v1/orders/', [{'customer': 'X', 'lines': [{'product_batch': 'NO', 'qty_kg': 1}]}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_cantidad_de_linea_positiva_y_finita(self):
+        """Las líneas con qty_kg cero o no finita se rechazan"""
+        for qty in (0, 'NaN', 'Infinity'):
+            response = self._post('/api/v1/orders/', [{'customer': 'X', 'lines': [{'product_batch': 'API-B1', 'qty_kg': qty}]}])
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_envio_validado_antes_de_llamar_al_proveedor(self):
+        """Una orden inexistente, repetida o ya enviada rechaza la petición sin ningún envío externo"""
+        first = Order.objects.create(customer='A', delivery_speed='EC')
+        second = Order.objects.create(customer='B', delivery_speed='EC')
+        shipped = Order.objects.create(customer='C', delivery_speed='EC')
+        Delivery.objects.create(order=shipped, route='Transporte Económico')
+
+        with mock.patch.object(ExternalLogisticsAPI, 'ship') as ship:
+            for order_ids in ([first.id, 999999], [first.id, second.id, first.id], [first.id, shipped.id]):
+                response = self._post('/api/v1/orders/ship/', {'order_ids': order_ids})
+                self.assertEqual(response.status_code, 400)
+        ship.assert_not_called()
+        self.assertEqual(Delivery.objects.count(), 1)
+
+    def test_falla_del_proveedor_no_revierte_los_envios_anteriores(self):
+        """Si el proveedor falla en una orden, las ya enviadas quedan registradas y el resultado va por orden"""
+        first = Order.objects.create(customer='A', delivery_speed='EC')
+        second = Order.objects.create(customer='B', delivery_speed='EC')
+
+        with mock.patch.object(ExternalLogisticsAPI, 'ship', side_effect=['STD_1', RuntimeError('caído')]):
+            response = self._post('/api/v1/orders/ship/', {'order_ids': [first.id, second.id]})
+
+        self.assertEqual(response.status_code, 207)
+        results = response.json()['results']
+        self.assertEqual([result['success'] for result in results], [True, False])
+        self.assertEqual(list(Delivery.objects.values_list('order_id', flat=True)), [first.id])
+        second.refresh_from_db()
+        self.assertNotEqual(second.status, 'SHIPPED')
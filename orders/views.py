@@ -1,9 +1,16 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Q
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from .models import Order, Delivery
 from .strategies import ContextoDeDistribucion, DistribucionRapida, DistribucionEconomica
 from .adapters import LogisticsAdapterFactory
+from .shipping import ship_order
+from core.async_db import gather_queries
+from core.conditional import page_variant, versioned_condition
+from core.idempotency import idempotent
 
+@versioned_condition(Order, vary_on=page_variant)
 def orders_dashboard(request):
     orders = Order.objects.all().order_by('-created_at')
     
@@ -25,6 +32,25 @@ def orders_dashboard(request):
     return render(request, 'orders/dashboard.html', context)
 
 
+@versioned_condition(Order, vary_on=page_variant)
+async def orders_dashboard_async(request):
+    """Versión ASGI: los conteos por estado van en un solo aggregate, a la vez que el total"""
+    stats = await gather_queries(
+        total_orders=Order.objects.count,
+        by_status=lambda: Order.objects.aggregate(**{
+            f'{status.lower()}_orders': Count('id', filter=Q(status=status))
+            for status in ('PENDING', 'PROCESSING', 'SHIPPED', 'DELIVERED')
+        }),
+    )
+    context = {
+        # La tabla está en un fragmento cacheado: el queryset solo se evalúa si la caché falla
+        'orders': Order.objects.all().order_by('-created_at'),
+        'total_orders': stats['total_orders'],
+        **stats['by_status'],
+    }
+    return await sync_to_async(render)(request, 'orders/dashboard.html', context)
+
+
 def plan_distribution(request, order_id):
     """Planifica la ruta de distribución para una orden"""
     try:
@@ -67,29 +93,14 @@ def create_order(request):
         messages.success(request, f'✅ Orden {order.id} creada para {customer}')
         return redirect('orders:dashboard')
 
+@idempotent
 def create_shipment(request, order_id):
     order = get_object_or_404(Order, id=order_id)
     
-    # Usar el adapter para integrar con el API externo
-    adapter_factory = LogisticsAdapterFactory()
-    adapter = adapter_factory.create_adapter('default')
-    
-    # Determinar la velocidad
-    speed = 'rapida' if order.delivery_speed == 'RA' else 'economica'
-    
-    result = adapter.create_shipment(order.id, speed)
+    # El adapter integra con el API externo; ship_order registra la entrega
+    result = ship_order(order)
     
     if result['success']:
-        # Crear registro de envío
-        delivery = Delivery.objects.create(
-            order=order,
-            route=result['carrier'],
-            received_confirmed=False
-        )
-        
-        order.status = 'SHIPPED'
-        order.save()
-        
         messages.success(request, result['message'])
         messages.info(request, f'📦 Carrier: {result["carrier"]}')
         messages.info(request, f'⏱️ Tiempo estimado: {result["estimated_days"]} días')
@@ -1,3 +1,16 @@
 from django.contrib import admin
+from .models import SpcAlert, SpcSeries
 
-# Register your models here.
+@admin.register(SpcSeries)
+class SpcSeriesAdmin(admin.ModelAdmin):
+    # Estado acumulado de las cartas: lo mantienen production.spc y manage.py rebuild_spc
+    list_display = ['coffee_type', 'line', 'metric', 'count', 'mean', 'ewma', 'subgroups', 'updated_at']
+    list_filter = ['coffee_type', 'metric']
+    search_fields = ['line']
+    readonly_fields = ['count', 'mean', 'm2', 'ewma', 'subgroup', 'subgroups', 'xbar_sum', 'range_sum']
+
+@admin.register(SpcAlert)
+class SpcAlertAdmin(admin.ModelAdmin):
+    list_display = ['batch', 'series', 'chart', 'value', 'lower', 'upper', 'created_at']
+    list_filter = ['chart', 'series__coffee_type']
+    search_fields = ['batch__code', 'series__line']
@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.utils.decorators import method_decorator
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.api import BulkItemError, ProjectedListMixin, VersionedReadMixin, bulk_payload
+from core.idempotency import idempotent
+from core.inventory_manager import InventoryManager
+from inventory.repositories import DjangoInventoryRepo
+from .facade import ProductionFacade
+from .models import ProductBatch, ProductionTask
+from .serializers import (AdvanceTasksSerializer, ProductBatchSerializer, ProductionTaskSerializer,
+                          StartProductionSerializer)
+
+production_facade = ProductionFacade(InventoryManager(DjangoInventoryRepo()))
+
+
+class ProductionTaskViewSet(VersionedReadMixin, ProjectedListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = ProductionTask.objects.all()
+    serializer_class = ProductionTaskSerializer
+
+    @action(detail=False, methods=['post'])
+    @method_decorator(idempotent)
+    def start(self, request):
+        """[{"sku", "kg", "kind", "coffee_type"}, ...] — todo o nada"""
+        orders = bulk_payload(request.data, StartProductionSerializer)
+        tasks = []
+        with transaction.atomic():
+            for index, order in enumerate(orders):
+                result = production_facade.start_production(order['sku'], order['kg'], order['kind'],
+                                                            order['coffee_type'])
+                if not result['success']:
+                    raise BulkItemError(index, result['error'])
+                tasks.append(result['production_task'])
+        return Response({'results': ProductionTaskSerializer(tasks, many=True).data}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    @method_decorator(idempotent)
+    def advance(self, request):
+        """{"task_ids": [...]} — avanza cada tarea una etapa; al completarse se crea su lote"""
+        payload = AdvanceTasksSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        task_ids = payload.validated_data['task_ids']
+        results = []
+        with transaction.atomic():
+            for index, task_id in enumerate(task_ids):
+                result = production_facade.advance_production_stage(task_id)
+                if not result['success']:
+                    raise BulkItemError(index, result['error'])
+                batch = result.get('product_batch')
+                results.append({
+                    **ProductionTaskSerializer(result['task'], fields=['id', 'stage', 'progress']).data,
+                    'product_batch': batch.code if batch else None,
+                })
+        return Response({'results': results})
+
+
+class ProductBatchViewSet(VersionedReadMixin, ProjectedListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = ProductBatch.objects.all()
+    serializer_class = ProductBatchSerializer
+    lookup_field = 'code'
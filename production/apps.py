@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ProductionConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "production"
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from .models import ProductBatch
+        from .spc import batch_saved
+
+        post_save.connect(batch_saved, sender=ProductBatch, dispatch_uid='production-spc')
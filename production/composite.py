@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
 class ProcessComponent(ABC):
     @abstractmethod
@@ -11,9 +11,11 @@ class ProcessComponent(ABC):
         pass
 
 class BasicProcess(ProcessComponent):
-    def __init__(self, name: str, duration: int = 1):
+    def __init__(self, name: str, duration: int = 1, resource: Optional[str] = None):
         self.name = name
         self._duration = duration
+        # Equipo que ocupa la etapa (tostadora, molino...); lo usa la simulación de planta
+        self.resource = resource
 
     def execute(self) -> str:
         return f"✅ {self.name} - LISTO para ejecutar"
@@ -90,5 +92,8 @@ class ProcessComposite(ProcessComponent):
     def get_duration(self) -> int:
         return sum(child.get_duration() for child in self._children)
 
+    def get_children(self) -> List[ProcessComponent]:
+        return list(self._children)
+
     def __str__(self):
         return f"{self.name} ({len(self._children)} etapas)"
\ No newline at end of file
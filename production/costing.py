@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, QuerySet, Value, When
+
+from core.models import GrainType
+from products.pricing import price_book
+from .models import ProductBatch
+
+# Tipo de grano del lote → clave de precio por kg en la lista de precios
+PRICE_KEYS = {
+    GrainType.ARABICA: 'arabica',
+    GrainType.ROBUSTA: 'robusta',
+    GrainType.BLEND: 'blend',
+}
+
+MONEY = DecimalField(max_digits=14, decimal_places=4)
+
+
+def batch_margins(queryset: QuerySet = None) -> QuerySet:
+    """
+    Ingreso, costo FIFO (COGS) y margen por lote terminado, calculados en la BD.
+
+    El costo viene ya guardado en el lote al producirse, así que la consulta no
+    recorre consumos ni recepciones; el precio por kg sale de la lista de precios vigente.
+    """
+    queryset = ProductBatch.objects.all() if queryset is None else queryset
+    price_per_kg = Case(
+        *[When(coffee_type=grain, then=Value(Decimal(str(price_book.coffee_price_per_kg(key)))))
+          for grain, key in PRICE_KEYS.items()],
+        default=Value(Decimal('0')),
+        output_field=MONEY,
+    )
+    revenue = ExpressionWrapper(price_per_kg * F('qty_kg'), output_field=MONEY)
+    return (queryset
+            .annotate(revenue=revenue)
+            .annotate(margin=ExpressionWrapper(F('revenue') - F('material_cost'), output_field=MONEY)))
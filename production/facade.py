@@ -3,7 +3,11 @@ from .models import ProductionTask, ProductBatch
 from core.inventory_manager import InventoryManager
 from core.factories import ProductFactory
 from inventory.repositories import DjangoInventoryRepo
+from inventory.traceability import consumption_cost
 from core.models import ProcessStage, GrainType
+from core.db_router import read_replica
+from core.tracing import span, traced
+from django.db import transaction
 from django.utils import timezone
 import random
 
@@ -16,43 +20,51 @@ class ProductionFacade:
         """Crea el proceso compuesto de producción de café con etapas separadas"""
         main_process = ProcessComposite("Producción de Café Gourmet")
         
-        # Definir las etapas del proceso
+        # Definir las etapas del proceso: (nombre, horas, equipo)
         stages = [
-            ("Calibración de tostadora y preparación", 1),
-            ("Tostado controlado por temperatura", 2),
-            ("Enfriamiento rápido del grano", 1),
-            ("Ajuste de molino para molido", 1),
-            ("Molido fino/medio/grueso", 1),
-            ("Control de consistencia del molido", 1),
-            ("Limpieza de línea de envasado", 1),
-            ("Sellado al vacío", 1),
-            ("Etiquetado y codificación", 1),
-            ("Control de calidad final", 1)
+            ("Calibración de tostadora y preparación", 1, "Tostadora"),
+            ("Tostado controlado por temperatura", 2, "Tostadora"),
+            ("Enfriamiento rápido del grano", 1, "Tostadora"),
+            ("Ajuste de molino para molido", 1, "Molino"),
+            ("Molido fino/medio/grueso", 1, "Molino"),
+            ("Control de consistencia del molido", 1, "Molino"),
+            ("Limpieza de línea de envasado", 1, "Envasadora"),
+            ("Sellado al vacío", 1, "Envasadora"),
+            ("Etiquetado y codificación", 1, "Envasadora"),
+            ("Control de calidad final", 1, "Control de calidad")
         ]
         
-        for stage_name, duration in stages:
-            main_process.add(BasicProcess(stage_name, duration))
+        for stage_name, duration, resource in stages:
+            main_process.add(BasicProcess(stage_name, duration, resource))
         
         return main_process
 
+    @traced('production.start', record_args=('sku', 'kg', 'kind'))
     def start_production(self, sku: str, kg: float, kind: str, coffee_type: str = "AR") -> dict:
         """Inicia una nueva producción (solo consume materia prima y crea la tarea)"""
         try:
-            # 1. Verificar y consumir materia prima
-            inventory_item = self.inv_manager.consume_stock(sku, kg)
+            with transaction.atomic():
+                # 1. Crear tarea de producción (inicia en etapa 0)
+                with span('production.create_task'):
+                    production_task = ProductionTask.objects.create(
+                        stage=ProcessStage.TOSTADO,
+                        assigned_unit="Línea de Producción 1",
+                        planned_kg=kg,
+                        progress=0,
+                        current_stage_index=0
+                    )
+
+                # 2. Verificar y consumir materia prima, enlazando los lotes a la tarea
+                inventory_item = self.inv_manager.consume_stock(sku, kg, production_task=production_task)
+
+                # 3. Costo FIFO de la materia prima consumida
+                with span('production.material_cost', task_id=production_task.id):
+                    production_task.material_cost = consumption_cost(production_task=production_task)
+                    production_task.save(update_fields=['material_cost'])
             
-            # 2. Crear proceso de producción
+            # 4. Crear proceso de producción
             production_process = self.create_production_process()
             
-            # 3. Crear tarea de producción (inicia en etapa 0)
-            production_task = ProductionTask.objects.create(
-                stage=ProcessStage.TOSTADO,
-                assigned_unit="Línea de Producción 1",
-                planned_kg=kg,
-                progress=0,
-                current_stage_index=0
-            )
-            
             return {
                 'success': True,
                 'production_task': production_task,
@@ -67,12 +79,14 @@ class ProductionFacade:
                 'error': str(e)
             }
 
+    @traced('production.advance_stage', record_args=('task_id',))
     def advance_production_stage(self, task_id: int) -> dict:
         """Avanza a la siguiente etapa de producción"""
         try:
             task = ProductionTask.objects.get(id=task_id)
+            read_index = task.current_stage_index
             
-            # Avanzar etapa en la tarea
+            # Avanzar etapa en la tarea (compare-and-swap: un solo avance gana)
             if task.advance_stage():
                 # Crear lote de producto si se completó todo
                 if task.stage == ProcessStage.COMPLETADO:
@@ -83,6 +97,11 @@ class ProductionFacade:
                         'task': task,
                         'message': f'✅ Avanzado a {task.get_stage_display()}. Progreso: {task.progress}%'
                     }
+            elif task.current_stage_index != read_index:
+                return {
+                    'success': False,
+                    'error': f'La tarea ya fue avanzada a {task.get_stage_display()} por otra operación'
+                }
             else:
                 return {
                     'success': False,
@@ -95,29 +114,39 @@ class ProductionFacade:
                 'error': 'Tarea de producción no encontrada'
             }
 
+    @traced('production.create_batch', record_args=('task.id',))
     def _create_product_batch(self, task: ProductionTask) -> dict:
-        """Crea el lote de producto terminado cuando se completa la producción"""
+        """Crea el lote de producto terminado cuando se completa la producción (una vez por tarea)"""
         try:
             # Crear producto usando Factory
             coffee_product = self.product_factory.create('arabica', task.planned_kg)  # Tipo hardcodeado por simplicidad
             
-            # Crear lote de producto terminado
+            # Crear lote de producto terminado. La restricción única sobre la tarea hace de
+            # guarda: si el lote ya existe, get_or_create lo devuelve en lugar de duplicarlo
             batch_code = f"BATCH-{timezone.now().strftime('%Y%m%d')}-{random.randint(1000, 9999)}"
-            product_batch = ProductBatch.objects.create(
-                code=batch_code,
-                coffee_type='AR',  # Hardcodeado por simplicidad
-                qty_kg=task.planned_kg,
-                cupping_score=round(random.uniform(80.0, 95.0), 1),
-                mfg_date=timezone.now().date(),
-                expiry_date=timezone.now().date() + timezone.timedelta(days=365),
-                production_task=task
+            product_batch, created = ProductBatch.objects.get_or_create(
+                production_task=task,
+                defaults={
+                    'code': batch_code,
+                    'coffee_type': 'AR',  # Hardcodeado por simplicidad
+                    'qty_kg': task.planned_kg,
+                    'cupping_score': round(random.uniform(80.0, 95.0), 1),
+                    'mfg_date': timezone.now().date(),
+                    'expiry_date': timezone.now().date() + timezone.timedelta(days=365),
+                    'material_cost': task.material_cost,
+                }
             )
+            if not created:
+                return {
+                    'success': False,
+                    'error': f'La tarea ya tiene el lote {product_batch.code}'
+                }
             
             return {
                 'success': True,
                 'task': task,
                 'product_batch': product_batch,
-                'message': f'🎉 Producción COMPLETADA! Lote {batch_code} creado.'
+                'message': f'🎉 Producción COMPLETADA! Lote {product_batch.code} creado.'
             }
             
         except Exception as e:
@@ -141,22 +170,23 @@ class ProductionFacade:
             return {'error': 'Tarea no encontrada'}
 
     def generate_production_report(self) -> str:
-        """Genera reporte de producción"""
-        tasks = ProductionTask.objects.all()
-        completed_tasks = tasks.filter(stage=ProcessStage.COMPLETADO)
-        in_progress_tasks = tasks.exclude(stage=ProcessStage.COMPLETADO)
-        
-        report = [
-            "📊 REPORTE DE PRODUCCIÓN - CAFÉ AROMA",
-            "=" * 50,
-            f"Total de tareas: {len(tasks)}",
-            f"Completadas: {len(completed_tasks)}",
-            f"En progreso: {len(in_progress_tasks)}",
-            "",
-            "Tareas en progreso:"
-        ]
-        
-        for task in in_progress_tasks.order_by('-created_at')[:5]:
-            report.append(f"  - Tarea #{task.id}: {task.get_stage_display()} - {task.progress}%")
+        """Genera reporte de producción (lee de la réplica si hay una configurada)"""
+        with read_replica():
+            tasks = ProductionTask.objects.all()
+            completed_tasks = tasks.filter(stage=ProcessStage.COMPLETADO)
+            in_progress_tasks = tasks.exclude(stage=ProcessStage.COMPLETADO)
+            
+            report = [
+                "📊 REPORTE DE PRODUCCIÓN - CAFÉ AROMA",
+                "=" * 50,
+                f"Total de tareas: {len(tasks)}",
+                f"Completadas: {len(completed_tasks)}",
+                f"En progreso: {len(in_progress_tasks)}",
+                "",
+                "Tareas en progreso:"
+            ]
+            
+            for task in in_progress_tasks.order_by('-created_at')[:5]:
+                report.append(f"  - Tarea #{task.id}: {task.get_stage_display()} - {task.progress}%")
         
         return "\n".join(report)
\ No newline at end of file
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from production.spc import rebuild_series
+
+
+class Command(BaseCommand):
+    help = "Recalcula las cartas de control (X̄/R y EWMA) y sus alertas desde todos los lotes"
+
+    def handle(self, *args, **options):
+        try:
+            count = rebuild_series()
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} series de control recalculadas"))
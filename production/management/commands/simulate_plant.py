@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.inventory_manager import InventoryManager
+from inventory.repositories import DjangoInventoryRepo
+from production.facade import ProductionFacade
+from production.simulation import simulate, stations_from_process
+
+
+class Command(BaseCommand):
+    help = "Simula la planta (Monte Carlo de eventos discretos) para evaluar capacidad antes de comprar equipos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--arrivals-per-hour', type=float, default=0.2, help='Lotes que entran por hora')
+        parser.add_argument('--hours', type=float, default=480, help='Horizonte de cada réplica (horas)')
+        parser.add_argument('--replications', type=int, default=1000, help='Réplicas Monte Carlo')
+        parser.add_argument('--cv', type=float, default=0.25, help='Coeficiente de variación de las duraciones')
+        parser.add_argument('--capacity', action='append', default=[], metavar='EQUIPO=N',
+                            help='Unidades de un equipo, p. ej. --capacity Molino=2 (repetible)')
+        parser.add_argument('--workers', type=int, default=None, help='Procesos (por defecto, uno por CPU)')
+        parser.add_argument('--seed', type=int, default=None, help='Semilla para repetir la simulación')
+
+    def handle(self, *args, **options):
+        capacities = {}
+        for spec in options['capacity']:
+            name, _, units = spec.rpartition('=')
+            if not name or not units.isdigit():
+                raise CommandError(f"Capacidad inválida: {spec} (formato EQUIPO=N)")
+            capacities[name] = int(units)
+
+        process = ProductionFacade(InventoryManager(DjangoInventoryRepo())).create_production_process()
+        try:
+            stations = stations_from_process(process, capacities)
+            result = simulate(stations, options['arrivals_per_hour'], options['hours'],
+                              replications=options['replications'], cv=options['cv'],
+                              seed=options['seed'], workers=options['workers'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        summary = result.summary()
+        throughput = summary['throughput_per_hour']
+        lead_time = summary['lead_time_hours']
+        self.stdout.write(f"🏭 {result.replications} réplicas de {options['hours']:g} h, "
+                          f"{options['arrivals_per_hour']:g} lotes/h de entrada")
+        for station in stations:
+            usage = summary['utilization'][station.name]
+            self.stdout.write(f"  {station.name:<20} ×{station.capacity} utilización "
+                              f"{usage['mean']:.0%} (p95 {usage['p95']:.0%})")
+        self.stdout.write(f"Rendimiento: {throughput['mean']:.3f} lotes/h "
+                          f"(p5 {throughput['p5']:.3f}, p95 {throughput['p95']:.3f})")
+        if lead_time['mean'] is None:
+            self.stdout.write("Ningún lote terminó dentro del horizonte")
+        else:
+            self.stdout.write(f"Tiempo de ciclo: media {lead_time['mean']:.1f} h, "
+                              f"p50 {lead_time['p50']:.1f} h, p95 {lead_time['p95']:.1f} h")
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0003_alter_productiontask_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productbatch',
+            name='material_cost',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='productiontask',
+            name='material_cost',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=14, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0004_fifo_costing'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productbatch',
+            index=models.Index(fields=['-mfg_date'], name='batch_mfg_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productbatch',
+            index=models.Index(fields=['coffee_type', 'mfg_date'], name='batch_type_mfg_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productiontask',
+            index=models.Index(fields=['-created_at'], name='task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productiontask',
+            index=models.Index(fields=['stage', 'created_at'], name='task_stage_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0005_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='productbatch',
+            constraint=models.UniqueConstraint(fields=('production_task',), name='batch_task_unique'),
+        ),
+    ]
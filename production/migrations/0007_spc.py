@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0006_batch_task_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpcSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('coffee_type', models.CharField(choices=[('AR', 'Arábica'), ('RO', 'Robusta'), ('BL', 'Blend')], max_length=2)),
+                ('line', models.CharField(max_length=100)),
+                ('metric', models.CharField(choices=[('cupping_score', 'Puntuación de cata'), ('qty_kg', 'Cantidad (kg)')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('mean', models.FloatField(default=0.0)),
+                ('m2', models.FloatField(default=0.0)),
+                ('ewma', models.FloatField(blank=True, null=True)),
+                ('subgroup', models.JSONField(default=list)),
+                ('subgroups', models.IntegerField(default=0)),
+                ('xbar_sum', models.FloatField(default=0.0)),
+                ('range_sum', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('coffee_type', 'line', 'metric'), name='spc_series_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SpcAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chart', models.CharField(choices=[('XBAR', 'Media del subgrupo (X̄)'), ('R', 'Rango del subgrupo (R)'), ('EWMA', 'EWMA')], max_length=4)),
+                ('value', models.FloatField()),
+                ('lower', models.FloatField()),
+                ('upper', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spc_alerts', to='production.productbatch')),
+                ('series', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='production.spcseries')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-created_at'], name='spc_alert_created_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,8 @@
+from decimal import Decimal
+
 from django.db import models
 from django.utils import timezone
+from core import versioning
 from core.models import ProcessStage, GrainType
 
 class ProductionTask(models.Model):
@@ -10,6 +13,8 @@ class ProductionTask(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     current_stage_index = models.IntegerField(default=0)
+    # Costo FIFO de la materia prima consumida
+    material_cost = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True)
     
     # Etapas en orden
     STAGES_ORDER = [
@@ -18,6 +23,12 @@ class ProductionTask(models.Model):
         ProcessStage.ENVASADO,
         ProcessStage.COMPLETADO
     ]
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='task_created_idx'),
+            models.Index(fields=['stage', 'created_at'], name='task_stage_created_idx'),
+        ]
     
     def get_current_stage(self):
         """Obtiene la etapa actual basada en el índice"""
@@ -26,23 +37,36 @@ class ProductionTask(models.Model):
         return ProcessStage.COMPLETADO
     
     def advance_stage(self):
-        """Avanza a la siguiente etapa de producción"""
-        if self.current_stage_index < len(self.STAGES_ORDER) - 1:
-            self.current_stage_index += 1
-            self.stage = self.STAGES_ORDER[self.current_stage_index]
-            
-            # Calcular progreso como entero (0-100%)
-            total_stages = len(self.STAGES_ORDER) - 1  # -1 porque empezamos en 0
-            self.progress = int((self.current_stage_index / total_stages) * 100)
-            self.save()
-            
-            # Si llegó a la última etapa, marcar como completado
-            if self.current_stage_index == len(self.STAGES_ORDER) - 1:
-                self.mark_done()
-            
-            return True
-        return False
-    
+        """
+        Avanza a la siguiente etapa con un único UPDATE condicionado a la etapa leída
+        (compare-and-swap sobre current_stage_index, que hace de versión). Si otro avance
+        llegó antes, no escribe nada, recarga la tarea y devuelve False.
+        """
+        expected = self.current_stage_index
+        if expected >= len(self.STAGES_ORDER) - 1:
+            return False
+        index = expected + 1
+        total_stages = len(self.STAGES_ORDER) - 1  # -1 porque empezamos en 0
+        changes = {
+            'current_stage_index': index,
+            'stage': self.STAGES_ORDER[index],
+            # Progreso como entero (0-100%)
+            'progress': int((index / total_stages) * 100),
+        }
+        # Al llegar a la última etapa se completa en la misma escritura
+        if index == total_stages:
+            changes['completed_at'] = timezone.now()
+
+        updated = ProductionTask.objects.filter(pk=self.pk, current_stage_index=expected).update(**changes)
+        if not updated:
+            self.refresh_from_db(fields=['current_stage_index', 'stage', 'progress', 'completed_at'])
+            return False
+        for field, value in changes.items():
+            setattr(self, field, value)
+        # update() no emite señales
+        versioning.invalidate(ProductionTask)
+        return True
+
     def mark_done(self):
         """Marca la tarea como completada"""
         self.progress = 100
@@ -65,6 +89,90 @@ class ProductBatch(models.Model):
     mfg_date = models.DateField()
     expiry_date = models.DateField()
     production_task = models.ForeignKey(ProductionTask, on_delete=models.CASCADE, related_name='batches')
+    material_cost = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-mfg_date'], name='batch_mfg_date_idx'),
+            models.Index(fields=['coffee_type', 'mfg_date'], name='batch_type_mfg_idx'),
+        ]
+        constraints = [
+            # Un lote por tarea: dos avances simultáneos a COMPLETADO no crean dos
+            models.UniqueConstraint(fields=['production_task'], name='batch_task_unique'),
+        ]
+
+    @property
+    def cost_per_kg(self):
+        if self.material_cost is None or not self.qty_kg:
+            return None
+        return self.material_cost / Decimal(str(self.qty_kg))
     
     def __str__(self):
-        return f"Batch {self.code} - {self.get_coffee_type_display()}"
\ No newline at end of file
+        return f"Batch {self.code} - {self.get_coffee_type_display()}"
+
+class SpcSeries(models.Model):
+    """
+    Estado acumulado de una serie de control (tipo de café × línea × métrica), actualizado
+    en O(1) por lote: media y varianza (Welford), EWMA y los subgrupos de las cartas X̄/R.
+    """
+    METRIC_CHOICES = [
+        ('cupping_score', 'Puntuación de cata'),
+        ('qty_kg', 'Cantidad (kg)'),
+    ]
+
+    coffee_type = models.CharField(max_length=2, choices=GrainType.choices)
+    line = models.CharField(max_length=100)
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    count = models.IntegerField(default=0)
+    mean = models.FloatField(default=0.0)
+    m2 = models.FloatField(default=0.0)  # suma de cuadrados de las desviaciones (Welford)
+    ewma = models.FloatField(null=True, blank=True)
+    subgroup = models.JSONField(default=list)  # valores del subgrupo en curso
+    subgroups = models.IntegerField(default=0)
+    xbar_sum = models.FloatField(default=0.0)
+    range_sum = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['coffee_type', 'line', 'metric'], name='spc_series_unique'),
+        ]
+
+    @property
+    def std(self):
+        return (self.m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
+
+    @property
+    def xbar_center(self):
+        return self.xbar_sum / self.subgroups if self.subgroups else None
+
+    @property
+    def range_mean(self):
+        return self.range_sum / self.subgroups if self.subgroups else None
+
+    def __str__(self):
+        return f"{self.get_coffee_type_display()} · {self.line} · {self.get_metric_display()}"
+
+
+class SpcAlert(models.Model):
+    CHART_CHOICES = [
+        ('XBAR', 'Media del subgrupo (X̄)'),
+        ('R', 'Rango del subgrupo (R)'),
+        ('EWMA', 'EWMA'),
+    ]
+
+    series = models.ForeignKey(SpcSeries, on_delete=models.CASCADE, related_name='alerts')
+    batch = models.ForeignKey(ProductBatch, on_delete=models.CASCADE, related_name='spc_alerts')
+    chart = models.CharField(max_length=4, choices=CHART_CHOICES)
+    value = models.FloatField()
+    lower = models.FloatField()
+    upper = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='spc_alert_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_chart_display()} fuera de control en {self.batch.code}"
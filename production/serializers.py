@@ -0,0 +1,35 @@
+from rest_framework import serializers
+
+from core.api import ProjectedSerializer, positive_kg
+from core.models import GrainType
+from .models import ProductBatch, ProductionTask
+
+
+class ProductionTaskSerializer(ProjectedSerializer):
+    class Meta:
+        model = ProductionTask
+        fields = ['id', 'stage', 'assigned_unit', 'planned_kg', 'progress', 'current_stage_index', 'created_at',
+                  'completed_at', 'material_cost']
+
+
+class ProductBatchSerializer(ProjectedSerializer):
+    class Meta:
+        model = ProductBatch
+        fields = ['id', 'code', 'coffee_type', 'qty_kg', 'cupping_score', 'mfg_date', 'expiry_date',
+                  'production_task', 'material_cost']
+
+
+class StartProductionSerializer(serializers.Serializer):
+    """Un elemento de /tasks/start/"""
+    sku = serializers.CharField(max_length=50)
+    kg = serializers.FloatField()
+    kind = serializers.CharField(default='arabica')
+    coffee_type = serializers.ChoiceField(choices=GrainType.choices, default=GrainType.ARABICA)
+
+    def validate_kg(self, value):
+        return positive_kg(value)
+
+
+class AdvanceTasksSerializer(serializers.Serializer):
+    """Cuerpo de /tasks/advance/"""
+    task_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
@@ -0,0 +1,202 @@
+import heapq
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .composite import ProcessComponent, ProcessComposite
+
+# Simulación de eventos discretos de la planta: los lotes llegan (Poisson) y recorren en orden
+# las estaciones del ProcessComposite; cada estación es un equipo con `capacity` unidades y una
+# cola FIFO sin límite. Las duraciones de las etapas son la media de una lognormal con
+# coeficiente de variación `cv`. Unidades: horas. Las réplicas Monte Carlo se agrupan en
+# bloques con semilla propia, así el resultado no depende del número de procesos.
+
+CHUNK_REPLICATIONS = 50
+
+
+@dataclass
+class Station:
+    """Equipo de la línea: etapas consecutivas que ocupan el mismo recurso"""
+    name: str
+    steps: List[str]
+    mean_hours: List[float]
+    capacity: int = 1
+
+
+@dataclass
+class SimulationResult:
+    stations: List[str]
+    horizon_hours: float
+    throughput: np.ndarray       # lotes terminados por hora, por réplica
+    completed: np.ndarray        # lotes terminados en el horizonte, por réplica
+    utilization: np.ndarray      # réplicas × estaciones, fracción del tiempo ocupado
+    lead_times: np.ndarray       # horas desde la llegada hasta el final, de todos los lotes terminados
+
+    @property
+    def replications(self) -> int:
+        return self.throughput.size
+
+    def summary(self, percentiles: Sequence[float] = (5, 50, 95)) -> Dict[str, dict]:
+        """Medias y percentiles de cada distribución"""
+        def describe(values: np.ndarray) -> dict:
+            if not values.size:
+                return {'mean': None, **{f'p{p:g}': None for p in percentiles}}
+            points = np.percentile(values, percentiles)
+            return {'mean': float(values.mean()), **{f'p{p:g}': float(v) for p, v in zip(percentiles, points)}}
+
+        return {
+            'throughput_per_hour': describe(self.throughput),
+            'lead_time_hours': describe(self.lead_times),
+            'utilization': {name: describe(self.utilization[:, i]) for i, name in enumerate(self.stations)},
+        }
+
+
+def _leaves(component: ProcessComponent, group: Optional[str]):
+    """Etapas básicas en orden, con su recurso (el propio, el de su subproceso o su nombre)"""
+    if isinstance(component, ProcessComposite):
+        for child in component.get_children():
+            yield from _leaves(child, group)
+    else:
+        yield component, component.resource or group or component.name
+
+
+def stations_from_process(process: ProcessComposite, capacities: Optional[Dict[str, int]] = None) -> List[Station]:
+    """
+    Estaciones de la línea a partir del árbol de procesos. El recurso de una etapa es su
+    `resource`, o el nombre de su subproceso compuesto, o el suyo propio; las etapas
+    consecutivas del mismo recurso se hacen sin soltar el equipo.
+    """
+    capacities = capacities or {}
+    stations: List[Station] = []
+    for child in process.get_children():
+        group = child.name if isinstance(child, ProcessComposite) else None
+        for leaf, resource in _leaves(child, group):
+            if stations and stations[-1].name == resource:
+                stations[-1].steps.append(leaf.name)
+                stations[-1].mean_hours.append(float(leaf.get_duration()))
+            else:
+                stations.append(Station(resource, [leaf.name], [float(leaf.get_duration())],
+                                        capacities.get(resource, 1)))
+    unknown = set(capacities) - {station.name for station in stations}
+    if unknown:
+        raise ValueError(f"Equipos desconocidos: {', '.join(sorted(unknown))}")
+    for station in stations:
+        if station.capacity < 1:
+            raise ValueError(f"La capacidad de {station.name} debe ser al menos 1")
+    return stations
+
+
+def sample_durations(rng: np.random.Generator, stations: List[Station], n_jobs: int, cv: float) -> np.ndarray:
+    """
+    Duración de cada lote en cada estación (lotes × estaciones), en una sola muestra
+    lognormal de todas las etapas sumada por estación.
+    """
+    if not n_jobs:
+        return np.zeros((0, len(stations)))
+    means = np.array([hours for station in stations for hours in station.mean_hours], dtype=np.float64)
+    sigma = np.sqrt(np.log1p(cv ** 2))
+    # media de la lognormal = exp(mu + sigma²/2)
+    mu = np.log(np.maximum(means, 1e-12)) - sigma ** 2 / 2
+    steps = rng.lognormal(mu, sigma, size=(n_jobs, means.size)) * (means > 0)
+    starts = np.cumsum([0] + [len(station.steps) for station in stations[:-1]])
+    return np.add.reduceat(steps, starts, axis=1)
+
+
+def run_replication(stations: List[Station], arrivals: np.ndarray, durations: np.ndarray, horizon_hours: float):
+    """
+    Una corrida con cola de eventos en un heap: (hora, secuencia, estación terminada, lote);
+    la estación -1 es la llegada a la planta. Devuelve (tiempos de ciclo de los lotes
+    terminados, horas ocupadas por estación).
+    """
+    n_stations = len(stations)
+    capacity = [station.capacity for station in stations]
+    busy = [0] * n_stations
+    busy_hours = np.zeros(n_stations)
+    queues = [deque() for _ in range(n_stations)]
+    lead_times = []
+    events = [(float(t), job, -1, job) for job, t in enumerate(arrivals)]
+    heapq.heapify(events)
+    seq = len(events)
+
+    def start(now, station, job):
+        nonlocal seq
+        busy[station] += 1
+        end = now + durations[job, station]
+        busy_hours[station] += min(end, horizon_hours) - now
+        seq += 1
+        heapq.heappush(events, (end, seq, station, job))
+
+    while events:
+        now, _, station, job = heapq.heappop(events)
+        if now > horizon_hours:
+            break
+        if station >= 0:
+            busy[station] -= 1
+            if queues[station]:
+                start(now, station, queues[station].popleft())
+        following = station + 1
+        if following == n_stations:
+            lead_times.append(now - arrivals[job])
+        elif busy[following] < capacity[following]:
+            start(now, following, job)
+        else:
+            queues[following].append(job)
+    return lead_times, busy_hours
+
+
+def _run_chunk(stations: List[Station], arrivals_per_hour: float, horizon_hours: float, cv: float,
+               replications: int, seed: np.random.SeedSequence):
+    """Bloque de réplicas en un proceso: toda la aleatoriedad del bloque se muestrea de una vez"""
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(arrivals_per_hour * horizon_hours, size=replications)
+    # Llegadas de Poisson: dado el número, los instantes son uniformes en el horizonte
+    arrivals = np.split(rng.uniform(0, horizon_hours, size=counts.sum()), np.cumsum(counts)[:-1])
+    durations = np.split(sample_durations(rng, stations, int(counts.sum()), cv), np.cumsum(counts)[:-1])
+    capacity = np.array([station.capacity for station in stations], dtype=np.float64)
+
+    completed = np.zeros(replications, dtype=np.int64)
+    utilization = np.zeros((replications, len(stations)))
+    lead_times = []
+    for i in range(replications):
+        times, busy_hours = run_replication(stations, np.sort(arrivals[i]), durations[i], horizon_hours)
+        completed[i] = len(times)
+        utilization[i] = busy_hours / (capacity * horizon_hours)
+        lead_times.extend(times)
+    return completed, utilization, np.asarray(lead_times, dtype=np.float64)
+
+
+def simulate(stations: List[Station], arrivals_per_hour: float, horizon_hours: float, replications: int = 1000,
+             cv: float = 0.25, seed: Optional[int] = None, workers: Optional[int] = None) -> SimulationResult:
+    """
+    Monte Carlo de la línea: `replications` corridas de `horizon_hours` con lotes llegando a
+    `arrivals_per_hour`. Los bloques de réplicas se reparten en un pool de procesos
+    (workers=1 → en este proceso).
+    """
+    if arrivals_per_hour <= 0 or horizon_hours <= 0:
+        raise ValueError("La tasa de llegada y el horizonte deben ser mayores que 0")
+    if replications < 1:
+        raise ValueError("Se necesita al menos una réplica")
+    sizes = [min(CHUNK_REPLICATIONS, replications - start) for start in range(0, replications, CHUNK_REPLICATIONS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(stations, arrivals_per_hour, horizon_hours, cv, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+    if workers == 1:
+        chunks = [_run_chunk(*chunk_args) for chunk_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_run_chunk, *zip(*args)))
+
+    completed = np.concatenate([chunk[0] for chunk in chunks])
+    return SimulationResult(
+        stations=[station.name for station in stations],
+        horizon_hours=horizon_hours,
+        throughput=completed / horizon_hours,
+        completed=completed,
+        utilization=np.concatenate([chunk[1] for chunk in chunks]),
+        lead_times=np.concatenate([chunk[2] for chunk in chunks]),
+    )
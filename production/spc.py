@@ -0,0 +1,305 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import ProductBatch, SpcAlert, SpcSeries
+
+logger = logging.getLogger(__name__)
+
+# Control estadístico de procesos sobre los lotes terminados: una serie por tipo de café,
+# línea (assigned_unit de la tarea) y métrica. Cada lote nuevo actualiza su serie en O(1)
+# (record_batch); compute_chart recalcula una serie completa con NumPy para backfills
+# (rebuild_series) y para los datos de las cartas. Los límites de cada punto salen de los
+# lotes anteriores a él, así el recálculo reproduce las alertas del camino incremental.
+
+METRICS = ('cupping_score', 'qty_kg')
+
+# Constantes de las cartas X̄/R por tamaño de subgrupo: (A2, D3, D4)
+XBAR_R_CONSTANTS = {
+    2: (1.880, 0.0, 3.267),
+    3: (1.023, 0.0, 2.574),
+    4: (0.729, 0.0, 2.282),
+    5: (0.577, 0.0, 2.114),
+    6: (0.483, 0.0, 2.004),
+    7: (0.419, 0.076, 1.924),
+    8: (0.373, 0.136, 1.864),
+    9: (0.337, 0.184, 1.816),
+    10: (0.308, 0.223, 1.777),
+}
+
+
+@dataclass(frozen=True)
+class SpcParams:
+    subgroup_size: int = 5
+    min_subgroups: int = 3
+    ewma_lambda: float = 0.2
+    ewma_l: float = 3.0
+
+    @classmethod
+    def from_settings(cls) -> 'SpcParams':
+        params = cls(
+            subgroup_size=getattr(settings, 'SPC_SUBGROUP_SIZE', cls.subgroup_size),
+            min_subgroups=getattr(settings, 'SPC_MIN_SUBGROUPS', cls.min_subgroups),
+            ewma_lambda=getattr(settings, 'SPC_EWMA_LAMBDA', cls.ewma_lambda),
+            ewma_l=getattr(settings, 'SPC_EWMA_L', cls.ewma_l),
+        )
+        if params.subgroup_size not in XBAR_R_CONSTANTS:
+            raise ValueError(f"SPC_SUBGROUP_SIZE debe estar entre 2 y 10 (es {params.subgroup_size})")
+        return params
+
+    @property
+    def min_points(self) -> int:
+        """Lotes antes de vigilar la EWMA: los mismos que llenan los subgrupos de arranque"""
+        return self.subgroup_size * self.min_subgroups
+
+    @property
+    def ewma_factor(self) -> float:
+        """Semiancho de los límites EWMA (asintóticos) en unidades de σ"""
+        return self.ewma_l * np.sqrt(self.ewma_lambda / (2 - self.ewma_lambda))
+
+
+# (carta, valor, límite inferior, límite superior)
+Breach = Tuple[str, float, float, float]
+
+
+def update_series(series: SpcSeries, value: float, params: SpcParams) -> List[Breach]:
+    """Incorpora un valor a la serie (sin guardarla) y devuelve los límites que rompe"""
+    breaches: List[Breach] = []
+
+    # EWMA contra la media y σ de los lotes anteriores
+    if series.ewma is None:
+        ewma = value
+    else:
+        ewma = params.ewma_lambda * value + (1 - params.ewma_lambda) * series.ewma
+        half = params.ewma_factor * series.std
+        if series.count >= params.min_points and half > 0 and abs(ewma - series.mean) > half:
+            breaches.append(('EWMA', ewma, series.mean - half, series.mean + half))
+    series.ewma = ewma
+
+    # Welford
+    series.count += 1
+    delta = value - series.mean
+    series.mean += delta / series.count
+    series.m2 += delta * (value - series.mean)
+
+    # X̄/R al cerrar cada subgrupo
+    series.subgroup = [*series.subgroup, value]
+    if len(series.subgroup) == params.subgroup_size:
+        a2, d3, d4 = XBAR_R_CONSTANTS[params.subgroup_size]
+        xbar = sum(series.subgroup) / params.subgroup_size
+        spread = max(series.subgroup) - min(series.subgroup)
+        if series.subgroups >= params.min_subgroups and series.range_mean > 0:
+            center, range_mean = series.xbar_center, series.range_mean
+            lower, upper = center - a2 * range_mean, center + a2 * range_mean
+            if not lower <= xbar <= upper:
+                breaches.append(('XBAR', xbar, lower, upper))
+            if not d3 * range_mean <= spread <= d4 * range_mean:
+                breaches.append(('R', spread, d3 * range_mean, d4 * range_mean))
+        series.subgroups += 1
+        series.xbar_sum += xbar
+        series.range_sum += spread
+        series.subgroup = []
+    return breaches
+
+
+def record_batch(batch: ProductBatch) -> List[SpcAlert]:
+    """Actualiza las series del lote y guarda sus alertas fuera de control"""
+    params = SpcParams.from_settings()
+    line = batch.production_task.assigned_unit
+    alerts: List[SpcAlert] = []
+    for metric in METRICS:
+        value = getattr(batch, metric)
+        if value is None:
+            continue
+        with transaction.atomic():
+            SpcSeries.objects.get_or_create(coffee_type=batch.coffee_type, line=line, metric=metric)
+            # Dos lotes de la misma serie a la vez no pierden ninguna actualización
+            series = SpcSeries.objects.select_for_update().get(coffee_type=batch.coffee_type, line=line, metric=metric)
+            breaches = update_series(series, float(value), params)
+            series.save()
+            alerts += SpcAlert.objects.bulk_create([
+                SpcAlert(series=series, batch=batch, chart=chart, value=val, lower=lower, upper=upper)
+                for chart, val, lower, upper in breaches
+            ])
+    for alert in alerts:
+        logger.warning("SPC: %s %s fuera de control en el lote %s (%.2f, límites %.2f–%.2f)",
+                       alert.series, alert.chart, batch.code, alert.value, alert.lower, alert.upper)
+    return alerts
+
+
+def batch_saved(sender, instance: ProductBatch, created: bool, raw: bool = False, **kwargs) -> None:
+    """post_save de ProductBatch: cada lote nuevo entra a sus cartas de control"""
+    if created and not raw:
+        record_batch(instance)
+
+
+def ewma_path(values: np.ndarray, lam: float) -> np.ndarray:
+    """
+    EWMA de cada punto (z_0 = x_0) sin bucle por punto: dentro de un bloque,
+    z_k = (1-λ)^k · ((1-λ)·z_previo + λ·Σ_{j≤k} (1-λ)^{-j} x_j). Los bloques se limitan
+    para que (1-λ)^{-j} no desborde.
+    """
+    z = np.empty_like(values, dtype=np.float64)
+    if not values.size:
+        return z
+    decay = 1 - lam
+    if decay <= 0:
+        z[:] = values
+        return z
+    block = int(min(256, max(1, 30 / -np.log10(decay))))
+    z[0] = values[0]
+    for start in range(1, values.size, block):
+        chunk = values[start:start + block]
+        k = np.arange(chunk.size)
+        z[start:start + chunk.size] = decay ** k * (decay * z[start - 1] + lam * np.cumsum(chunk * decay ** -k))
+    return z
+
+
+@dataclass
+class ControlChart:
+    """Cartas de una serie completa; los límites valen NaN mientras no hay historia suficiente"""
+    values: np.ndarray
+    ewma: np.ndarray
+    ewma_lower: np.ndarray
+    ewma_upper: np.ndarray
+    xbar: np.ndarray
+    ranges: np.ndarray
+    xbar_lower: np.ndarray
+    xbar_upper: np.ndarray
+    range_lower: np.ndarray
+    range_upper: np.ndarray
+    subgroup_size: int
+
+    def breaches(self) -> List[Tuple[int, Breach]]:
+        """(índice del lote, ruptura) en el orden en que las detecta record_batch"""
+        found = []
+        out = (self.ewma < self.ewma_lower) | (self.ewma > self.ewma_upper)
+        for i in np.flatnonzero(out).tolist():
+            found.append((i, ('EWMA', float(self.ewma[i]), float(self.ewma_lower[i]), float(self.ewma_upper[i]))))
+        for chart, points, lower, upper in (('XBAR', self.xbar, self.xbar_lower, self.xbar_upper),
+                                            ('R', self.ranges, self.range_lower, self.range_upper)):
+            for j in np.flatnonzero((points < lower) | (points > upper)).tolist():
+                last = (j + 1) * self.subgroup_size - 1
+                found.append((last, (chart, float(points[j]), float(lower[j]), float(upper[j]))))
+        order = {'EWMA': 0, 'XBAR': 1, 'R': 2}
+        return sorted(found, key=lambda item: (item[0], order[item[1][0]]))
+
+    def apply_to(self, series: SpcSeries) -> None:
+        """Deja en la serie el estado acumulado que habría dejado record_batch"""
+        n, k = self.values.size, self.subgroup_size
+        closed = self.xbar.size
+        series.count = n
+        series.mean = float(self.values.mean()) if n else 0.0
+        series.m2 = float(((self.values - series.mean) ** 2).sum()) if n else 0.0
+        series.ewma = float(self.ewma[-1]) if n else None
+        series.subgroup = self.values[closed * k:].tolist()
+        series.subgroups = closed
+        series.xbar_sum = float(self.xbar.sum())
+        series.range_sum = float(self.ranges.sum())
+
+    def as_dict(self) -> Dict[str, list]:
+        def clean(array):
+            return [None if np.isnan(v) else round(v, 4) for v in array.tolist()]
+        return {
+            'values': clean(self.values),
+            'ewma': clean(self.ewma),
+            'ewma_lower': clean(self.ewma_lower),
+            'ewma_upper': clean(self.ewma_upper),
+            'xbar': clean(self.xbar),
+            'range': clean(self.ranges),
+            'xbar_lower': clean(self.xbar_lower),
+            'xbar_upper': clean(self.xbar_upper),
+            'range_lower': clean(self.range_lower),
+            'range_upper': clean(self.range_upper),
+        }
+
+
+def _before(cumulative: np.ndarray) -> np.ndarray:
+    """Acumulado hasta el punto anterior (0 para el primero)"""
+    return np.concatenate(([0.0], cumulative[:-1]))
+
+
+def compute_chart(values, params: Optional[SpcParams] = None) -> ControlChart:
+    """Recalcula las cartas de una serie entera con operaciones vectorizadas"""
+    params = params or SpcParams.from_settings()
+    x = np.asarray(values, dtype=np.float64)
+    n, k = x.size, params.subgroup_size
+    a2, d3, d4 = XBAR_R_CONSTANTS[k]
+
+    # EWMA: media y σ de los lotes anteriores a cada punto
+    index = np.arange(n, dtype=np.float64)
+    s1, s2 = _before(np.cumsum(x)), _before(np.cumsum(x * x))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_before = s1 / index
+        var_before = (s2 - s1 * s1 / index) / (index - 1)
+    half = params.ewma_factor * np.sqrt(np.clip(np.nan_to_num(var_before), 0, None))
+    watched = (index >= params.min_points) & (half > 0)
+    ewma = ewma_path(x, params.ewma_lambda)
+    ewma_lower = np.where(watched, mean_before - half, np.nan)
+    ewma_upper = np.where(watched, mean_before + half, np.nan)
+
+    # X̄/R sobre los subgrupos cerrados, con límites de los subgrupos anteriores
+    groups = x[:(n // k) * k].reshape(-1, k)
+    xbar = groups.mean(axis=1)
+    ranges = groups.max(axis=1) - groups.min(axis=1) if groups.size else np.zeros(0)
+    closed = np.arange(xbar.size, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        center = _before(np.cumsum(xbar)) / closed
+        range_mean = _before(np.cumsum(ranges)) / closed
+    active = (closed >= params.min_subgroups) & (np.nan_to_num(range_mean) > 0)
+    return ControlChart(
+        values=x,
+        ewma=ewma,
+        ewma_lower=ewma_lower,
+        ewma_upper=ewma_upper,
+        xbar=xbar,
+        ranges=ranges,
+        xbar_lower=np.where(active, center - a2 * range_mean, np.nan),
+        xbar_upper=np.where(active, center + a2 * range_mean, np.nan),
+        range_lower=np.where(active, d3 * range_mean, np.nan),
+        range_upper=np.where(active, d4 * range_mean, np.nan),
+        subgroup_size=k,
+    )
+
+
+def series_values(**filters) -> Dict[Tuple[str, str, str], Tuple[list, list]]:
+    """{(tipo, línea, métrica): (lotes, valores)} en orden de creación, con una sola consulta"""
+    rows = (ProductBatch.objects.filter(**filters).order_by('id')
+            .values_list('id', 'code', 'coffee_type', 'production_task__assigned_unit', *METRICS))
+    grouped: Dict[Tuple[str, str, str], Tuple[list, list]] = {}
+    for batch_id, code, coffee_type, line, *metric_values in rows.iterator(chunk_size=10_000):
+        for metric, value in zip(METRICS, metric_values):
+            if value is not None:
+                batches, values = grouped.setdefault((coffee_type, line, metric), ([], []))
+                batches.append((batch_id, code))
+                values.append(value)
+    return grouped
+
+
+def rebuild_series() -> int:
+    """
+    Backfill: recalcula todas las series y sus alertas desde los lotes (p. ej. tras cargas
+    con bulk_create, que no emiten señales). Devuelve el número de series.
+    """
+    params = SpcParams.from_settings()
+    series_list, alerts = [], []
+    for (coffee_type, line, metric), (batches, values) in series_values().items():
+        chart = compute_chart(values, params)
+        series = SpcSeries(coffee_type=coffee_type, line=line, metric=metric)
+        chart.apply_to(series)
+        series_list.append(series)
+        alerts.append([(batches[i][0], breach) for i, breach in chart.breaches()])
+
+    with transaction.atomic():
+        SpcSeries.objects.all().delete()
+        SpcSeries.objects.bulk_create(series_list, batch_size=1000)
+        SpcAlert.objects.bulk_create([
+            SpcAlert(series=series, batch_id=batch_id, chart=chart, value=value, lower=lower, upper=upper)
+            for series, series_alerts in zip(series_list, alerts)
+            for batch_id, (chart, value, lower, upper) in series_alerts
+        ], batch_size=1000)
+    return len(series_list)
@@ -0,0 +1,45 @@
+from django.test import TestCase
+
+from core.models import GrainType, ProcessStage
+from inventory.models import InventoryItem
+from production.models import ProductBatch, ProductionTask
+
+
+class ProductionApiTest(TestCase):
+    def setUp(self):
+        InventoryItem.objects.create(sku='API-PR', name='Arábica', type=GrainType.ARABICA, stock_kg=50)
+
+    def _post(self, url, payload):
+        return self.client.post(url, payload, content_type='application/json')
+
+    def test_iniciar_y_avanzar_hasta_el_lote(self):
+        """start/ crea las tareas con la fachada y advance/ las lleva hasta crear su lote"""
+        response = self._post('/api/v1/production/tasks/start/', [{'sku': 'API-PR', 'kg': 10},
+                                                                   {'sku': 'API-PR', 'kg': 5}])
+        self.assertEqual(response.status_code, 201)
+        task_ids = [task['id'] for task in response.json()['results']]
+        self.assertEqual(InventoryItem.objects.get(sku='API-PR').stock_kg, 35)
+
+        for _ in range(3):
+            results = self._post('/api/v1/production/tasks/advance/', {'task_ids': task_ids}).json()['results']
+        self.assertTrue(all(row['stage'] == ProcessStage.COMPLETADO for row in results))
+        self.assertEqual(ProductBatch.objects.filter(code__in=[row['product_batch'] for row in results]).count(), 2)
+
+    def test_reintento_de_avance_no_avanza_dos_veces(self):
+        """advance/ con la misma Idempotency-Key repite la respuesta sin mover la tarea otra etapa"""
+        task_id = self._post('/api/v1/production/tasks/start/', [{'sku': 'API-PR', 'kg': 10}]).json()['results'][0]['id']
+        url, headers = '/api/v1/production/tasks/advance/', {'Idempotency-Key': 'avance-1'}
+        first = self.client.post(url, {'task_ids': [task_id]}, content_type='application/json', headers=headers)
+        second = self.client.post(url, {'task_ids': [task_id]}, content_type='application/json', headers=headers)
+
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(ProductionTask.objects.get(pk=task_id).stage, first.json()['results'][0]['stage'])
+
+    def test_stock_insuficiente_revierte_el_lote(self):
+        """Una orden sin stock suficiente anula también las anteriores del mismo lote"""
+        response = self._post('/api/v1/production/tasks/start/', [{'sku': 'API-PR', 'kg': 30},
+                                                                   {'sku': 'API-PR', 'kg': 30}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['index'], 1)
+        self.assertFalse(ProductionTask.objects.exists())
+        self.assertEqual(InventoryItem.objects.get(sku='API-PR').stock_kg, 50)
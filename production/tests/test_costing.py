@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+
+from core.inventory_manager import InventoryManager
+from core.models import GrainType
+from inventory.commands import ConsumirStockCommand
+from inventory.models import InventoryItem, LotConsumption, RawGrain
+from inventory.repositories import DjangoInventoryRepo
+from production.costing import batch_margins
+from production.facade import ProductionFacade
+
+
+class FifoCostingTest(TestCase):
+    def setUp(self):
+        self.item = InventoryItem.objects.create(sku='COST-AR', name='Arábica Costeada',
+                                                 type=GrainType.ARABICA, stock_kg=100.0)
+        self.old_lot = RawGrain.objects.create(supplier='Finca Norte', type=GrainType.ARABICA, origin='Huila',
+                                               lot_code='COST-1', quantity_kg=30, unit_cost='4.00',
+                                               inventory_item=self.item)
+        self.new_lot = RawGrain.objects.create(supplier='Finca Sur', type=GrainType.ARABICA, origin='Nariño',
+                                               lot_code='COST-2', quantity_kg=70, unit_cost='5.00',
+                                               inventory_item=self.item)
+        self.repo = DjangoInventoryRepo()
+        self.facade = ProductionFacade(InventoryManager(self.repo))
+
+    def _complete(self, kg):
+        task = self.facade.start_production('COST-AR', kg, 'arabica')['production_task']
+        for _ in range(3):
+            result = self.facade.advance_production_stage(task.id)
+        return task, result['product_batch']
+
+    def test_costo_fifo_en_tarea_y_lote(self):
+        """El costo de la tarea sale de las capas más antiguas y pasa al lote terminado"""
+        task, batch = self._complete(40)
+
+        # 30 kg a 4.00 + 10 kg a 5.00
+        self.assertEqual(task.material_cost, Decimal('170'))
+        self.assertEqual(batch.material_cost, Decimal('170'))
+        self.assertEqual(batch.cost_per_kg, Decimal('4.25'))
+
+    def test_margen_por_lote(self):
+        """La consulta de finanzas devuelve ingreso, costo y margen de cada lote"""
+        _, batch = self._complete(10)
+
+        row = batch_margins().get(pk=batch.pk)
+        # 10 kg de arábica a 45.00/kg, costo 10 kg a 4.00
+        self.assertAlmostEqual(float(row.revenue), 450.0)
+        self.assertAlmostEqual(float(row.margin), 410.0)
+
+        data = self.client.get(reverse('production:batch_costs')).json()
+        self.assertEqual(data['batches'][0]['code'], batch.code)
+        self.assertAlmostEqual(data['batches'][0]['margin'], 410.0)
+
+    def test_undo_de_consumo_devuelve_las_capas(self):
+        """Deshacer un consumo restituye los kg a sus lotes y borra su costo"""
+        command = ConsumirStockCommand(self.repo, 'COST-AR', 35)
+        command.execute()
+        self.assertEqual(LotConsumption.objects.filter(movement_id=command._movement_id).count(), 2)
+
+        command.undo()
+        self.old_lot.refresh_from_db()
+        self.new_lot.refresh_from_db()
+        self.assertEqual((self.old_lot.remaining_kg, self.new_lot.remaining_kg), (30, 70))
+        self.assertFalse(LotConsumption.objects.exists())
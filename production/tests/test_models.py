@@ -1,6 +1,9 @@
 from django.test import TestCase
 from production.models import ProductionTask, ProductBatch
+from production.facade import ProductionFacade
+from core.inventory_manager import InventoryManager
 from core.models import ProcessStage, GrainType
+from inventory.repositories import DjangoInventoryRepo
 
 class ProductionTaskModelTest(TestCase):
     def setUp(self):
@@ -66,4 +69,46 @@ class ProductBatchModelTest(TestCase):
         self.assertEqual(batch.coffee_type, GrainType.ARABICA)
         self.assertEqual(batch.qty_kg, 5.0)
         self.assertEqual(batch.cupping_score, 85.5)
-        self.assertEqual(batch.production_task, task)
\ No newline at end of file
+        self.assertEqual(batch.production_task, task)
+
+class StageTransitionConcurrencyTest(TestCase):
+    def setUp(self):
+        self.task = ProductionTask.objects.create(assigned_unit="Línea Test", planned_kg=8.0)
+
+    def test_avance_completo_en_una_escritura(self):
+        """Llegar a COMPLETADO fija etapa, progreso y fecha en un solo UPDATE"""
+        ProductionTask.objects.filter(pk=self.task.pk).update(current_stage_index=2, stage=ProcessStage.ENVASADO)
+        self.task.refresh_from_db()
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.task.advance_stage())
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.stage, ProcessStage.COMPLETADO)
+        self.assertEqual(self.task.progress, 100)
+        self.assertIsNotNone(self.task.completed_at)
+
+    def test_avance_con_instancia_desactualizada_no_salta_etapas(self):
+        """Dos operadores con la misma lectura: solo uno avanza, el otro recarga la etapa ganadora"""
+        stale = ProductionTask.objects.get(pk=self.task.pk)
+
+        self.assertTrue(self.task.advance_stage())
+        self.assertFalse(stale.advance_stage())
+
+        self.assertEqual(stale.stage, ProcessStage.MOLIDO)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.current_stage_index, 1)
+
+    def test_lote_una_sola_vez_por_tarea(self):
+        """Un segundo intento de crear el lote de la tarea no lo duplica"""
+        facade = ProductionFacade(InventoryManager(DjangoInventoryRepo()))
+        for _ in range(3):
+            result = facade.advance_production_stage(self.task.id)
+        self.assertTrue(result['success'])
+
+        retry = facade._create_product_batch(self.task)
+        self.assertFalse(retry['success'])
+        self.assertEqual(ProductBatch.objects.filter(production_task=self.task).count(), 1)
+
+        again = facade.advance_production_stage(self.task.id)
+        self.assertFalse(again['success'])
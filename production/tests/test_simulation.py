@@ -0,0 +1,71 @@
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from production.composite import BasicProcess, ProcessComposite
+from production.simulation import run_replication, simulate, stations_from_process
+
+
+def plant(*stages):
+    process = ProcessComposite("Planta de prueba")
+    for name, hours, resource in stages:
+        process.add(BasicProcess(name, hours, resource))
+    return process
+
+
+class PlantSimulationTest(SimpleTestCase):
+    def setUp(self):
+        self.process = plant(("Tostado", 2, "Tostadora"), ("Enfriado", 1, "Tostadora"), ("Molido", 2, "Molino"))
+
+    def test_estaciones_agrupan_etapas_por_equipo(self):
+        """Etapas consecutivas del mismo equipo forman una estación; los subprocesos usan su nombre"""
+        packing = ProcessComposite("Envasado")
+        packing.add(BasicProcess("Sellado", 1))
+        packing.add(BasicProcess("Etiquetado", 1))
+        self.process.add(packing)
+
+        stations = stations_from_process(self.process, {'Molino': 2})
+        self.assertEqual([(s.name, s.mean_hours, s.capacity) for s in stations], [
+            ('Tostadora', [2.0, 1.0], 1), ('Molino', [2.0], 2), ('Envasado', [1.0, 1.0], 1)])
+        with self.assertRaises(ValueError):
+            stations_from_process(self.process, {'Horno': 2})
+
+    def test_corrida_determinista_con_cola(self):
+        """Dos lotes a la vez: el segundo espera la tostadora y sale 3 h después del primero"""
+        stations = stations_from_process(self.process)
+        durations = np.array([[3.0, 2.0], [3.0, 2.0]])
+        lead_times, busy_hours = run_replication(stations, np.array([0.0, 0.0]), durations, horizon_hours=100)
+
+        self.assertEqual(lead_times, [5.0, 8.0])
+        self.assertEqual(busy_hours.tolist(), [6.0, 4.0])
+
+    def test_segundo_molino_sube_el_rendimiento_del_cuello_de_botella(self):
+        """Con el molino saturado, duplicarlo sube el rendimiento y baja su utilización"""
+        process = plant(("Tostado", 1, "Tostadora"), ("Molido", 2, "Molino"))
+        base = simulate(stations_from_process(process), 0.8, 200, replications=60, seed=4, workers=1)
+        doubled = simulate(stations_from_process(process, {'Molino': 2}), 0.8, 200, replications=60, seed=4, workers=1)
+
+        self.assertAlmostEqual(base.throughput.mean(), 0.5, delta=0.03)
+        self.assertGreater(doubled.throughput.mean(), 0.75)
+        self.assertGreater(base.utilization[:, 1].mean(), 0.95)
+        self.assertLess(doubled.utilization[:, 1].mean(), 0.85)
+
+    def test_resultado_no_depende_del_numero_de_procesos(self):
+        """Con la misma semilla, el pool de procesos da las mismas distribuciones que en serie"""
+        stations = stations_from_process(self.process)
+        serial = simulate(stations, 0.2, 100, replications=120, seed=9, workers=1)
+        parallel = simulate(stations, 0.2, 100, replications=120, seed=9, workers=2)
+
+        self.assertEqual(serial.replications, 120)
+        np.testing.assert_array_equal(serial.completed, parallel.completed)
+        np.testing.assert_array_equal(serial.lead_times, parallel.lead_times)
+
+    def test_comando_con_capacidad_adicional(self):
+        """El comando simula la línea de la fachada con un equipo duplicado"""
+        out = StringIO()
+        call_command('simulate_plant', '--replications', '20', '--hours', '100', '--capacity', 'Molino=2',
+                     '--workers', '1', '--seed', '1', stdout=out)
+        self.assertIn('Molino               ×2', out.getvalue())
+        self.assertIn('Tiempo de ciclo', out.getvalue())
@@ -0,0 +1,103 @@
+from datetime import date
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from core.models import GrainType
+from production.models import ProductBatch, ProductionTask, SpcAlert, SpcSeries
+from production.spc import SpcParams, compute_chart, ewma_path, rebuild_series, update_series
+
+PARAMS = SpcParams(subgroup_size=5, min_subgroups=3, ewma_lambda=0.2, ewma_l=3.0)
+
+
+class ControlChartMathTest(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        # Proceso estable y luego un corrimiento de 3σ en la media
+        self.values = np.concatenate([rng.normal(85, 1, 60), rng.normal(88, 1, 30)])
+
+    def test_recalculo_vectorizado_igual_al_incremental(self):
+        """El recálculo con NumPy reproduce el estado y las alertas del camino lote a lote"""
+        series = SpcSeries(coffee_type=GrainType.ARABICA, line='Línea 1', metric='cupping_score')
+        incremental = []
+        for i, value in enumerate(self.values):
+            incremental += [(i, chart) for chart, *_ in update_series(series, float(value), PARAMS)]
+
+        chart = compute_chart(self.values, PARAMS)
+        self.assertEqual([(i, breach[0]) for i, breach in chart.breaches()], incremental)
+        self.assertTrue(incremental)
+
+        rebuilt = SpcSeries()
+        chart.apply_to(rebuilt)
+        self.assertEqual((rebuilt.count, rebuilt.subgroups), (series.count, series.subgroups))
+        self.assertAlmostEqual(rebuilt.mean, series.mean)
+        self.assertAlmostEqual(rebuilt.m2, series.m2, places=6)
+        self.assertAlmostEqual(rebuilt.ewma, series.ewma)
+
+    def test_ewma_por_bloques_igual_a_la_recurrencia(self):
+        """La EWMA vectorizada coincide con z_t = λx_t + (1-λ)z_{t-1}, también en series largas"""
+        values = np.random.default_rng(2).normal(10, 2, 3000)
+        for lam in (0.05, 0.2, 0.9):
+            expected = [values[0]]
+            for value in values[1:]:
+                expected.append(lam * value + (1 - lam) * expected[-1])
+            np.testing.assert_allclose(ewma_path(values, lam), expected)
+
+    def test_sin_historia_no_hay_limites(self):
+        """Antes de los subgrupos de arranque ningún punto rompe límites"""
+        chart = compute_chart([85.0, 95.0, 70.0, 85.0, 90.0, 60.0], PARAMS)
+        self.assertEqual(chart.breaches(), [])
+        self.assertTrue(np.isnan(chart.ewma_upper).all())
+
+
+class SpcBatchTest(TestCase):
+    def setUp(self):
+        self.scores = [84.0, 85.5, 85.0, 86.0, 84.5] * 4 + [92.0, 93.0, 92.5, 93.5, 92.0]
+
+    def create_batches(self, scores):
+        for i, score in enumerate(scores):
+            task = ProductionTask.objects.create(assigned_unit='Línea 1', planned_kg=10.0)
+            ProductBatch.objects.create(code=f'SPC-{i:03d}', coffee_type=GrainType.ARABICA, qty_kg=10.0,
+                                        cupping_score=score, mfg_date=date(2025, 1, 1),
+                                        expiry_date=date(2026, 1, 1), production_task=task)
+
+    def test_lote_nuevo_actualiza_la_serie_y_alerta(self):
+        """Cada lote entra a su serie al guardarse; el salto de puntuación genera alertas"""
+        self.create_batches(self.scores)
+
+        series = SpcSeries.objects.get(coffee_type=GrainType.ARABICA, line='Línea 1', metric='cupping_score')
+        self.assertEqual(series.count, 25)
+        self.assertEqual(series.subgroups, 5)
+        charts = set(SpcAlert.objects.filter(series=series).values_list('chart', flat=True))
+        self.assertIn('EWMA', charts)
+        self.assertIn('XBAR', charts)
+        # Cantidad constante: sin variación no hay límites ni alertas
+        self.assertFalse(SpcAlert.objects.filter(series__metric='qty_kg').exists())
+
+    def test_backfill_reproduce_las_series(self):
+        """rebuild_series deja las mismas series y alertas que la actualización incremental"""
+        self.create_batches(self.scores)
+        before = list(SpcAlert.objects.order_by('batch_id', 'chart').values_list('batch__code', 'chart'))
+        counts = dict(SpcSeries.objects.values_list('metric', 'count'))
+
+        self.assertEqual(rebuild_series(), 2)
+
+        self.assertEqual(list(SpcAlert.objects.order_by('batch_id', 'chart').values_list('batch__code', 'chart')),
+                         before)
+        self.assertEqual(dict(SpcSeries.objects.values_list('metric', 'count')), counts)
+
+    def test_endpoint_y_panel_de_analisis(self):
+        """El endpoint devuelve las cartas filtradas y la página de análisis muestra el panel"""
+        self.create_batches(self.scores)
+
+        data = self.client.get(reverse('production:spc_charts'), {'metric': 'cupping_score'}).json()
+        self.assertEqual(len(data['series']), 1)
+        chart = data['series'][0]
+        self.assertEqual((chart['line'], len(chart['values']), len(chart['xbar'])), ('Línea 1', 25, 5))
+        self.assertIsNone(chart['ewma_upper'][0])
+        self.assertTrue(data['alerts'])
+
+        response = self.client.get(reverse('production:analytics'))
+        self.assertContains(response, 'Control Estadístico')
+        self.assertEqual(len(response.context['spc_series']), 2)
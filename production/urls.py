@@ -11,5 +11,7 @@ urlpatterns = [
     path('report/', views.production_report, name='report'),
     path('analytics/', views.production_analytics, name='analytics'),
     path('download-report/<str:format_type>/', views.download_production_report, name='download_report'),
+    path('costs/', views.batch_costs, name='batch_costs'),
+    path('spc/', views.spc_charts, name='spc_charts'),
     path('batch/<str:batch_code>/', views.batch_detail, name='batch_detail'),
 ]
\ No newline at end of file
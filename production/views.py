@@ -1,16 +1,26 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.core.cache import cache
+from django.db.models import Avg, Count, Sum
+from django.http import JsonResponse
+from .costing import batch_margins
 from .facade import ProductionFacade
-from .models import ProductionTask, ProductBatch
+from .models import ProductionTask, ProductBatch, SpcAlert, SpcSeries
+from .spc import SpcParams, compute_chart, series_values
 from core.inventory_manager import InventoryManager
 from inventory.repositories import DjangoInventoryRepo
 from core.reports import ReportGenerator
+from core.conditional import page_variant, versioned_condition
+from core.db_router import read_replica
+from core.idempotency import idempotent
+from core.versioning import FRAGMENT_TIMEOUT, versions_key
 
 # Inicializar facade
 repo = DjangoInventoryRepo()
 inv_manager = InventoryManager(repo)
 production_facade = ProductionFacade(inv_manager)
 
+@versioned_condition(ProductionTask, ProductBatch, vary_on=page_variant)
 def production_dashboard(request):
     tasks = ProductionTask.objects.all().order_by('-created_at')
     batches = ProductBatch.objects.all().order_by('-mfg_date')
@@ -22,6 +32,7 @@ def production_dashboard(request):
     }
     return render(request, 'production/dashboard.html', context)
 
+@idempotent
 def start_production(request):
     if request.method == 'POST':
         sku = request.POST.get('sku')
@@ -87,18 +98,36 @@ def batch_detail(request, batch_code):
         messages.error(request, f'Lote {batch_code} no encontrado')
         return redirect('production:dashboard')
 
+@versioned_condition(ProductionTask, ProductBatch, vary_on=lambda request, format_type='pdf': [format_type])
 def download_production_report(request, format_type='pdf'):
     """Descarga reporte de producción en formato PDF o CSV"""
-    tasks = ProductionTask.objects.all().order_by('-created_at')
-    batches = ProductBatch.objects.all().order_by('-mfg_date')
-    
-    if format_type == 'csv':
-        return ReportGenerator.generate_production_csv(tasks, batches)
-    else:  # pdf por defecto
-        return ReportGenerator.generate_production_pdf(tasks, batches)
+    # Consultas pesadas de solo lectura: van a la réplica si hay una configurada
+    with read_replica():
+        tasks = ProductionTask.objects.all().order_by('-created_at')
+        batches = ProductBatch.objects.all().order_by('-mfg_date')
+        
+        if format_type == 'csv':
+            return ReportGenerator.generate_production_csv(tasks, batches)
+        else:  # pdf por defecto
+            return ReportGenerator.generate_production_pdf(tasks, batches)
 
 def production_analytics(request):
     """Vista de análisis y estadísticas de producción"""
+    # Las estadísticas solo se recalculan cuando cambian tareas o lotes. Lo que se guarda bajo
+    # la versión (estadísticas y el fragmento de tablas con los últimos lotes) se lee del
+    # primario: la réplica puede ir atrasada respecto a esa versión
+    version = versions_key(ProductionTask, ProductBatch)
+    context = cache.get_or_set(f'production-analytics:{version}', _analytics_stats, FRAGMENT_TIMEOUT)
+    context = {**context, 'batches': ProductBatch.objects.all()[:10]}  # Últimos 10 lotes
+    # Control estadístico: no se cachea, puede venir de la réplica
+    with read_replica():
+        context['spc_series'] = list(SpcSeries.objects.annotate(alert_count=Count('alerts'))
+                                     .order_by('coffee_type', 'line', 'metric'))
+        context['spc_alerts'] = list(SpcAlert.objects.select_related('series', 'batch').order_by('-created_at')[:10])
+    return render(request, 'production/analytics.html', context)
+
+def _analytics_stats():
+    """Estadísticas de la vista de análisis (se guardan en caché por versión de los modelos)"""
     tasks = ProductionTask.objects.all()
     batches = ProductBatch.objects.all()
     
@@ -107,31 +136,80 @@ def production_analytics(request):
     completed_tasks = tasks.filter(stage='CO').count()
     in_progress_tasks = total_tasks - completed_tasks
     
-    total_coffee_kg = sum(batch.qty_kg for batch in batches)
+    total_coffee_kg = batches.aggregate(total=Sum('qty_kg'))['total'] or 0
     
     # Tareas por etapa
     stages_data = {}
     for stage_code, stage_name in ProductionTask._meta.get_field('stage').choices:
         stages_data[stage_name] = tasks.filter(stage=stage_code).count()
     
-    # Café por tipo
+    # Café por tipo (una consulta agrupada)
+    by_type = {
+        row['coffee_type']: row
+        for row in batches.order_by().values('coffee_type').annotate(
+            count=Count('id'), total_kg=Sum('qty_kg'), avg_score=Avg('cupping_score'))
+    }
     coffee_types_data = {}
     for type_code, type_name in ProductBatch._meta.get_field('coffee_type').choices:
-        type_batches = batches.filter(coffee_type=type_code)
+        row = by_type.get(type_code, {})
         coffee_types_data[type_name] = {
-            'count': type_batches.count(),
-            'total_kg': sum(batch.qty_kg for batch in type_batches),
-            'avg_score': sum(batch.cupping_score for batch in type_batches if batch.cupping_score) / type_batches.count() if type_batches.count() > 0 else 0
+            'count': row.get('count', 0),
+            'total_kg': row.get('total_kg') or 0,
+            'avg_score': row.get('avg_score') or 0,
         }
     
-    context = {
+    return {
         'total_tasks': total_tasks,
         'completed_tasks': completed_tasks,
         'in_progress_tasks': in_progress_tasks,
         'total_coffee_kg': total_coffee_kg,
         'stages_data': stages_data,
         'coffee_types_data': coffee_types_data,
-        'batches': batches[:10]  # Últimos 10 lotes
     }
-    
-    return render(request, 'production/analytics.html', context)
\ No newline at end of file
+
+
+def spc_charts(request):
+    """
+    Datos de las cartas de control (JSON): por serie, los valores de cada lote con su EWMA y
+    límites, y las medias y rangos de los subgrupos con los límites X̄/R. Filtros opcionales:
+    ?coffee_type=AR&line=...&metric=cupping_score
+    """
+    filters = {key: request.GET[key] for key in ('coffee_type', 'line', 'metric') if request.GET.get(key)}
+    version = versions_key(ProductionTask, ProductBatch)
+    key = f"production-spc:{version}:{':'.join(f'{k}={v}' for k, v in sorted(filters.items()))}"
+    # Las cartas se guardan bajo la versión: se calculan en el primario
+    series = cache.get_or_set(key, lambda: _spc_chart_rows(filters), FRAGMENT_TIMEOUT)
+    with read_replica():
+        alerts = [
+            {'batch': alert.batch.code, 'coffee_type': alert.series.coffee_type, 'line': alert.series.line,
+             'metric': alert.series.metric, 'chart': alert.chart, 'value': alert.value,
+             'lower': alert.lower, 'upper': alert.upper, 'created_at': alert.created_at.isoformat()}
+            for alert in SpcAlert.objects.select_related('series', 'batch').order_by('-created_at')[:50]
+        ]
+    return JsonResponse({'series': series, 'alerts': alerts})
+
+def _spc_chart_rows(filters):
+    """Recalcula las series pedidas con NumPy (se guarda en caché por versión de los modelos)"""
+    metric = filters.get('metric')
+    lookups = {('production_task__assigned_unit' if k == 'line' else k): v
+               for k, v in filters.items() if k != 'metric'}
+    params = SpcParams.from_settings()
+    return [
+        {'coffee_type': coffee_type, 'line': line, 'metric': series_metric,
+         'batches': [code for _, code in batches], 'subgroup_size': params.subgroup_size,
+         **compute_chart(values, params).as_dict()}
+        for (coffee_type, line, series_metric), (batches, values) in sorted(series_values(**lookups).items())
+        if metric is None or series_metric == metric
+    ]
+
+
+def batch_costs(request):
+    """COGS y margen por lote terminado (JSON para finanzas)"""
+    rows = (batch_margins()
+            .order_by('-mfg_date', 'code')
+            .values('code', 'coffee_type', 'qty_kg', 'material_cost', 'revenue', 'margin'))
+    return JsonResponse({'batches': [
+        {**row, **{field: None if row[field] is None else float(row[field])
+                   for field in ('material_cost', 'revenue', 'margin')}}
+        for row in rows
+    ]})
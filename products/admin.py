@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import PriceListEntry
 
-# Register your models here.
+
+@admin.register(PriceListEntry)
+class PriceListEntryAdmin(admin.ModelAdmin):
+    list_display = ['component', 'key', 'amount', 'effective_from']
+    list_filter = ['component', 'key']
+    date_hierarchy = 'effective_from'
@@ -0,0 +1,88 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional, Tuple
+
+from core.factories import ComboFactoryCreator
+from .pricing import price_book
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Fila precalculada del catálogo: solo textos y números listos para mostrar"""
+    combo_level: str
+    coffee_type: str
+    combo_name: str
+    type_name: str
+    coffee_label: str
+    mug: str
+    filter: str
+    total_price: float
+    discount_pct: int
+    description: str
+
+
+class ComboCatalog:
+    """
+    Catálogo de combos construido una sola vez por proceso (o por versión de precios).
+
+    La matriz nivel × tipo de café se calcula al primer acceso y se guarda como una
+    tupla inmutable de CatalogEntry; las peticiones siguientes solo la leen.
+    """
+    COFFEE_TYPES = ('arabica', 'robusta', 'blend')
+    DEFAULT_WEIGHT_KG = 0.25
+
+    def __init__(self, version_provider: Optional[Callable[[], Hashable]] = None):
+        self._version_provider = version_provider or (lambda: 0)
+        self._lock = threading.Lock()
+        self._entries: Optional[Tuple[CatalogEntry, ...]] = None
+        self._version: Optional[Hashable] = None
+
+    def entries(self) -> Tuple[CatalogEntry, ...]:
+        """Devuelve el catálogo vigente, reconstruyéndolo solo si cambió la versión de precios"""
+        version = self._version_provider()
+        entries = self._entries
+        if entries is not None and self._version == version:
+            return entries
+
+        with self._lock:
+            if self._entries is None or self._version != version:
+                self._entries = self._build()
+                self._version = version
+            return self._entries
+
+    def invalidate(self) -> None:
+        """Descarta el catálogo precalculado (p. ej. tras un cambio de precios)"""
+        with self._lock:
+            self._entries = None
+            self._version = None
+
+    def _build(self) -> Tuple[CatalogEntry, ...]:
+        entries = []
+        for combo_type in ComboFactoryCreator.get_available_combo_types():
+            factory = ComboFactoryCreator.create_factory(combo_type['value'])
+            for coffee_type in self.COFFEE_TYPES:
+                try:
+                    combo = factory.create_combo(coffee_type, self.DEFAULT_WEIGHT_KG)
+                except ValueError:
+                    logger.exception("No se pudo crear el combo %s/%s", combo_type['value'], coffee_type)
+                    continue
+                entries.append(CatalogEntry(
+                    combo_level=combo_type['value'],
+                    coffee_type=coffee_type,
+                    combo_name=combo.combo_name,
+                    type_name=combo_type['name'],
+                    coffee_label=combo.coffee.label(),
+                    mug=str(combo.mug),
+                    filter=str(combo.filter),
+                    total_price=combo.get_total_price(),
+                    discount_pct=round(combo.discount * 100),
+                    description=combo.get_description(),
+                ))
+        return tuple(entries)
+
+
+# Instancia compartida por el proceso; se reconstruye con cada nueva lista de precios
+default_catalog = ComboCatalog(version_provider=price_book.snapshot)
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PricingVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PriceListEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component', models.CharField(choices=[('COFFEE_KG', 'Café (precio por kg)'), ('MUG', 'Taza de combo'), ('FILTER', 'Filtro de combo'), ('DISCOUNT', 'Descuento de combo')], max_length=10)),
+                ('key', models.CharField(max_length=30)),
+                ('amount', models.DecimalField(decimal_places=4, max_digits=10)),
+                ('effective_from', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['component', 'key', '-effective_from'],
+                'indexes': [models.Index(fields=['component', 'key', 'effective_from'], name='price_component_key_eff_idx')],
+            },
+        ),
+    ]
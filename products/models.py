@@ -1,3 +1,53 @@
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 
-# Create your models here.
+
+class PriceComponent(models.TextChoices):
+    COFFEE_KG = 'COFFEE_KG', 'Café (precio por kg)'
+    MUG = 'MUG', 'Taza de combo'
+    FILTER = 'FILTER', 'Filtro de combo'
+    DISCOUNT = 'DISCOUNT', 'Descuento de combo'
+
+
+class PriceListEntry(models.Model):
+    """
+    Precio vigente a partir de una fecha. `key` es el tipo de café ('arabica',
+    'robusta', 'blend') o el nivel de combo ('beginner', 'premium', 'professional').
+    Para DISCOUNT el monto es una fracción (0.15 = 15%).
+    """
+    component = models.CharField(max_length=10, choices=PriceComponent.choices)
+    key = models.CharField(max_length=30)
+    amount = models.DecimalField(max_digits=10, decimal_places=4)
+    effective_from = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['component', 'key', '-effective_from']
+        indexes = [
+            models.Index(fields=['component', 'key', 'effective_from'], name='price_component_key_eff_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_component_display()} {self.key}: {self.amount} (desde {self.effective_from:%Y-%m-%d})"
+
+
+class PricingVersion(models.Model):
+    """Contador de una sola fila que se incrementa con cada cambio en la lista de precios"""
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    SINGLETON_ID = 1
+
+    @classmethod
+    def current(cls) -> int:
+        return cls.objects.filter(id=cls.SINGLETON_ID).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls) -> None:
+        updated = cls.objects.filter(id=cls.SINGLETON_ID).update(version=F('version') + 1, updated_at=timezone.now())
+        if not updated:
+            cls.objects.get_or_create(id=cls.SINGLETON_ID, defaults={'version': 1})
+
+    def __str__(self):
+        return f"Precios v{self.version}"
@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .models import PriceComponent, PriceListEntry, PricingVersion
+
+logger = logging.getLogger(__name__)
+
+# Precios de respaldo (los que antes estaban escritos en core/factories.py).
+# Se usan para cualquier componente que aún no tenga fila en la lista de precios.
+DEFAULT_PRICES = {
+    (PriceComponent.COFFEE_KG, 'arabica'): 45.00,
+    (PriceComponent.COFFEE_KG, 'robusta'): 35.00,
+    (PriceComponent.COFFEE_KG, 'blend'): 40.00,
+    (PriceComponent.MUG, 'beginner'): 8.00,
+    (PriceComponent.MUG, 'premium'): 15.00,
+    (PriceComponent.MUG, 'professional'): 25.00,
+    (PriceComponent.FILTER, 'beginner'): 5.00,
+    (PriceComponent.FILTER, 'premium'): 12.00,
+    (PriceComponent.FILTER, 'professional'): 20.00,
+    (PriceComponent.DISCOUNT, 'beginner'): 0.10,
+    (PriceComponent.DISCOUNT, 'premium'): 0.15,
+    (PriceComponent.DISCOUNT, 'professional'): 0.20,
+}
+
+
+@dataclass(frozen=True, eq=False)
+class PriceSnapshot:
+    """Precios vigentes en un instante; inmutable y compartido entre hilos"""
+    version: int
+    prices: Mapping[Tuple[str, str], float]
+    valid_until: Optional[datetime] = None
+    _vectors: dict = field(default_factory=dict, repr=False)
+
+    def get(self, component: str, key: str) -> float:
+        try:
+            return self.prices[(component, key)]
+        except KeyError:
+            raise ValueError(f"Sin precio para {component} '{key}'")
+
+    def vector(self, component: str) -> Tuple[dict, np.ndarray]:
+        """Índice clave → posición y arreglo de precios de un componente (calculado una vez)"""
+        cached = self._vectors.get(component)
+        if cached is None:
+            keys = sorted(key for comp, key in self.prices if comp == component)
+            cached = ({key: i for i, key in enumerate(keys)},
+                      np.array([self.prices[(component, key)] for key in keys], dtype=np.float64))
+            self._vectors[component] = cached
+        return cached
+
+
+class PriceBook:
+    """
+    Caché en proceso de la lista de precios.
+
+    Se carga una sola vez y solo se vuelve a leer cuando sube `PricingVersion`
+    (comprobado como máximo cada PRICING_VERSION_CHECK_SECONDS) o cuando entra
+    en vigor un precio con fecha futura. Los cálculos de precio nunca consultan la BD.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[PriceSnapshot] = None
+        # Instante (reloj monotónico) de la próxima comprobación de versión
+        self._next_check = 0.0
+
+    @property
+    def check_interval(self) -> float:
+        return getattr(settings, 'PRICING_VERSION_CHECK_SECONDS', 30)
+
+    def snapshot(self) -> PriceSnapshot:
+        snap = self._snapshot
+        if snap is not None and not self._is_stale(snap):
+            return snap
+
+        with self._lock:
+            if self._snapshot is None or self._is_stale(self._snapshot):
+                self._snapshot = self._load()
+            return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
+
+    def invalidate(self) -> None:
+        """Fuerza la recarga en el próximo acceso (se llama al guardar precios en este proceso)"""
+        with self._lock:
+            self._snapshot = None
+
+    def _is_stale(self, snap: PriceSnapshot) -> bool:
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.check_interval
+        if snap.valid_until is not None and timezone.now() >= snap.valid_until:
+            return True
+        try:
+            return PricingVersion.current() != snap.version
+        except DatabaseError:
+            return False
+
+    def _load(self) -> PriceSnapshot:
+        prices = dict(DEFAULT_PRICES)
+        now = timezone.now()
+        try:
+            version = PricingVersion.current()
+            entries = PriceListEntry.objects.order_by('component', 'key', 'effective_from').values_list(
+                'component', 'key', 'amount', 'effective_from')
+            valid_until = None
+            for component, key, amount, effective_from in entries.iterator():
+                if effective_from <= now:
+                    # Ordenado por fecha: el último vigente gana
+                    prices[(component, key)] = float(amount)
+                elif valid_until is None or effective_from < valid_until:
+                    valid_until = effective_from
+        except DatabaseError as e:
+            logger.warning("Lista de precios no disponible (%s); usando precios por defecto", e)
+            version, valid_until = 0, None
+
+        next_check = self.check_interval
+        if valid_until is not None:
+            next_check = min(next_check, (valid_until - now).total_seconds())
+        self._next_check = time.monotonic() + next_check
+        return PriceSnapshot(version=version, prices=MappingProxyType(prices), valid_until=valid_until)
+
+    # Accesos por componente
+    def coffee_price_per_kg(self, coffee_type: str) -> float:
+        return self.snapshot().get(PriceComponent.COFFEE_KG, coffee_type)
+
+    def mug_price(self, combo_level: str) -> float:
+        return self.snapshot().get(PriceComponent.MUG, combo_level)
+
+    def filter_price(self, combo_level: str) -> float:
+        return self.snapshot().get(PriceComponent.FILTER, combo_level)
+
+    def combo_discount(self, combo_level: str) -> float:
+        return self.snapshot().get(PriceComponent.DISCOUNT, combo_level)
+
+    def quote_bulk(self, coffee_types: Sequence[str], weights_kg: Sequence[float],
+                   combo_levels: Optional[Sequence[Optional[str]]] = None) -> np.ndarray:
+        """
+        Cotiza miles de (tipo de café, peso, nivel de combo) en una sola pasada vectorizada.
+
+        Un nivel de combo vacío o None cotiza solo el café, sin taza, filtro ni descuento.
+        """
+        snap = self.snapshot()
+        weights = np.asarray(weights_kg, dtype=np.float64)
+        if weights.size and not np.isfinite(weights).all():
+            raise ValueError("El peso debe ser un número finito")
+        if weights.size and (weights < 0).any():
+            raise ValueError("El peso no puede ser negativo")
+
+        coffee_index, coffee_prices = snap.vector(PriceComponent.COFFEE_KG)
+        price_per_kg = coffee_prices[self._codes(coffee_types, coffee_index, "Tipo de café desconocido")]
+        totals = price_per_kg * weights
+
+        if combo_levels is not None:
+            level_index, _ = snap.vector(PriceComponent.DISCOUNT)
+            levels = ['' if level is None else level for level in combo_levels]
+            # Posición 0 reservada para "sin combo": sin accesorios ni descuento
+            codes = self._codes(levels, {'': -1, **level_index}, "Nivel de combo desconocido") + 1
+            addons = np.concatenate(([0.0], self._aligned(snap, PriceComponent.MUG, level_index)
+                                     + self._aligned(snap, PriceComponent.FILTER, level_index)))
+            discounts = np.concatenate(([0.0], snap.vector(PriceComponent.DISCOUNT)[1]))
+            totals = (totals + addons[codes]) * (1 - discounts[codes])
+        return totals
+
+    @staticmethod
+    def _codes(values: Sequence[str], index: dict, error: str) -> np.ndarray:
+        uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        try:
+            mapped = np.array([index[value] for value in uniques], dtype=np.intp)
+        except KeyError as e:
+            raise ValueError(f"{error}: {e.args[0]}")
+        return mapped[inverse] if uniques.size else np.empty(0, dtype=np.intp)
+
+    @staticmethod
+    def _aligned(snap: PriceSnapshot, component: str, level_index: dict) -> np.ndarray:
+        return np.array([snap.get(component, level) for level in level_index], dtype=np.float64)
+
+
+# Instancia compartida por el proceso
+price_book = PriceBook()
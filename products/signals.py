@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import PriceListEntry, PricingVersion
+from .pricing import price_book
+
+
+@receiver(post_save, sender=PriceListEntry)
+@receiver(post_delete, sender=PriceListEntry)
+def bump_pricing_version(sender, **kwargs):
+    """Cada cambio de precio sube la versión global y recarga la caché local al confirmar"""
+    PricingVersion.bump()
+    transaction.on_commit(price_book.invalidate)
@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from products.catalog import ComboCatalog, CatalogEntry
+
+
+class ComboCatalogTest(TestCase):
+    def test_catalogo_completo_precalculado(self):
+        """El catálogo contiene la matriz nivel × tipo de café con valores listos para mostrar"""
+        entries = ComboCatalog().entries()
+
+        self.assertEqual(len(entries), 9)
+        self.assertIsInstance(entries, tuple)
+        beginner_arabica = next(e for e in entries if e.combo_level == 'beginner' and e.coffee_type == 'arabica')
+        self.assertIsInstance(beginner_arabica, CatalogEntry)
+        self.assertEqual(beginner_arabica.combo_name, "Combo Principiante")
+        self.assertAlmostEqual(beginner_arabica.total_price, 21.825, places=2)
+        self.assertEqual(beginner_arabica.discount_pct, 10)
+
+    def test_se_construye_una_sola_vez_por_version(self):
+        """Mientras no cambie la versión de precios no se vuelven a crear combos"""
+        version = {'value': 1}
+        catalog = ComboCatalog(version_provider=lambda: version['value'])
+
+        with mock.patch.object(ComboCatalog, '_build', wraps=catalog._build) as build:
+            first = catalog.entries()
+            second = catalog.entries()
+            self.assertIs(first, second)
+            self.assertEqual(build.call_count, 1)
+
+            version['value'] = 2
+            catalog.entries()
+            self.assertEqual(build.call_count, 2)
+
+            catalog.invalidate()
+            catalog.entries()
+            self.assertEqual(build.call_count, 3)
+
+    def test_vista_catalogo(self):
+        """La vista del catálogo muestra los combos precalculados"""
+        response = self.client.get('/products/combos/catalog/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Combo Profesional')
+        self.assertContains(response, 'Incluye 20% de descuento')
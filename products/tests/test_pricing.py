@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.factories import ComboFactoryCreator, ProductFactory
+from products.models import PriceComponent, PriceListEntry, PricingVersion
+from products.pricing import PriceBook, price_book
+
+
+class PriceBookTest(TestCase):
+    def setUp(self):
+        price_book.invalidate()
+        self.addCleanup(price_book.invalidate)
+
+    def test_precios_por_defecto_sin_lista(self):
+        """Sin filas en la lista de precios se usan los precios históricos"""
+        book = PriceBook()
+        self.assertEqual(book.coffee_price_per_kg('arabica'), 45.00)
+        self.assertEqual(book.combo_discount('premium'), 0.15)
+
+    def test_cambio_de_precio_sube_version_y_recarga(self):
+        """Guardar un precio sube la versión y la caché se recarga al confirmar"""
+        coffee = ProductFactory().create('arabica', 1.0)
+        self.assertEqual(coffee.get_price_per_kg(), 45.00)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PriceListEntry.objects.create(component=PriceComponent.COFFEE_KG, key='arabica', amount='50.00')
+
+        self.assertEqual(PricingVersion.current(), 1)
+        self.assertEqual(coffee.get_price_per_kg(), 50.00)
+        self.assertEqual(price_book.version, 1)
+
+    def test_precio_con_fecha_futura(self):
+        """Un precio futuro no aplica hasta su fecha de vigencia"""
+        PriceListEntry.objects.create(component=PriceComponent.MUG, key='beginner', amount='9.00',
+                                      effective_from=timezone.now() - timedelta(days=1))
+        PriceListEntry.objects.create(component=PriceComponent.MUG, key='beginner', amount='11.00',
+                                      effective_from=timezone.now() + timedelta(days=1))
+        book = PriceBook()
+        self.assertEqual(book.mug_price('beginner'), 9.00)
+        self.assertIsNotNone(book.snapshot().valid_until)
+
+    def test_no_consulta_bd_por_cada_precio(self):
+        """Calcular precios de combos no genera consultas una vez cargada la caché"""
+        factory = ComboFactoryCreator.create_factory('professional')
+        factory.create_combo('blend', 1.0)
+        with self.assertNumQueries(0):
+            for _ in range(100):
+                factory.create_combo('blend', 1.0).get_total_price()
+
+
+class BulkQuoteTest(TestCase):
+    def setUp(self):
+        price_book.invalidate()
+        self.addCleanup(price_book.invalidate)
+
+    def test_cotizacion_vectorizada_coincide_con_combos(self):
+        """La cotización masiva da lo mismo que crear cada combo con las fábricas"""
+        rows = [('arabica', 0.25, 'beginner'), ('robusta', 0.5, 'premium'),
+                ('blend', 2.0, 'professional'), ('arabica', 3.0, None)]
+        totals = PriceBook().quote_bulk(*zip(*rows))
+
+        for (coffee_type, weight, level), total in zip(rows, totals):
+            if level is None:
+                expected = ProductFactory().create(coffee_type, weight).get_price_per_kg() * weight
+            else:
+                expected = ComboFactoryCreator.create_factory(level).create_combo(coffee_type, weight).get_total_price()
+            self.assertAlmostEqual(total, expected, places=6)
+
+    def test_tipo_desconocido(self):
+        """Un tipo de café desconocido es un error, igual que en ProductFactory"""
+        with self.assertRaises(ValueError):
+            PriceBook().quote_bulk(['kopi'], [1.0])
+
+    def test_endpoint_cotizacion_masiva(self):
+        """El endpoint JSON devuelve una cotización por ítem y el total"""
+        response = self.client.post('/products/quotes/bulk/', data={
+            'items': [
+                {'coffee_type': 'arabica', 'weight_kg': 0.25, 'combo_level': 'beginner'},
+                {'coffee_type': 'robusta', 'weight_kg': 1},
+            ]
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['quotes'], [21.82, 35.0])
+        self.assertEqual(data['total'], 56.83)
+
+        response = self.client.post('/products/quotes/bulk/', data={'items': [{'coffee_type': 'kopi', 'weight_kg': 1}]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_endpoint_rechaza_pesos_no_finitos(self):
+        """NaN o Infinity (que json.loads acepta) son un 400, no una cotización NaN"""
+        for weight in ('NaN', 'Infinity', '"inf"'):
+            body = '{"items": [{"coffee_type": "arabica", "weight_kg": %s}]}' % weight
+            response = self.client.post('/products/quotes/bulk/', data=body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, weight)
@@ -7,5 +7,6 @@ urlpatterns = [
     path('combos/', views.combos_dashboard, name='combos_dashboard'),
     path('combos/create/', views.create_combo, name='create_combo'),
     path('combos/catalog/', views.combo_catalog, name='combo_catalog'),
+    path('quotes/bulk/', views.bulk_quote, name='bulk_quote'),
     # Agrega aquí otras URLs de products si las tienes
 ]
\ No newline at end of file
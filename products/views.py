@@ -1,6 +1,13 @@
+import json
+
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from core.factories import ComboFactoryCreator, ProductFactory
+from .catalog import default_catalog
+from .pricing import price_book
 
 def combos_dashboard(request):
     """Dashboard para gestión de combos"""
@@ -41,26 +48,32 @@ def create_combo(request):
 
 def combo_catalog(request):
     """Mostrar catálogo de todos los combos disponibles"""
-    combo_types = ComboFactoryCreator.get_available_combo_types()
-    coffee_types = ['arabica', 'robusta', 'blend']
-    
-    # Crear ejemplos de cada tipo de combo
-    combos = []
-    for combo_type in combo_types:
-        for coffee_type in coffee_types:
-            try:
-                factory = ComboFactoryCreator.create_factory(combo_type['value'])
-                combo = factory.create_combo(coffee_type, 0.25)  # 250g por defecto
-                combos.append({
-                    'combo': combo,
-                    'type_info': combo_type,
-                    'coffee_type': coffee_type
-                })
-            except Exception as e:
-                print(f"Error creando combo: {e}")
-    
     context = {
-        'combos': combos,
+        'combos': default_catalog.entries(),
         'title': 'Catálogo de Combos'
     }
-    return render(request, 'products/combo_catalog.html', context)
\ No newline at end of file
+    return render(request, 'products/combo_catalog.html', context)
+
+@csrf_exempt
+@require_POST
+def bulk_quote(request):
+    """
+    Cotización masiva para la herramienta B2B.
+
+    Espera {"items": [{"coffee_type": "arabica", "weight_kg": 1.5, "combo_level": "premium"}, ...]};
+    combo_level es opcional.
+    """
+    try:
+        items = json.loads(request.body)['items']
+        coffee_types = [item['coffee_type'] for item in items]
+        weights = [float(item['weight_kg']) for item in items]
+        levels = [item.get('combo_level') for item in items]
+        totals = price_book.quote_bulk(coffee_types, weights, levels)
+    except (ValueError, KeyError, TypeError) as e:
+        return JsonResponse({'error': f'Solicitud inválida: {e}'}, status=400)
+
+    return JsonResponse({
+        'pricing_version': price_book.version,
+        'quotes': [round(total, 2) for total in totals.tolist()],
+        'total': round(float(totals.sum()), 2),
+    })
\ No newline at end of file